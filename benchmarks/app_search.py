@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: launcher app search, per keystroke.
+
+Generates a synthetic set of desktop apps and replays typing a few queries
+one character at a time against:
+
+  - linear:  the old filter (casefold substring over six concatenated
+             fields, recomputed for every app, then sorted by name)
+  - indexed: AppSearchEngine with its prebuilt token/prefix/trigram index
+
+Usage: python benchmarks/app_search.py [app_count]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.app_search import AppSearchEngine, extract_command_name
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "shi", "gra", "pel",
+             "dor", "fen", "bli", "qua", "zen", "tor", "wex", "lum", "sta", "cri"]
+REAL_APPS = ["Firefox", "LibreOffice Writer", "LibreOffice Calc", "Blender",
+             "System Monitor", "Terminal", "Kitty", "Files", "Image Viewer",
+             "Text Editor", "Thunderbird", "Steam", "Discord", "Visual Studio Code"]
+QUERIES = ["firefox", "libre writer", "term", "blndr", "system monitor", "zzz"]
+
+
+def make_word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_apps(count):
+    rng = random.Random(42)
+    names = REAL_APPS + [
+        " ".join(make_word(rng).capitalize() for _ in range(rng.randint(1, 3)))
+        for _ in range(max(0, count - len(REAL_APPS)))
+    ]
+    apps = []
+    for i, name in enumerate(names[:count]):
+        binary = name.lower().replace(" ", "-")
+        apps.append(
+            SimpleNamespace(
+                name=name,
+                display_name=name,
+                generic_name=f"{make_word(rng).capitalize()} {make_word(rng)}",
+                executable=f"/usr/bin/{binary}",
+                command_line=f"/usr/bin/{binary} %U",
+                desktop_id=f"{binary}-{i}.desktop",
+            )
+        )
+    return apps
+
+
+def linear_search(apps, query):
+    return sorted(
+        [
+            app
+            for app in apps
+            if query.casefold()
+            in (
+                (app.display_name or "")
+                + (" " + app.name + " ")
+                + (app.generic_name or "")
+                + (" " + (app.command_line or "") + " ")
+                + (" " + (app.executable or "") + " ")
+                + (" " + extract_command_name(app.command_line) + " ")
+            ).casefold()
+        ],
+        key=lambda app: (app.display_name or "").casefold(),
+    )
+
+
+def keystrokes():
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            yield query[:end]
+
+
+def measure(label, search, rounds=5):
+    samples = []
+    for _ in range(rounds):
+        for query in keystrokes():
+            start = time.perf_counter()
+            search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{label:<8} mean {statistics.mean(samples):7.3f} ms   "
+        f"p99 {p99:7.3f} ms   max {samples[-1]:7.3f} ms"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    apps = make_apps(count)
+
+    engine = AppSearchEngine()
+    start = time.perf_counter()
+    engine.set_apps(apps, generation=1)
+    print(f"{count} apps, index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Give a few apps some launch history so the usage boost is exercised
+    for app in apps[:: max(1, count // 50)]:
+        engine.record_launch(app)
+
+    measure("linear", lambda q: linear_search(apps, q))
+    measure("indexed", engine.search)
+
+    for query in QUERIES:
+        top = [app.display_name for app in engine.search(query)[:3]]
+        print(f"  {query!r}: {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: CPU cost of the cava spectrum pipeline at 60 FPS.
+
+Writes raw 16-bit cava frames into a pipe and times the work the shell does
+for each frame, excluding the cairo calls themselves:
+
+  - old: os.read + struct.unpack + per-element division into a new list,
+         a stat of colors.css, and bar geometry recomputed inside the loop
+  - new: FrameReader.drain into a preallocated buffer viewed through NumPy,
+         and the vectorized height computation from Spectrum.redraw
+
+The old path also paid for one GLib.idle_add per frame, which is not
+included here, so its figure is a lower bound.
+
+Usage: python benchmarks/cava_pipeline.py [frames] [bars]
+"""
+
+import os
+import random
+import statistics
+import struct
+import sys
+import time
+
+import numpy as np
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cava_frames import FrameReader
+
+FPS = 60
+COLORS_CSS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "styles", "colors.css")
+
+
+def old_pipeline(fd, bars, width, height):
+    chunk = 2 * bars
+    data = os.read(fd, chunk)
+    sample = [i / 65535 for i in struct.unpack("H" * bars, data)]
+    try:
+        os.path.getmtime(COLORS_CSS)
+    except OSError:
+        pass
+    padding = 100 / bars
+    dx = 3
+    for value in sample:
+        bar_width = width / bars - padding
+        h = max(height * min(value, 1), 0) / 2
+        if h == 1:
+            h *= 0.5
+        h = min(h, 12)
+        dx += bar_width + padding
+
+
+def make_new_pipeline(fd, bars, width, height):
+    reader = FrameReader(fd, bars)
+    heights = np.zeros(bars, dtype=np.float32)
+    padding = 100 / bars
+    bar_width = width / bars - padding
+    xs = [3 + i * (bar_width + padding) for i in range(bars)]
+
+    def run():
+        if not reader.drain():
+            return
+        np.minimum(reader.frame, 1.0, out=heights)
+        heights[:] *= height / 2
+        np.maximum(heights, 0, out=heights)
+        heights[heights == 1] *= 0.5
+        np.minimum(heights, 12, out=heights)
+        for dx, h in zip(xs, heights.tolist()):
+            pass
+
+    return run
+
+
+def measure(label, run, fd_write, frames, bars):
+    rng = random.Random(1)
+    payloads = [
+        struct.pack("H" * bars, *(rng.randrange(65536) for _ in range(bars)))
+        for _ in range(64)
+    ]
+    timings = []
+    for i in range(frames):
+        os.write(fd_write, payloads[i % len(payloads)])
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    mean = statistics.mean(timings)
+    print(
+        f"{label:<4} {mean:7.2f} us/frame   "
+        f"~{mean * FPS / 10_000:.3f}% of one core at {FPS} FPS"
+    )
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    width, height = 180, 38
+
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    measure("old", lambda: old_pipeline(read_fd, bars, width, height), write_fd, frames, bars)
+    measure("new", make_new_pipeline(read_fd, bars, width, height), write_fd, frames, bars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: hyprctl subprocesses vs. batched requests on the command socket.
+
+Starts a mock Hyprland command socket that answers j/monitors, j/clients and
+j/activewindow (including [[BATCH]] requests) and measures what one notch or
+overview open costs with each strategy:
+
+  - subprocess: one `hyprctl -j <cmd>` fork+exec per query (the old path)
+  - socket:     one HyprctlClient round trip per query
+  - batched:    a single [[BATCH]] round trip for all queries
+
+If `hyprctl` is not installed, a Python one-shot socket client is spawned
+instead, which still pays for fork+exec (plus interpreter startup).
+
+Usage: python benchmarks/hyprctl_batch.py [iterations]
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hyprland_socket import COMMAND_SOCKET, HyprctlClient
+
+COMMANDS = ["j/monitors", "j/clients", "j/activewindow"]
+
+FAKE_CLIENTS = [
+    {
+        "address": f"0x{i:x}",
+        "mapped": True,
+        "hidden": False,
+        "at": [(i % 4) * 480, (i // 4 % 3) * 360],
+        "size": [480, 360],
+        "workspace": {"id": i % 10 + 1, "name": str(i % 10 + 1)},
+        "floating": False,
+        "monitor": i % 3,
+        "class": f"app-{i % 12}",
+        "title": f"Window {i}",
+        "initialClass": f"app-{i % 12}",
+        "initialTitle": f"Window {i}",
+        "pid": 1000 + i,
+    }
+    for i in range(60)
+]
+FAKE_MONITORS = [
+    {
+        "id": i,
+        "name": f"DP-{i}",
+        "width": 2560,
+        "height": 1440,
+        "x": i * 2560,
+        "y": 0,
+        "scale": 1.0,
+        "transform": 0,
+        "focused": i == 0,
+        "activeWorkspace": {"id": i * 10 + 1, "name": str(i * 10 + 1)},
+    }
+    for i in range(3)
+]
+REPLIES = {
+    "j/monitors": json.dumps(FAKE_MONITORS, indent=4),
+    "j/clients": json.dumps(FAKE_CLIENTS, indent=4),
+    "j/activewindow": json.dumps(FAKE_CLIENTS[0], indent=4),
+}
+
+ONE_SHOT_CLIENT = """
+import socket, sys
+s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+s.connect(sys.argv[1])
+s.sendall(sys.argv[2].encode())
+while s.recv(65536):
+    pass
+"""
+
+
+def reply_for(request: str) -> str:
+    # hyprctl sends flags as a prefix, e.g. "j/clients"
+    return REPLIES.get(request.strip(), "unknown request")
+
+
+def serve(server: socket.socket):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            request = conn.recv(65536).decode()
+            if request.startswith("[[BATCH]]"):
+                items = [c for c in request[len("[[BATCH]]"):].split(";") if c]
+                # Like Hyprland, terminate every item with the delimiter
+                reply = "".join(reply_for(c) + "\n\n\n" for c in items)
+            else:
+                reply = reply_for(request)
+            conn.sendall(reply.encode())
+
+
+def measure(label: str, iterations: int, fn):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<12} {elapsed:8.3f} ms per open ({len(COMMANDS)} queries)")
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    runtime_dir = tempfile.mkdtemp(prefix="ax-shell-bench-")
+    signature = "benchmark"
+    os.makedirs(os.path.join(runtime_dir, "hypr", signature))
+    socket_path = os.path.join(runtime_dir, "hypr", signature, COMMAND_SOCKET)
+    os.environ["XDG_RUNTIME_DIR"] = runtime_dir
+    os.environ["HYPRLAND_INSTANCE_SIGNATURE"] = signature
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    threading.Thread(target=serve, args=(server,), daemon=True).start()
+
+    hyprctl = shutil.which("hyprctl")
+    if hyprctl:
+        def via_subprocess():
+            for command in COMMANDS:
+                subprocess.run(
+                    [hyprctl, "-j", command.split("/", 1)[1]],
+                    capture_output=True,
+                    check=False,
+                )
+        label = "subprocess"
+    else:
+        print("hyprctl not found, spawning a Python one-shot client instead")
+
+        def via_subprocess():
+            for command in COMMANDS:
+                subprocess.run(
+                    [sys.executable, "-c", ONE_SHOT_CLIENT, socket_path, command],
+                    capture_output=True,
+                    check=True,
+                )
+        label = "subprocess*"
+
+    client = HyprctlClient(socket_path)
+
+    def via_socket():
+        for command in COMMANDS:
+            client.query(command)
+
+    def via_batch():
+        replies = client.query_batch(COMMANDS)
+        assert all(reply is not None for reply in replies)
+
+    subprocess_ms = measure(label, max(iterations // 10, 5), via_subprocess)
+    socket_ms = measure("socket", iterations, via_socket)
+    batch_ms = measure("batched", iterations, via_batch)
+
+    print(f"\nbatched is {subprocess_ms / batch_ms:.1f}x faster than {label}"
+          f" and {socket_ms / batch_ms:.1f}x faster than per-query socket requests")
+
+    server.close()
+    shutil.rmtree(runtime_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
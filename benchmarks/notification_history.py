@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: notification history as one JSON file vs. the SQLite store.
+
+For histories of several sizes, measures what the shell pays per new
+notification and at startup:
+
+  - json:   rewrite the whole list on every add, parse it all at startup
+            (the old path)
+  - sqlite: NotificationStore.add(), and at startup the per-day counts the
+            history view builds its rows from plus the first page of rows
+
+Usage: python benchmarks/notification_history.py [adds]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.notification_store import NotificationStore
+
+SIZES = [50, 1000, 10000]
+
+
+def make_note(i, when):
+    return {
+        "id": f"{i:08x}-0000-4000-8000-000000000000",
+        "app_icon": "",
+        "summary": f"Message {i}",
+        "body": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 2,
+        "app_name": f"app-{i % 12}",
+        "timestamp": when.isoformat(),
+        "cached_image_path": None,
+    }
+
+
+def bench_json(directory, notes, adds):
+    path = os.path.join(directory, "history.json")
+    with open(path, "w") as f:
+        json.dump(notes, f)
+    history = list(notes)
+    start = time.perf_counter()
+    for i in range(adds):
+        history.insert(0, make_note(len(notes) + i, datetime.now()))
+        with open(path, "w") as f:
+            json.dump(history, f)
+    add_ms = (time.perf_counter() - start) * 1000 / adds
+
+    start = time.perf_counter()
+    with open(path, "r") as f:
+        json.load(f)
+    load_ms = (time.perf_counter() - start) * 1000
+    return add_ms, load_ms
+
+
+def bench_sqlite(directory, notes, adds):
+    store = NotificationStore(os.path.join(directory, "history.sqlite"), max_count=len(notes) + adds)
+    for note in reversed(notes):
+        store.add(note)
+    start = time.perf_counter()
+    for i in range(adds):
+        store.add(make_note(len(notes) + i, datetime.now()))
+    add_ms = (time.perf_counter() - start) * 1000 / adds
+    store.close()
+
+    start = time.perf_counter()
+    store = NotificationStore(store.db_path, max_count=None, max_age_days=None)
+    store.day_counts()
+    store.page()
+    load_ms = (time.perf_counter() - start) * 1000
+    store.close()
+    return add_ms, load_ms
+
+
+def main():
+    adds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    now = datetime.now()
+    print(f"{'entries':>8} {'backend':>8} {'add (ms)':>10} {'startup (ms)':>13}")
+    for size in SIZES:
+        notes = [make_note(i, now - timedelta(minutes=i)) for i in range(size)]
+        for name, bench in (("json", bench_json), ("sqlite", bench_sqlite)):
+            with tempfile.TemporaryDirectory() as directory:
+                add_ms, load_ms = bench(directory, notes, adds)
+            print(f"{size:>8} {name:>8} {add_ms:>10.3f} {load_ms:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
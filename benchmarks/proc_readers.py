@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: cost of one metrics sample.
+
+Times what MetricsProvider does per wakeup for CPU, memory, disks and
+network throughput:
+
+  - psutil:  cpu_percent, virtual_memory, disk_usage, net_io_counters
+  - readers: the preadv-based readers in utils/proc_readers.py
+
+Usage: python benchmarks/proc_readers.py [samples]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.proc_readers import CpuReader, MemoryReader, NetReader, disk_usage_percent
+
+DISKS = ["/"]
+
+
+def measure(label, sample, count):
+    sample()  # warm up (first CPU reading, interface classification)
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        sample()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<12} mean {statistics.mean(timings):8.1f} us   p99 {p99:8.1f} us")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    cpu, memory, net = CpuReader(), MemoryReader(), NetReader()
+
+    def readers_sample():
+        cpu.sample()
+        memory.sample()
+        for path in DISKS:
+            disk_usage_percent(path)
+        net.sample()
+
+    print(f"{count} samples, per-sample cost")
+    measure("readers", readers_sample, count)
+    measure("  cpu", cpu.sample, count)
+    measure("  memory", memory.sample, count)
+    measure("  net", net.sample, count)
+
+    try:
+        import psutil
+    except ImportError:
+        print("psutil is not installed; skipping the comparison")
+        return
+
+    def psutil_sample():
+        psutil.cpu_percent(interval=0)
+        psutil.virtual_memory()
+        for path in DISKS:
+            psutil.disk_usage(path)
+        psutil.net_io_counters()
+
+    measure("psutil", psutil_sample, count)
+    measure("  cpu", lambda: psutil.cpu_percent(interval=0), count)
+    measure("  memory", psutil.virtual_memory, count)
+    measure("  net", psutil.net_io_counters, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: wallpaper thumbnail cache, cold and warm.
+
+Cold: rendering one 96 px thumbnail from a 3840x2160 JPEG
+  - full:  full-size decode, crop, LANCZOS (the old _process_file)
+  - draft: render_thumbnail, which lets libjpeg decode at reduced scale
+
+Pool: rendering all JPEGs on 4 threads vs one ThumbnailWorkerPool process
+per CPU, while the main thread ticks every 1 ms as the GTK loop would;
+reports wall time (including worker startup) and the longest main-thread
+stall
+
+Warm: deciding which of N wallpapers already have a thumbnail
+  - exists: md5 of the file name + os.path.exists per file (old scheme)
+  - index:  scandir stats + ThumbnailCache.lookup, including index load
+
+Usage: python benchmarks/wallpaper_thumbnails.py [wallpapers] [jpegs]
+"""
+
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PIL import Image
+
+# Add the Ax-Shell directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.wallpaper_thumbnails import ThumbnailCache, ThumbnailWorkerPool, render_thumbnail
+
+
+def old_render(path, size=96):
+    with Image.open(path) as img:
+        width, height = img.size
+        side = min(width, height)
+        left = (width - side) // 2
+        top = (height - side) // 2
+        cropped = img.crop((left, top, left + side, top + side))
+        cropped.thumbnail((size, size), Image.Resampling.LANCZOS)
+        cropped.save(os.devnull, "PNG")
+
+
+def make_jpeg(path, seed):
+    img = Image.linear_gradient("L").resize((3840, 2160)).convert("RGB")
+    img = Image.merge("RGB", [c.point(lambda v, s=seed + i: (v * (s + 3)) % 256) for i, c in enumerate(img.split())])
+    img.save(path, "JPEG", quality=90)
+
+
+def time_each(func, items):
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def render_with(submit, sources):
+    start = time.perf_counter()
+    futures = [submit(path) for path in sources]
+    longest_stall = 0.0
+    last = time.perf_counter()
+    while not all(f.done() for f in futures):
+        time.sleep(0.001)
+        now = time.perf_counter()
+        longest_stall = max(longest_stall, now - last)
+        last = now
+    wait(futures)
+    return (time.perf_counter() - start) * 1000, longest_stall * 1000
+
+
+def main():
+    wallpapers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    jpegs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        walls = os.path.join(tmp, "walls")
+        cache_dir = os.path.join(tmp, "thumbs")
+        os.makedirs(walls)
+
+        sources = [os.path.join(walls, f"photo-{i}.jpg") for i in range(jpegs)]
+        for i, path in enumerate(sources):
+            make_jpeg(path, i)
+        print(f"cold, per 3840x2160 JPEG ({jpegs} images)")
+        print(f"  full   {time_each(old_render, sources):8.1f} ms")
+        print(f"  draft  {time_each(render_thumbnail, sources):8.1f} ms")
+
+        print(f"pool, {jpegs} JPEGs")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            total, stall = render_with(lambda path: pool.submit(render_thumbnail, path), sources)
+        print(f"  threads   {total:8.1f} ms   main stall {stall:6.1f} ms")
+        pool = ThumbnailWorkerPool(os.cpu_count())
+        total, stall = render_with(pool.submit, sources)
+        pool.shutdown()
+        print(f"  processes {total:8.1f} ms   main stall {stall:6.1f} ms")
+
+        # Warm start: every wallpaper already has a thumbnail
+        for i in range(wallpapers):
+            open(os.path.join(walls, f"wall-{i:05}.png"), "wb").close()
+        cache = ThumbnailCache(cache_dir)
+        with os.scandir(walls) as entries:
+            for entry in entries:
+                cache.store(entry.path, entry.stat(), b"")
+                md5 = hashlib.md5(entry.name.encode("utf-8")).hexdigest()
+                open(os.path.join(cache_dir, f"{md5}.png"), "wb").close()
+        cache.save_index()
+
+        def exists_scan():
+            for name in os.listdir(walls):
+                md5 = hashlib.md5(name.encode("utf-8")).hexdigest()
+                os.path.exists(os.path.join(cache_dir, f"{md5}.png"))
+
+        def index_scan():
+            index = ThumbnailCache(cache_dir)
+            with os.scandir(walls) as entries:
+                for entry in entries:
+                    index.lookup(entry.path, entry.stat())
+
+        print(f"warm, {wallpapers + jpegs} wallpapers")
+        print(f"  exists {time_each(lambda _: exists_scan(), range(10)):8.1f} ms")
+        print(f"  index  {time_each(lambda _: index_scan(), range(10)):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -72,6 +72,7 @@ if os.path.exists(CONFIG_FILE):
 
 # Set configuration values using defaults from settings_constants
 WALLPAPERS_DIR = config.get("wallpapers_dir", DEFAULTS["wallpapers_dir"])
+WALLPAPERS_PROCESS_POOL = config.get("wallpapers_process_pool", DEFAULTS["wallpapers_process_pool"])
 BAR_POSITION = config.get("bar_position", DEFAULTS["bar_position"])
 VERTICAL = BAR_POSITION in ["Left", "Right"]
 CENTERED_BAR = config.get("centered_bar", DEFAULTS["centered_bar"])
@@ -113,4 +114,6 @@ BAR_COMPONENTS_VISIBILITY = {
 BAR_METRICS_DISKS = config.get("bar_metrics_disks", DEFAULTS["bar_metrics_disks"])
 METRICS_VISIBLE = config.get("metrics_visible", DEFAULTS["metrics_visible"])
 METRICS_SMALL_VISIBLE = config.get("metrics_small_visible", DEFAULTS["metrics_small_visible"])
+NOTIFICATION_HISTORY_MAX_COUNT = config.get("notification_history_max_count", DEFAULTS["notification_history_max_count"])
+NOTIFICATION_HISTORY_MAX_AGE_DAYS = config.get("notification_history_max_age_days", DEFAULTS["notification_history_max_age_days"])
 SELECTED_MONITORS = config.get("selected_monitors", DEFAULTS["selected_monitors"])
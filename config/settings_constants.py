@@ -53,6 +53,7 @@ DEFAULTS = {
     "prefix_css": "SUPER SHIFT",
     "suffix_css": "B",
     "wallpapers_dir": WALLPAPERS_DIR_DEFAULT,
+    "wallpapers_process_pool": True,
     "prefix_restart_inspector": "SUPER CTRL ALT",
     "suffix_restart_inspector": "B",
     "bar_position": "Top",
@@ -104,5 +105,7 @@ DEFAULTS = {
     },
     "limited_apps_history": ["Spotify"],
     "history_ignored_apps": ["Hyprshot"],
+    "notification_history_max_count": 1000,
+    "notification_history_max_age_days": 30,
     "selected_monitors": [],
 }
@@ -23,6 +23,8 @@ from modules.metrics import Battery, MetricsSmall, NetworkApplet
 from modules.systemprofiles import Systemprofiles
 from modules.systemtray import SystemTray
 from modules.weather import Weather
+from services.event_coalescer import WORKSPACE, get_event_coalescer
+from services.hyprland_state import get_hyprland_state
 from widgets.wayland import WaylandWindow as Window
 
 logger = logging.getLogger(__name__)
@@ -190,7 +192,7 @@ class Bar(Window):
         self.connection = get_hyprland_connection()
         self.button_tools.connect("enter_notify_event", self.on_button_enter)
         self.button_tools.connect("leave_notify_event", self.on_button_leave)
-        self.connection.connect("event::workspace", self._on_workspace_changed)
+        get_event_coalescer().connect("changed", self._on_hyprland_changes)
 
         self.systray = SystemTray()
 
@@ -508,25 +510,23 @@ class Bar(Window):
     def setup_workspaces(self):
         """Set up workspace rail and initialize with current workspace"""
         logger.info("Setting up workspaces")
+        hypr_state = get_hyprland_state()
+        if not hypr_state.is_ready:
+            hypr_state.connect("ready", lambda *_: self.setup_workspaces())
+            return
         try:
-            active_workspace = json.loads(
-                self.connection.send_command("j/activeworkspace").reply.decode()
-            )["id"]
-            self.update_rail(active_workspace, initial_setup=True)
+            self.update_rail(hypr_state.active_workspace_id, initial_setup=True)
         except Exception as e:
             logger.error(f"Error initializing workspace rail: {e}")
 
-    def _on_workspace_changed(self, _, event):
-        """Handle workspace change events directly"""
-        if event is not None and isinstance(event, HyprlandEvent) and event.data:
-            try:
-                workspace_id = int(event.data[0])
-                logger.info(f"Workspace changed to: {workspace_id}")
-                self.update_rail(workspace_id)
-            except (ValueError, IndexError) as e:
-                logger.error(f"Error processing workspace event: {e}")
-        else:
-            logger.warning(f"Invalid workspace event received: {event}")
+    def _on_hyprland_changes(self, _, changes):
+        """Move the rail once per frame to the last workspace switched to"""
+        latest = changes.latest(WORKSPACE)
+        if latest is None:
+            return
+        workspace_id = latest[0]
+        logger.info(f"Workspace changed to: {workspace_id}")
+        self.update_rail(workspace_id)
 
     def update_rail(self, workspace_id, initial_setup=False):
         """Update the workspace rail position based on the workspace button"""
@@ -1,17 +1,20 @@
 import configparser
 import ctypes
+import errno
 import os
 import re
 import signal
-import struct
 import subprocess
 from math import pi
 
-from fabric.utils.helpers import get_relative_path
+import numpy as np
+from fabric.utils.helpers import get_relative_path, monitor_file
 from fabric.widgets.overlay import Overlay
 from gi.repository import Gdk, GLib, Gtk
 from loguru import logger
 
+from utils.cava_frames import FrameReader
+
 
 def get_bars(file_path):
     config = configparser.ConfigParser()
@@ -22,6 +25,16 @@ CAVA_CONFIG = get_relative_path("../config/cavalcade/cava.ini")
 
 bars = get_bars(CAVA_CONFIG)
 
+# cava is SIGSTOPped this long after the last spectrum widget is unmapped...
+SUSPEND_GRACE_MS = 5000
+# ...and killed if it stays unused this long, releasing the audio capture stream
+STOP_AFTER_SUSPEND_S = 300
+# While widgets are shown, cava is also SIGSTOPped after this much silence
+SILENCE_SUSPEND_S = 30
+# and woken up for PROBE_WINDOW_MS every SILENCE_PROBE_S to listen for sound
+SILENCE_PROBE_S = 3
+PROBE_WINDOW_MS = 500
+
 def set_death_signal():
     """
     Set the death signal of the child process to SIGTERM so that if the parent
@@ -63,16 +76,23 @@ class Cava:
         self.env = dict(os.environ)
         self.env["LC_ALL"] = "en_US.UTF-8"  # not sure if it's necessary
 
-        is_16bit = True
-        self.byte_type, self.byte_size, self.byte_norm = ("H", 2, 65535) if is_16bit else ("B", 1, 255)
-
         if not os.path.exists(self.path):
             os.mkfifo(self.path)
 
         self.fifo_fd = None
         self.fifo_dummy_fd = None
+        self.reader = None
         self.io_watch_id = None
 
+        # Spectrum widgets currently mapped; cava only runs while this is > 0
+        self._users = 0
+        self._suspended = False
+        self._suspend_timer_id = None
+        self._stop_timer_id = None
+        self._probe_timer_id = None
+        self._probe_deadline = 0
+        self._last_sound = GLib.get_monotonic_time()
+
     def _run_process(self):
         try:
             self.process = subprocess.Popen(
@@ -91,43 +111,112 @@ class Cava:
         self.fifo_fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
         # Open dummy write end to prevent getting an EOF on our FIFO
         self.fifo_dummy_fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        self.reader = FrameReader(self.fifo_fd, self.bars, bit_depth=16)
         self.io_watch_id = GLib.io_add_watch(self.fifo_fd, GLib.IO_IN, self._io_callback)
 
     def _io_callback(self, source, condition):
-        chunk = self.byte_size * self.bars  # number of bytes for given format
+        if self.fifo_fd is None:
+            return False
         try:
-            if self.fifo_fd is None:
-                return False
-                
-            data = os.read(self.fifo_fd, chunk)
+            received = self.reader.drain()
         except OSError as e:
-            if e.errno == 11:  # EAGAIN - would block, normal for non-blocking
-                return True
-            elif e.errno == 9:  # EBADF - bad file descriptor
+            if e.errno == errno.EBADF:
                 GLib.idle_add(self.restart)
-                return False
-            else:
-                return False
-        except Exception:
             return False
 
-        # When no data is read, do not remove the IO watch immediately.
-        if len(data) < chunk:
-            if len(data) == 0:
-                # No data available, continue watching
-                return True
-            else:
-                return True
-
-        try:
-            fmt = self.byte_type * self.bars  # format string for struct.unpack
-            sample = [i / self.byte_norm for i in struct.unpack(fmt, data)]
-            GLib.idle_add(self.data_handler, sample)
-        except (struct.error, Exception):
-            return True
-            
+        # Handlers get the reader's frame array, which is updated in place
+        if received:
+            self.data_handler(self.reader.frame)
+            self._check_silence()
         return True
 
+    def _check_silence(self):
+        now = GLib.get_monotonic_time()
+        if self.reader.frame.any():
+            self._last_sound = now
+            self._probe_deadline = 0
+            return
+        if self._probe_deadline:
+            if now >= self._probe_deadline:
+                self._suspend_for_silence()
+        elif now - self._last_sound >= SILENCE_SUSPEND_S * 1_000_000:
+            logger.debug("[Cava] Silent, suspending")
+            self._suspend_for_silence()
+
+    def _suspend_for_silence(self):
+        self._probe_deadline = 0
+        self._suspend()
+        if self._probe_timer_id is None:
+            self._probe_timer_id = GLib.timeout_add_seconds(SILENCE_PROBE_S, self._probe)
+
+    def _probe(self):
+        self._probe_timer_id = None
+        if self._users > 0 and self._suspended:
+            self._probe_deadline = GLib.get_monotonic_time() + PROBE_WINDOW_MS * 1000
+            self._resume()
+        return False
+
+    def acquire(self):
+        """Register a mapped spectrum widget, starting or resuming cava."""
+        self._users += 1
+        if self._users > 1:
+            return
+        self._cancel_timers()
+        self._last_sound = GLib.get_monotonic_time()
+        self._probe_deadline = 0
+        if not self._started:
+            self.start()
+        elif self.process is None or self.process.poll() is not None:
+            self._run_process()
+        else:
+            self._resume()
+
+    def release(self):
+        """Unregister a spectrum widget; cava is suspended after a grace period."""
+        self._users = max(self._users - 1, 0)
+        if self._users == 0 and self._suspend_timer_id is None:
+            self._suspend_timer_id = GLib.timeout_add(SUSPEND_GRACE_MS, self._on_unused)
+
+    def _on_unused(self):
+        self._suspend_timer_id = None
+        if self._users == 0:
+            logger.debug("[Cava] No spectrum shown, suspending")
+            self._suspend()
+            self._stop_timer_id = GLib.timeout_add_seconds(STOP_AFTER_SUSPEND_S, self._on_unused_long)
+        return False
+
+    def _on_unused_long(self):
+        self._stop_timer_id = None
+        if self._users == 0 and self.process and self.process.poll() is None:
+            logger.debug("[Cava] Unused for a while, stopping")
+            self._suspended = False
+            # Stopped processes only act on SIGKILL until continued
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+            self.state = self.NONE
+        return False
+
+    def _cancel_timers(self):
+        for name in ("_suspend_timer_id", "_stop_timer_id", "_probe_timer_id"):
+            source_id = getattr(self, name)
+            if source_id is not None:
+                GLib.source_remove(source_id)
+                setattr(self, name, None)
+
+    def _suspend(self):
+        if self._suspended or not self.process or self.process.poll() is not None:
+            return
+        self.process.send_signal(signal.SIGSTOP)
+        self._suspended = True
+
+    def _resume(self):
+        if not self._suspended:
+            return
+        self._suspended = False
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGCONT)
+
     def _on_stop(self):
         if self.state == self.RESTARTING:
             self.start()
@@ -154,7 +243,10 @@ class Cava:
     def close(self):
         """Stop cava process"""
         self.state = self.CLOSING
-        
+        self._cancel_timers()
+        if self._suspended:
+            self._resume()
+
         # Stop IO watch first
         if self.io_watch_id:
             GLib.source_remove(self.io_watch_id)
@@ -206,10 +298,12 @@ class Spectrum:
     """Spectrum drawing"""
     def __init__(self):
         self.silence_value = 0
-        self.audio_sample = []
+        self._silent_sample = np.zeros(bars, dtype=np.float32)
+        self.audio_sample = self._silent_sample
+        self._heights = np.zeros(bars, dtype=np.float32)
+        self._bar_width = 0
+        self._bar_xs = []
         self.color = None
-        self._cached_color = None
-        self._color_file_mtime = 0
 
         self.area = Gtk.DrawingArea()
         self.area.connect("draw", self.redraw)
@@ -222,8 +316,15 @@ class Spectrum:
         self.silence = 10
         self.max_height = 12
 
+        # Frames are drawn from the frame clock, at most once per displayed frame
+        self._dirty = False
+        self._tick_id = 0
+
         self.area.connect("configure-event", self.size_update)
         self.color_update()
+        # colors.css is rewritten when the wallpaper scheme changes
+        self._color_monitor = monitor_file(get_relative_path("../styles/colors.css"))
+        self._color_monitor.connect("changed", self._on_colors_changed)
 
     def is_silence(self, value):
         """Check if volume level critically low during last iterations"""
@@ -232,36 +333,45 @@ class Spectrum:
 
     def update(self, data):
         """Audio data processing"""
-        self.color_update_cached()
-        self.audio_sample = data
-        if not self.is_silence(self.audio_sample[0]):
-            self.area.queue_draw()
+        if not self.is_silence(data[0]):
+            self.audio_sample = data
         elif self.silence_value == (self.silence + 1):
-            self.audio_sample = [0] * self.sizes.number
-            self.area.queue_draw()
+            self.audio_sample = self._silent_sample
+        else:
+            return
+        self._dirty = True
+        if not self._tick_id:
+            self._tick_id = self.area.add_tick_callback(self._on_tick)
+
+    def _on_tick(self, widget, frame_clock):
+        if not self._dirty:
+            # Nothing new since the last frame; stop ticking until data arrives
+            self._tick_id = 0
+            return False
+        self._dirty = False
+        self.area.queue_draw()
+        return True
 
     def redraw(self, widget, cr):
         """Draw spectrum graph"""
         cr.set_source_rgba(*self.color)
-        dx = 3
-
-        center_y = self.sizes.area.height / 2  # center vertical of the drawing area
-        for i, value in enumerate(self.audio_sample):
-            width = self.sizes.area.width / self.sizes.number - self.sizes.padding
-            radius = width / 2
-            height = max(self.sizes.bar.height * min(value, 1), self.sizes.zero) / 2
-            if height == self.sizes.zero / 2 + 1:
-                height *= 0.5
 
-            height = min(height, self.max_height)
+        heights = self._heights
+        np.minimum(self.audio_sample, 1.0, out=heights)
+        heights *= self.sizes.bar.height / 2
+        np.maximum(heights, self.sizes.zero / 2, out=heights)
+        heights[heights == self.sizes.zero / 2 + 1] *= 0.5
+        np.minimum(heights, self.max_height, out=heights)
 
+        width = self._bar_width
+        radius = width / 2
+        center_y = self.sizes.area.height / 2  # center vertical of the drawing area
+        for dx, height in zip(self._bar_xs, heights.tolist()):
             # Draw rectangle and arcs for rounded ends
             cr.rectangle(dx, center_y - height, width, height * 2)
             cr.arc(dx + radius, center_y - height, radius, 0, 2 * pi)
             cr.arc(dx + radius, center_y + height, radius, 0, 2 * pi)
-
             cr.close_path()
-            dx += width + self.sizes.padding
         cr.fill()
 
     def size_update(self, *args):
@@ -277,33 +387,13 @@ class Spectrum:
         self.sizes.bar.width = max(int(tw / self.sizes.number), 1)
         self.sizes.bar.height = self.sizes.area.height
 
-    def color_update_cached(self):
-        """Set drawing color with caching to avoid file reads on every frame"""
-        color_file = get_relative_path("../styles/colors.css")
-        try:
-            # Check if file has been modified
-            current_mtime = os.path.getmtime(color_file)
-            if current_mtime != self._color_file_mtime or self._cached_color is None:
-                self._color_file_mtime = current_mtime
-                
-                color = "#a5c8ff"  # default value
-                with open(color_file, "r") as f:
-                    content = f.read()
-                    m = re.search(r"--primary:\s*(#[0-9a-fA-F]{6})", content)
-                    if m:
-                        color = m.group(1)
-                
-                red = int(color[1:3], 16) / 255
-                green = int(color[3:5], 16) / 255
-                blue = int(color[5:7], 16) / 255
-                self._cached_color = Gdk.RGBA(red=red, green=green, blue=blue, alpha=1.0)
-                
-            self.color = self._cached_color
-        except Exception:
-            if self._cached_color is None:
-                # Fallback to default color
-                self._cached_color = Gdk.RGBA(red=0.647, green=0.784, blue=1.0, alpha=1.0)
-                self.color = self._cached_color
+        # Bar geometry only changes with the allocation, not per frame
+        self._bar_width = self.sizes.area.width / self.sizes.number - self.sizes.padding
+        self._bar_xs = [3 + i * (self._bar_width + self.sizes.padding) for i in range(self.sizes.number)]
+
+    def _on_colors_changed(self, *args):
+        self.color_update()
+        self.area.queue_draw()
 
     def color_update(self):
         """Set drawing color according to current settings by reading primary color from CSS"""
@@ -340,7 +430,21 @@ class SpectrumRender:
         self.cava = getCava()
         self.cava.register_handler(self.draw.update)
 
-        self.cava.start()
+        # cava only runs while at least one spectrum is on screen
+        self._acquired = False
+        self.draw.area.connect("map", self._on_map)
+        self.draw.area.connect("unmap", self._on_unmap)
+        self.draw.area.connect("destroy", self._on_unmap)
+
+    def _on_map(self, *_):
+        if not self._acquired:
+            self._acquired = True
+            self.cava.acquire()
+
+    def _on_unmap(self, *_):
+        if self._acquired:
+            self._acquired = False
+            self.cava.release()
 
     def get_spectrum_box(self):
         # Get the spectrum box
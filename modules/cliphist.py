@@ -4,7 +4,6 @@ import subprocess
 import sys
 import tempfile
 
-from fabric.utils import idle_add, remove_handler
 from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
@@ -12,9 +11,14 @@ from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import Gdk, GdkPixbuf, GLib
+from gi.repository import Gdk, GLib
 
+import config.data as data
 import modules.icons as icons
+from services.clipboard_history import entry_id, get_clipboard_history
+from utils.clipboard_previews import ClipboardPreviewCache
+from utils.clipboard_search import MIN_QUERY_LENGTH, ClipboardSearchIndex
+from widgets.virtual_list import VirtualList
 
 
 class ClipHistory(Box):
@@ -27,16 +31,43 @@ class ClipHistory(Box):
         )
 
         self.tmp_dir = tempfile.mkdtemp(prefix="cliphist-")
-        self.image_cache = {}
-        
+        self.previews = ClipboardPreviewCache(f"{data.CACHE_DIR}/clipboard_previews")
+        # Full text of text clips, so matches beyond the preview line are found
+        self.search_index = ClipboardSearchIndex(f"{data.CACHE_DIR}/clipboard_index.sqlite")
+        self._query = ""
+        self._preview_matches = []
+        self._index_matches = {}  # cliphist id -> snippet markup or None
+
         self.notch = kwargs["notch"]
         self.selected_index = -1
-        self._arranger_handler = 0
-        self.clipboard_items = []
-        self._loading = False
-        self._pending_updates = False
-
-        self.viewport = Box(name="viewport", spacing=4, orientation="v")
+        self._is_open = False
+        # Entries stay loaded between opens; each open only merges new ones
+        self.history = get_clipboard_history()
+        self.history.connect("changed", self._on_history_changed)
+
+        self.viewport = VirtualList(
+            name="viewport",
+            spacing=4,
+            create_row=self.create_row,
+            bind_row=self.bind_row,
+            row_kind=lambda item: "image" if self.is_image_data(self.split_item(item)[1]) else "text",
+            placeholder=Box(
+                name="no-clip-container",
+                orientation="v",
+                h_align="center",
+                v_align="center",
+                h_expand=True,
+                v_expand=True,
+                children=[
+                    Label(
+                        name="no-clip",
+                        markup=icons.clipboard,
+                        h_align="center",
+                        v_align="center",
+                    )
+                ],
+            ),
+        )
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Clipboard History...",
@@ -96,241 +127,153 @@ class ClipHistory(Box):
 
     def close(self):
         """Close the clipboard history panel"""
-        self.viewport.children = []
+        self._is_open = False
+        self.previews.cancel()
+        self.search_index.cancel()
+        self.viewport.clear()
         self.selected_index = -1
         self.notch.close_notch()
 
     def open(self):
-        """Open the clipboard history panel and load items"""
-        if self._loading:
-            return
-        self._loading = True
+        """Open the clipboard history panel and show the known items right away"""
+        self._is_open = True
         self.search_entry.set_text("")
         self.search_entry.grab_focus()
-
-        # Use GLib.Thread for proper async execution
-        GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-
-    def _load_clipboard_items_thread(self, user_data):
-        """Background thread worker for loading clipboard items"""
-        try:
-            result = subprocess.run(
-                ["cliphist", "list"], 
-                capture_output=True, 
-                check=True
-            )
-            # Decode stdout with error handling
-            stdout_str = result.stdout.decode('utf-8', errors='replace')
-            lines = stdout_str.strip().split('\n')
-            new_items = []
-            for line in lines:
-                if not line or "<meta http-equiv" in line:
-                    continue
-                new_items.append(line)
-            # Update UI from main thread
-            GLib.idle_add(self._update_items, new_items)
-        except subprocess.CalledProcessError as e:
-            print(f"Error loading clipboard history: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"Unexpected error: {e}", file=sys.stderr)
-        finally:
-            GLib.idle_add(self._loading_finished)
-    
-    def _loading_finished(self):
-        """Handle loading completion on main thread"""
-        self._loading = False
-        if self._pending_updates:
-            self._pending_updates = False
-            GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-        return False
-
-    def _update_items(self, new_items):
-        """Update the items list from main thread"""
-        self.clipboard_items = new_items
         self.display_clipboard_items()
-
-    def display_clipboard_items(self, filter_text=""):
-        """Display clipboard items in the viewport"""
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.children = []
-        self.selected_index = -1
-        
-
-        filtered_items = []
-        for item in self.clipboard_items:
-
-            content = item.split('\t', 1)[1] if '\t' in item else item
-            if filter_text.lower() in content.lower():
-                filtered_items.append(item)
-        
-
-        if not filtered_items:
-
-            container = Box(
-                name="no-clip-container",
-                orientation="v",
-                h_align="center",
-                v_align="center",
-                h_expand=True,
-                v_expand=True
-            )
-            
-
-            label = Label(
-                name="no-clip",
-                markup=icons.clipboard,
-                h_align="center",
-                v_align="center",
-            )
-            
-            container.add(label)
-            self.viewport.add(container)
-            return
-            
-
-        self._display_items_batch(filtered_items, 0, 10)
-
-    def _display_items_batch(self, items, start, batch_size):
-        """Display items in batches to keep UI responsive"""
-        end = min(start + batch_size, len(items))
-        
-        for i in range(start, end):
-            item = items[i]
-            self.viewport.add(self.create_clipboard_item(item))
-        
-
-        if end < len(items):
-            GLib.idle_add(self._display_items_batch, items, end, batch_size)
+        self.history.sync()
+
+    def _on_history_changed(self, *_):
+        self.previews.prune(str(entry_id(line)) for line in self.history.items)
+        self.search_index.sync([
+            entry_id(line) for line in self.history.items
+            if not self.is_image_data(self.split_item(line)[1])
+        ])
+        if self._is_open:
+            self.display_clipboard_items(self.search_entry.get_text(), refresh=True)
+
+    def display_clipboard_items(self, filter_text="", refresh=False):
+        """Display clipboard items in the viewport; `refresh` keeps scroll and selection"""
+        self._query = filter_text
+        if not refresh:
+            self._index_matches = {}
+        query = filter_text.lower()
+        self._preview_matches = [
+            item for item in self.history.items
+            if query in self.split_item(item)[1].lower()
+        ]
+        self._show_matches(refresh)
+
+        # Preview matches show at once; full-text matches stream in after
+        if len(filter_text) >= MIN_QUERY_LENGTH:
+            self.search_index.search(filter_text, self._on_search_results)
         else:
+            self.search_index.cancel()
+
+    def _on_search_results(self, snippets, done):
+        self._index_matches.update(snippets)
+        self._show_matches(refresh=True)
+
+    def _show_matches(self, refresh=False):
+        if self._index_matches:
+            preview_matches = set(self._preview_matches)
+            filtered_items = [
+                item for item in self.history.items
+                if item in preview_matches or entry_id(item) in self._index_matches
+            ]
+        else:
+            filtered_items = self._preview_matches
+        selected_index = 0 if self._query and filtered_items else -1
+        if refresh:
+            # Later chunks and history changes keep the user's place
+            selected = self.viewport.get_item(self.selected_index)
+            if selected is not None:
+                selected_id = entry_id(selected)
+                selected_index = next(
+                    (i for i, item in enumerate(filtered_items) if entry_id(item) == selected_id),
+                    selected_index,
+                )
+        self.viewport.set_items(filtered_items, selected_index=selected_index, keep_scroll=refresh)
+        self.selected_index = self.viewport.selected_index
+
+    def _highlight_preview(self, text):
+        """Escape a preview line for markup, bolding the query if it occurs"""
+        start = text.lower().find(self._query.lower()) if self._query else -1
+        if start == -1:
+            return GLib.markup_escape_text(text)
+        end = start + len(self._query)
+        return (
+            GLib.markup_escape_text(text[:start])
+            + f"<b>{GLib.markup_escape_text(text[start:end])}</b>"
+            + GLib.markup_escape_text(text[end:])
+        )
 
-            if self.search_entry.get_text() and self.viewport.get_children():
-                self.update_selection(0)
-
-    def create_clipboard_item(self, item):
-        """Create a button for a clipboard item"""
-
+    @staticmethod
+    def split_item(item):
+        """Split a `cliphist list` line into its id and content"""
         parts = item.split('\t', 1)
         item_id = parts[0] if len(parts) > 1 else "0"
         content = parts[1] if len(parts) > 1 else item
-        
-
-        display_text = content.strip()
-        if len(display_text) > 100:
-            display_text = display_text[:97] + "..."
-        
-
-        is_image = self.is_image_data(content)
-        
-        if is_image:
-
-            button = Button(
-                name="slot-button",
-                child=Box(
-                    name="slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Image(name="clip-icon", h_align="start"),
-                        Label(
-                            name="clip-label",
-                            label="[Image]",
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="start",
-                            h_expand=True,
-                        ),
-                    ],
-                ),
-                tooltip_text="Image in clipboard",
-                on_clicked=lambda *_, id=item_id: self.paste_item(id),
-            )
-
-            self._load_image_preview_async(item_id, button)
+        return item_id, content
+
+    def create_row(self, kind):
+        """Create a pooled row for text or image clipboard items"""
+        if kind == "image":
+            icon = Image(name="clip-icon", h_align="start")
+            # Fixed size keeps every image row the same height while previews load
+            icon.set_size_request(72, 72)
         else:
-
-            button = self.create_text_item_button(item_id, display_text)
-        
-
-        button.connect("key-press-event", lambda widget, event, id=item_id: self.on_item_key_press(widget, event, id))
-        
-
+            icon = Label(name="clip-icon", markup=icons.clip_text, h_align="start")
+        label = Label(
+            name="clip-label",
+            ellipsization="end",
+            v_align="center",
+            h_align="start",
+            h_expand=True,
+        )
+        button = Button(
+            name="slot-button",
+            child=Box(name="slot-box", orientation="h", spacing=10, children=[icon, label]),
+            on_clicked=lambda b, *_: self.paste_item(b.item_id),
+        )
+        button.icon, button.text_label = icon, label
+        button.item_id = None
+        button.connect("key-press-event", lambda widget, event: self.on_item_key_press(widget, event, widget.item_id))
         button.set_can_focus(True)
         button.add_events(Gdk.EventMask.KEY_PRESS_MASK)
-            
         return button
 
-    def _load_image_preview_async(self, item_id, button):
-        """Load image preview asynchronously using background thread"""
-        GLib.Thread.new("image-preview", self._load_image_preview_thread, (item_id, button))
-
-    def _load_image_preview_thread(self, data):
-        """Background thread worker for loading image preview"""
-        item_id, button = data
-        try:
-            if item_id in self.image_cache:
-                pixbuf = self.image_cache[item_id]
-                GLib.idle_add(self._update_image_button, button, pixbuf)
-                return
-            
-            result = subprocess.run(
-                ["cliphist", "decode", item_id],
-                capture_output=True,
-                check=True
-            )
-            loader = GdkPixbuf.PixbufLoader()
-            loader.write(result.stdout)
-            loader.close()
-            pixbuf = loader.get_pixbuf()
-            width, height = pixbuf.get_width(), pixbuf.get_height()
-            max_size = 72
-            if width > height:
-                new_width = max_size
-                new_height = int(height * (max_size / width))
+    def bind_row(self, button, item, index):
+        """Show a clipboard item in a pooled row"""
+        item_id, content = self.split_item(item)
+        button.item_id = item_id
+
+        if isinstance(button.icon, Image):
+            button.text_label.set_label("[Image]")
+            button.set_tooltip_text("Image in clipboard")
+            pixbuf = self.previews.get(item_id)
+            if pixbuf is not None:
+                button.icon.set_from_pixbuf(pixbuf)
             else:
-                new_height = max_size
-                new_width = int(width * (max_size / height))
-            pixbuf = pixbuf.scale_simple(new_width, new_height, GdkPixbuf.InterpType.BILINEAR)
-            self.image_cache[item_id] = pixbuf
-            
-            GLib.idle_add(self._update_image_button, button, pixbuf)
-        except Exception as e:
-            print(f"Error loading image preview: {e}", file=sys.stderr)
+                button.icon.clear()
+                self.previews.request(item_id, lambda pixbuf: self._update_image_button(button, item_id, pixbuf))
+            return
+
+        display_text = content.strip()
+        if len(display_text) > 100:
+            display_text = display_text[:97] + "..."
+        snippet = self._index_matches.get(entry_id(item))
+        if snippet and self._query.lower() not in display_text.lower():
+            # The match is past the preview line; show where it is instead
+            button.text_label.set_markup(snippet)
+        else:
+            button.text_label.set_markup(self._highlight_preview(display_text))
+        button.set_tooltip_text(display_text)
 
-    def _update_image_button(self, button, pixbuf):
+    def _update_image_button(self, button, item_id, pixbuf):
         """Update the button with the loaded image preview"""
-        box = button.get_child()
-        if box and len(box.get_children()) > 0:
-            image_widget = box.get_children()[0]
-            if isinstance(image_widget, Image):
-                image_widget.set_from_pixbuf(pixbuf)
-
-    def create_text_item_button(self, item_id, display_text):
-        """Create a button for a text clipboard item"""
-        return Button(
-            name="slot-button",
-            child=Box(
-                name="slot-box",
-                orientation="h",
-                spacing=10,
-                children=[
-                    Label(
-                        name="clip-icon",
-                        markup=icons.clip_text,
-                        h_align="start",
-                    ),
-                    Label(
-                        name="clip-label",
-                        label=display_text,
-                        ellipsization="end",
-                        v_align="center",
-                        h_align="start",
-                        h_expand=True,
-                    ),
-                ],
-            ),
-            tooltip_text=display_text,
-            on_clicked=lambda *_: self.paste_item(item_id),
-        )
+        # The pooled row may have been rebound to another item meanwhile
+        if button.item_id == item_id:
+            button.icon.set_from_pixbuf(pixbuf)
 
     def is_image_data(self, content):
         """Determine if clipboard content is likely an image"""
@@ -365,36 +308,14 @@ class ClipHistory(Box):
         except subprocess.CalledProcessError as e:
             print(f"Error pasting clipboard item: {e}", file=sys.stderr)
 
-    def delete_item(self, item_id):
-        """Delete the selected clipboard item (async)"""
-        GLib.Thread.new("delete-item", self._delete_item_thread, item_id)
-
-    def _delete_item_thread(self, item_id):
-        """Background thread worker for deleting clipboard item"""
-        try:
-            subprocess.run(
-                ["cliphist", "delete", item_id],
-                check=True
-            )
-            self._pending_updates = True
-            if not self._loading:
-                GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-        except subprocess.CalledProcessError as e:
-            print(f"Error deleting clipboard item: {e}", file=sys.stderr)
+    def delete_item(self, item_line):
+        """Delete a clipboard item, given its `cliphist list` line"""
+        self.previews.forget(self.split_item(item_line)[0])
+        self.history.delete(item_line)
 
     def clear_history(self):
-        """Clear all clipboard history (async)"""
-        GLib.Thread.new("clear-history", self._clear_history_thread, None)
-
-    def _clear_history_thread(self, user_data):
-        """Background thread worker for clearing clipboard history"""
-        try:
-            subprocess.run(["cliphist", "wipe"], check=True)
-            self._pending_updates = True
-            if not self._loading:
-                GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-        except subprocess.CalledProcessError as e:
-            print(f"Error clearing clipboard history: {e}", file=sys.stderr)
+        """Clear all clipboard history"""
+        self.history.wipe()
 
     def filter_items(self, entry, *_):
         """Filter clipboard items based on search text"""
@@ -421,26 +342,13 @@ class ClipHistory(Box):
 
     def update_selection(self, new_index):
         """Update the selected item in the viewport"""
-        children = self.viewport.get_children()
-        
-
-        if self.selected_index != -1 and self.selected_index < len(children):
-            current_button = children[self.selected_index]
-            current_button.get_style_context().remove_class("selected")
-            
-
-        if new_index != -1 and new_index < len(children):
-            new_button = children[new_index]
-            new_button.get_style_context().add_class("selected")
-            self.selected_index = new_index
-            self.scroll_to_selected(new_button)
-        else:
-            self.selected_index = -1
+        self.viewport.select(new_index)
+        self.selected_index = self.viewport.selected_index
 
     def move_selection(self, delta):
         """Move the selection up or down"""
-        children = self.viewport.get_children()
-        if not children:
+        count = len(self.viewport)
+        if not count:
             return
             
 
@@ -449,56 +357,25 @@ class ClipHistory(Box):
         else:
             new_index = self.selected_index + delta
             
-        new_index = max(0, min(new_index, len(children) - 1))
+        new_index = max(0, min(new_index, count - 1))
         self.update_selection(new_index)
 
-    def scroll_to_selected(self, button):
-        """Scroll to ensure the selected item is visible"""
-        def scroll():
-            adj = self.scrolled_window.get_vadjustment()
-            alloc = button.get_allocation()
-            if alloc.height == 0:
-                return False
-
-            y = alloc.y
-            height = alloc.height
-            page_size = adj.get_page_size()
-            current_value = adj.get_value()
-
-            visible_top = current_value
-            visible_bottom = current_value + page_size
-
-            if y < visible_top:
-
-                adj.set_value(y)
-            elif y + height > visible_bottom:
-
-                new_value = y + height - page_size
-                adj.set_value(new_value)
-            return False
-        GLib.idle_add(scroll)
-
     def use_selected_item(self):
         """Use (paste) the selected clipboard item"""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1 or self.selected_index >= len(self.clipboard_items):
+        item_line = self.viewport.get_item(self.selected_index)
+        if item_line is None:
             return
-            
 
-        item_line = self.clipboard_items[self.selected_index]
         item_id = item_line.split('\t', 1)[0]
         self.paste_item(item_id)
 
     def delete_selected_item(self):
         """Delete the selected clipboard item"""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1:
+        item_line = self.viewport.get_item(self.selected_index)
+        if item_line is None:
             return
-            
 
-        item_line = self.clipboard_items[self.selected_index]
-        item_id = item_line.split('\t', 1)[0]
-        self.delete_item(item_id)
+        self.delete_item(item_line)
 
     def on_item_key_press(self, widget, event, item_id):
         """Handle key press events on clipboard items"""
@@ -514,6 +391,5 @@ class ClipHistory(Box):
             if hasattr(self, 'tmp_dir') and os.path.exists(self.tmp_dir):
                 import shutil
                 shutil.rmtree(self.tmp_dir)
-            self.image_cache.clear()
         except Exception as e:
             print(f"Error cleaning up temporary files: {e}", file=sys.stderr)
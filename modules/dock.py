@@ -3,9 +3,8 @@ import logging
 
 import cairo
 from fabric.hyprland.widgets import get_hyprland_connection
-from fabric.utils import (exec_shell_command, exec_shell_command_async,
-                          get_relative_path, idle_add, remove_handler)
-from fabric.utils.helpers import get_desktop_applications
+from fabric.utils import (exec_shell_command_async, get_relative_path,
+                          idle_add, monitor_file, remove_handler)
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -15,6 +14,10 @@ from gi.repository import Gdk, GLib, Gtk
 
 import config.data as data
 from modules.corners import MyCorner
+from services.desktop_apps import get_desktop_app_index, normalize_window_class
+from services.event_coalescer import ACTIVE_WINDOW, CLIENTS, WINDOW_TITLE, WORKSPACE, get_event_coalescer
+from services.hyprland_state import get_hyprland_state
+from utils.hyprland_socket import get_hyprctl_client
 from utils.icon_resolver import IconResolver
 from widgets.wayland import WaylandWindow as Window
 
@@ -27,8 +30,7 @@ def read_config():
             config_data = json.load(file)
             
         if "pinned_apps" in config_data and config_data["pinned_apps"] and isinstance(config_data["pinned_apps"][0], str):
-            all_apps = get_desktop_applications()
-            app_map = {app.name: app for app in all_apps if app.name}
+            app_map = {app.name: app for app in get_desktop_app_index().get_apps() if app.name}
             
             old_pinned = config_data["pinned_apps"]
             config_data["pinned_apps"] = []
@@ -144,12 +146,25 @@ class Dock(Window):
 
         self.config = read_config()
         self.conn = get_hyprland_connection()
+        self.state = get_hyprland_state()
         self.icon_resolver = IconResolver() 
         self.pinned = self.config.get("pinned_apps", [])
         self.config_path = get_relative_path("../config/dock.json")
         self.app_map = {}
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
+        self.app_index = get_desktop_app_index()
+        self._all_apps = self.app_index.get_apps()
+        self.app_identifiers = self.app_index.identifiers
+
+        # Reconciler state: buttons keyed by pinned item / window class, plus
+        # match caches that only need rebuilding when pinned apps or the app
+        # map change.
+        self._buttons = {}
+        self._separator = None
+        self._pinned_entries = []
+        self._pinned_matches = []
+        self._pinned_matches_key = None
+        self._open_app_cache = {}
+        self._rebuild_pinned_index()
         
         self.hide_id = None
         self._arranger_handler = None
@@ -285,39 +300,36 @@ class Dock(Window):
         self.view.connect("drag-begin", self.on_drag_begin)
         self.view.connect("drag-end", self.on_drag_end)
 
-        if self.conn.ready:
+        # update_dock() also settles the reveal state, which is re-evaluated
+        # from hover/drag/config events instead of a polling timer.
+        if self.state.is_ready:
             self.update_dock()
-            if not self.integrated_mode: GLib.timeout_add(500, self.check_occlusion_state)
         else:
-            self.conn.connect("event::ready", self.update_dock)
-            if not self.integrated_mode: self.conn.connect("event::ready", lambda *args: GLib.timeout_add(250, self.check_occlusion_state))
+            self.state.connect("ready", self.update_dock)
 
-        for ev in ("activewindow", "openwindow", "closewindow", "changefloatingmode"):
-            self.conn.connect(f"event::{ev}", self.update_dock)
+        # A workspace switch or window move is one batch per frame, not one
+        # rebuild per socket2 event.
+        get_event_coalescer().connect("changed", self._on_hyprland_changes)
         
-        if not self.integrated_mode:
-            self.conn.connect("event::workspace", self.check_hide)
-        
-        GLib.timeout_add_seconds(2, self.check_config_change)
+        self.app_index.connect("changed", self._on_apps_changed)
+
+        # Watch dock.json instead of re-reading it every couple of seconds
+        self._config_monitor = monitor_file(self.config_path)
+        self._config_monitor.connect("changed", lambda *_: self.check_config_change())
             
-    def _build_app_identifiers_map(self):
-        identifiers = {}
-        for app in self._all_apps:
-            if app.name: identifiers[app.name.lower()] = app
-            if app.display_name: identifiers[app.display_name.lower()] = app
-            if app.window_class: identifiers[app.window_class.lower()] = app
-            if app.executable: identifiers[app.executable.split('/')[-1].lower()] = app
-            if app.command_line: identifiers[app.command_line.split()[0].split('/')[-1].lower()] = app
-        return identifiers
+    def _on_hyprland_changes(self, _, changes):
+        # Titles change in place, without a clients-changed
+        if changes.has_any(CLIENTS, ACTIVE_WINDOW, WINDOW_TITLE):
+            self.update_dock()
+        if WORKSPACE in changes and not self.integrated_mode:
+            self.check_hide()
+
+    def _on_apps_changed(self, *args):
+        self.update_app_map()
+        self.update_dock()
 
     def _normalize_window_class(self, class_name):
-        if not class_name: return ""
-        normalized = class_name.lower()
-        suffixes = [".bin", ".exe", ".so", "-bin", "-gtk"]
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)]
-        return normalized
+        return normalize_window_class(class_name)
         
     def _classes_match(self, class1, class2):
         if not class1 or not class2: return False
@@ -398,9 +410,74 @@ class Dock(Window):
         return None
 
     def update_app_map(self):
-        self._all_apps = get_desktop_applications()
+        self._all_apps = self.app_index.get_apps()
         self.app_map = {app.name: app for app in self._all_apps if app.name}
-        self.app_identifiers = self._build_app_identifiers_map()
+        self.app_identifiers = self.app_index.identifiers
+        self._open_app_cache.clear()
+        self._rebuild_pinned_index()
+
+    def _rebuild_pinned_index(self):
+        """Precompute the lowercase identifiers each pinned app can match a window class by."""
+        self._pinned_entries = []
+        for app_data_item in self.pinned:
+            app = self.find_app(app_data_item)
+            possible_identifiers = []
+
+            if isinstance(app_data_item, dict):
+                for key in ["window_class", "executable", "command_line", "name", "display_name"]:
+                    if key in app_data_item and app_data_item[key]: possible_identifiers.append(app_data_item[key].lower())
+            elif isinstance(app_data_item, str): possible_identifiers.append(app_data_item.lower())
+
+            if app:
+                if app.window_class: possible_identifiers.append(app.window_class.lower())
+                if app.executable: possible_identifiers.append(app.executable.split('/')[-1].lower())
+                if app.command_line:
+                    cmd_parts = app.command_line.split()
+                    if cmd_parts: possible_identifiers.append(cmd_parts[0].split('/')[-1].lower())
+                if app.name: possible_identifiers.append(app.name.lower())
+                if app.display_name: possible_identifiers.append(app.display_name.lower())
+
+            self._pinned_entries.append((app_data_item, list(dict.fromkeys(possible_identifiers))))
+        self._pinned_matches_key = None
+
+    def _match_running_class(self, identifiers, running_windows):
+        for identifier in identifiers:
+            if identifier in running_windows: return identifier
+            normalized = self._normalize_window_class(identifier)
+            if normalized in running_windows: return normalized
+            if len(identifier) >= 3:
+                for window_class_key in running_windows:
+                    if identifier in window_class_key: return window_class_key
+        return None
+
+    def _get_pinned_matches(self, running_windows):
+        """Matched window class per pinned app, recomputed only when the set of running classes changes."""
+        key = frozenset(running_windows)
+        if key != self._pinned_matches_key:
+            self._pinned_matches = [
+                self._match_running_class(identifiers, running_windows)
+                for _, identifiers in self._pinned_entries
+            ]
+            self._pinned_matches_key = key
+        return self._pinned_matches
+
+    def _resolve_open_app(self, class_name, instances):
+        title = instances[0].get("title", "") if instances else ""
+        potential_name = title.split(" - ")[0].strip()
+        cache_key = (class_name, potential_name)
+        if cache_key in self._open_app_cache:
+            return self._open_app_cache[cache_key]
+
+        app = self.app_identifiers.get(class_name)
+        if not app:
+            app = self.app_identifiers.get(self._normalize_window_class(class_name))
+        if not app: app = self.find_app_by_key(class_name)
+        if not app and len(potential_name) > 2: app = self.find_app_by_key(potential_name)
+
+        # Misses are cached too; update_app_map() clears the cache when the
+        # desktop app index picks up newly installed entries
+        self._open_app_cache[cache_key] = app
+        return app
 
     def create_button(self, app_identifier, instances):
         desktop_app = self.find_app(app_identifier)
@@ -428,12 +505,13 @@ class Dock(Window):
 
         button = Button(
             child= Box(name="dock-icon", orientation="v", h_align="center", children=items), 
-            on_clicked=lambda *a: self.handle_app(app_identifier, instances, desktop_app),
+            on_clicked=lambda b, *a: self.handle_app(b.app_identifier, b.instances, b.desktop_app),
             tooltip_text=tooltip, name="dock-app-button",
         )
         button.app_identifier = app_identifier
         button.desktop_app = desktop_app
         button.instances = instances
+        button.instances_key = self._instances_key(instances)
         if instances: button.add_style_class("instance")
 
         button.drag_source_set(
@@ -453,6 +531,24 @@ class Dock(Window):
         button.connect("enter-notify-event", self._on_child_enter)
         return button
 
+    @staticmethod
+    def _instances_key(instances):
+        # Client dicts are updated in place by the state store, so compare
+        # what the button shows instead of the dicts themselves
+        return tuple((c["address"], c.get("title")) for c in instances)
+
+    def _update_button(self, button, instances):
+        """Refresh a reused button's window list, indicator and tooltip in place."""
+        key = self._instances_key(instances)
+        button.instances = instances
+        if button.instances_key == key:
+            return
+        button.instances_key = key
+        if instances: button.add_style_class("instance")
+        else: button.remove_style_class("instance")
+        if not button.desktop_app and instances and instances[0].get("title"):
+            button.set_tooltip_text(instances[0]["title"])
+
     def handle_app(self, app_identifier, instances, desktop_app=None):
         if not instances:
             if not desktop_app: desktop_app = self.find_app(app_identifier)
@@ -473,7 +569,7 @@ class Dock(Window):
             focused = self.get_focused()
             idx = next((i for i, inst in enumerate(instances) if inst["address"] == focused), -1)
             next_inst = instances[(idx + 1) % len(instances)]
-            exec_shell_command(f"hyprctl dispatch focuswindow address:{next_inst['address']}")
+            get_hyprctl_client().dispatch(f"focuswindow address:{next_inst['address']}")
 
     def _on_child_enter(self, widget, event):
         if self.integrated_mode: return False 
@@ -517,8 +613,18 @@ class Dock(Window):
                 self.dock_revealer.set_reveal_child(False)
             self.dock_full.add_style_class("occluded")
 
+    def _pinned_key(self, app_data_item):
+        if isinstance(app_data_item, dict):
+            return ("pinned", app_data_item.get("name") or json.dumps(app_data_item, sort_keys=True))
+        return ("pinned", str(app_data_item))
+
+    def _get_separator(self):
+        if self._separator is None:
+            separator_orientation = Gtk.Orientation.VERTICAL if self.view.get_orientation() == Gtk.Orientation.HORIZONTAL else Gtk.Orientation.HORIZONTAL
+            self._separator = Box(orientation=separator_orientation, v_expand=False, h_expand=False, h_align="center", v_align="center", name="dock-separator")
+        return self._separator
+
     def update_dock(self, *args):
-        self.update_app_map()
         arranger_handler = getattr(self, "_arranger_handler", None)
         if arranger_handler: remove_handler(arranger_handler)
         clients = self.get_clients()
@@ -538,63 +644,25 @@ class Dock(Window):
             if normalized_id != window_id:
                 running_windows.setdefault(normalized_id, []).extend(running_windows[window_id])
         
-        pinned_buttons = []
+        # Desired (key, identifier, instances) rows, pinned apps first
+        pinned_rows = []
         used_window_classes = set()
+        seen_keys = set()
         
-        for app_data_item in self.pinned:
-            app = self.find_app(app_data_item)
-            instances = []
-            matched_class = None
-            possible_identifiers = []
-            
-            if isinstance(app_data_item, dict):
-                for key in ["window_class", "executable", "command_line", "name", "display_name"]:
-                    if key in app_data_item and app_data_item[key]: possible_identifiers.append(app_data_item[key].lower())
-            elif isinstance(app_data_item, str): possible_identifiers.append(app_data_item.lower())
-            
-            if app:
-                if app.window_class: possible_identifiers.append(app.window_class.lower())
-                if app.executable: possible_identifiers.append(app.executable.split('/')[-1].lower())
-                if app.command_line:
-                    cmd_parts = app.command_line.split()
-                    if cmd_parts: possible_identifiers.append(cmd_parts[0].split('/')[-1].lower())
-                if app.name: possible_identifiers.append(app.name.lower())
-                if app.display_name: possible_identifiers.append(app.display_name.lower())
-            
-            possible_identifiers = list(set(possible_identifiers)) 
-            
-            for identifier in possible_identifiers:
-                if identifier in running_windows:
-                    instances = running_windows[identifier]; matched_class = identifier; break
-                normalized = self._normalize_window_class(identifier)
-                if normalized in running_windows:
-                    instances = running_windows[normalized]; matched_class = normalized; break
-                for window_class_key in running_windows: 
-                    if len(identifier) >= 3 and identifier in window_class_key:
-                        instances = running_windows[window_class_key]; matched_class = window_class_key
-                        break
-                if matched_class: break
-            
+        for (app_data_item, _), matched_class in zip(self._pinned_entries, self._get_pinned_matches(running_windows)):
+            instances = running_windows[matched_class] if matched_class else []
             if matched_class:
                 used_window_classes.add(matched_class)
                 used_window_classes.add(self._normalize_window_class(matched_class))
-            
-            pinned_buttons.append(self.create_button(app_data_item, instances))
+            key = self._pinned_key(app_data_item)
+            while key in seen_keys: key = key + ("dup",)
+            seen_keys.add(key)
+            pinned_rows.append((key, app_data_item, instances))
         
-        open_buttons = []
+        open_rows = []
         for class_name, instances in running_windows.items():
             if class_name not in used_window_classes:
-                app = None
-                app = self.app_identifiers.get(class_name)
-                if not app:
-                    norm_class = self._normalize_window_class(class_name)
-                    app = self.app_identifiers.get(norm_class)
-                if not app: app = self.find_app_by_key(class_name)
-                if not app and instances and instances[0].get("title"):
-                    title = instances[0].get("title", "")
-                    potential_name = title.split(" - ")[0].strip()
-                    if len(potential_name) > 2: app = self.find_app_by_key(potential_name)
-                
+                app = self._resolve_open_app(class_name, instances)
                 if app:
                     app_data_obj = {
                         "name": app.name, "display_name": app.display_name,
@@ -603,16 +671,49 @@ class Dock(Window):
                     }
                     identifier = app_data_obj
                 else: identifier = class_name
-                open_buttons.append(self.create_button(identifier, instances))
-
-        children = pinned_buttons
-        separator_orientation = Gtk.Orientation.VERTICAL if self.view.get_orientation() == Gtk.Orientation.HORIZONTAL else Gtk.Orientation.HORIZONTAL
-        if pinned_buttons and open_buttons:
-            children += [Box(orientation=separator_orientation, v_expand=False, h_expand=False, h_align="center", v_align="center", name="dock-separator")]
-        children += open_buttons
-        
-        self.view.children = children
-        if not self.integrated_mode:
+                open_rows.append((("open", class_name), identifier, instances))
+
+        # Reconcile: reuse buttons by key, create only new ones, drop stale ones
+        structure_changed = False
+        last_pinned_key = pinned_rows[-1][0] if pinned_rows else None
+        desired_children = []
+        new_buttons = {}
+        for key, identifier, instances in pinned_rows + open_rows:
+            button = self._buttons.get(key)
+            if button is not None and button.app_identifier != identifier:
+                button = None
+            if button is None:
+                button = self.create_button(identifier, instances)
+                structure_changed = True
+            else:
+                self._update_button(button, instances)
+            new_buttons[key] = button
+            desired_children.append(button)
+            if key == last_pinned_key and open_rows:
+                desired_children.append(self._get_separator())
+
+        for key, button in self._buttons.items():
+            if new_buttons.get(key) is not button:
+                button.destroy()
+                structure_changed = True
+        self._buttons = new_buttons
+
+        current_children = self.view.get_children()
+        for child in current_children:
+            if child is self._separator and child not in desired_children:
+                self.view.remove(child)
+                structure_changed = True
+        current_children = self.view.get_children()
+        for child in desired_children:
+            if child not in current_children:
+                self.view.add(child)
+                child.show_all()
+        if self.view.get_children() != desired_children:
+            for position, child in enumerate(desired_children):
+                self.view.reorder_child(child, position)
+            structure_changed = True
+
+        if structure_changed and not self.integrated_mode:
             idle_add(self._update_size)
         self._drag_in_progress = False
         if not self.integrated_mode:
@@ -625,16 +726,13 @@ class Dock(Window):
         return False
 
     def get_clients(self):
-        try: return json.loads(self.conn.send_command("j/clients").reply.decode())
-        except json.JSONDecodeError: return []
+        return self.state.get_clients()
 
     def get_focused(self):
-        try: return json.loads(self.conn.send_command("j/activewindow").reply.decode()).get("address", "")
-        except json.JSONDecodeError: return ""
+        return self.state.active_address
 
     def get_workspace(self):
-        try: return json.loads(self.conn.send_command("j/activeworkspace").reply.decode()).get("id", 0)
-        except json.JSONDecodeError: return 0
+        return self.state.active_workspace_id
 
     def check_occlusion_state(self):
         if self.integrated_mode:
@@ -650,14 +748,14 @@ class Dock(Window):
                 if self.dock_revealer.get_reveal_child():
                     self.dock_revealer.set_reveal_child(False)
                 self.dock_full.add_style_class("occluded")
-            return True
+            return False
 
         if self.is_mouse_over_dock_area or self._drag_in_progress or self._prevent_occlusion:
             if not self.dock_revealer.get_reveal_child():
                 self.dock_revealer.set_reveal_child(True)
             if not self.always_show:
                  self.dock_full.remove_style_class("occluded")
-            return True
+            return False
 
         if self.always_show:
             if not self.dock_revealer.get_reveal_child():
@@ -668,7 +766,7 @@ class Dock(Window):
                 self.dock_revealer.set_reveal_child(False)
             self.dock_full.add_style_class("occluded")
 
-        return True
+        return False
 
     def _find_drag_target(self, widget):
         children = self.view.get_children()
@@ -741,12 +839,13 @@ class Dock(Window):
                 if app_index_dragged >= 0:
                     self.pinned.pop(app_index_dragged)
                     self.config["pinned_apps"] = self.pinned
+                    self._rebuild_pinned_index()
                     self.update_pinned_apps_file()
                     self.update_dock()
                 elif instances_dragged:
                     address = instances_dragged[0].get("address")
                     if address:
-                        exec_shell_command(f"hyprctl dispatch focuswindow address:{address}")
+                        get_hyprctl_client().dispatch(f"focuswindow address:{address}")
 
             self._drag_in_progress = False
             if not self.integrated_mode:
@@ -796,6 +895,7 @@ class Dock(Window):
 
         self.config["pinned_apps"] = pinned_children_data
         self.pinned = pinned_children_data
+        self._rebuild_pinned_index()
         file_updated = self.update_pinned_apps_file()
         if file_updated and not skip_update:
             self.update_dock()
@@ -1,14 +1,11 @@
 import json
 import math
-import operator
 import os
 import re
 import subprocess
-from collections.abc import Iterator
 
 import numpy as np
-from fabric.utils import (DesktopApp, exec_shell_command_async,
-                          get_desktop_applications, idle_add, remove_handler)
+from fabric.utils import DesktopApp, exec_shell_command_async
 from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
@@ -22,7 +19,10 @@ import config.data as data
 import modules.icons as icons
 from modules.dock import Dock
 from modules.updater import run_updater
+from services.desktop_apps import get_desktop_app_index
+from utils.app_search import AppSearchEngine
 from utils.conversion import Conversion
+from widgets.virtual_list import VirtualList
 
 tooltip_settings = f"<b>Open {data.APP_NAME_CAP} Settings</b>"
 tooltip_close = "<b>Close</b>"
@@ -39,8 +39,8 @@ class AppLauncher(Box):
         self.notch = kwargs["notch"]
         self.selected_index = -1
 
-        self._arranger_handler: int = 0
-        self._all_apps = get_desktop_applications()
+        self._all_apps = get_desktop_app_index().get_apps()
+        self._search = AppSearchEngine(f"{data.CACHE_DIR}/app_usage.json")
 
 
         self.converter = Conversion()
@@ -58,7 +58,14 @@ class AppLauncher(Box):
         else:
             self.conversion_history = []
 
-        self.viewport = Box(name="viewport", spacing=4, orientation="v")
+        self._icon_cache = {}
+        self.viewport = VirtualList(
+            name="viewport",
+            spacing=4,
+            create_row=self.create_row,
+            bind_row=self.bind_row,
+            row_kind=lambda item: "history" if isinstance(item, str) else "app",
+        )
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Applications...",
@@ -120,12 +127,12 @@ class AppLauncher(Box):
         self.show_all()
 
     def close_launcher(self):
-        self.viewport.children = []
+        self.viewport.clear()
         self.selected_index = -1
         self.notch.close_notch()
 
     def open_launcher(self):
-        self._all_apps = get_desktop_applications()
+        self._all_apps = get_desktop_app_index().get_apps()
         self.arrange_viewport()
         
 
@@ -145,7 +152,7 @@ class AppLauncher(Box):
         """Make sure the launcher is initialized with apps list before opening"""
         if not hasattr(self, '_initialized'):
 
-            self._all_apps = get_desktop_applications()
+            self._all_apps = get_desktop_app_index().get_apps()
             self._initialized = True
             return True
         return False
@@ -159,138 +166,87 @@ class AppLauncher(Box):
             # In conversion mode, update history view once (not per keystroke)
             self.update_conversion_viewport()
             return
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.children = []
-        self.selected_index = -1
-
-        def extract_command_name(command_line):
-            """Extract base command name from command line, removing paths and arguments"""
-            if not command_line:
-                return ""
-            # Remove common shell wrappers
-            if command_line.startswith("/bin/sh -c"):
-                # Handle wrapped commands like "/bin/sh -c "\$SHELL -i -c scrcpy""
-                return ""
-            # Split by spaces and take first part (the command)
-            cmd = command_line.split()[0] if command_line.split() else ""
-            # Extract just the command name from full paths
-            if "/" in cmd:
-                cmd = cmd.split("/")[-1]
-            return cmd
-
-        filtered_apps_iter = iter(
-            sorted(
-                [
-                    app
-                    for app in self._all_apps
-                    if query.casefold()
-                    in (
-                        (app.display_name or "")
-                        + (" " + app.name + " ")
-                        + (app.generic_name or "")
-                        + (" " + (app.command_line or "") + " ")
-                        + (" " + (app.executable or "") + " ")
-                        + (" " + extract_command_name(app.command_line) + " ")
-                    ).casefold()
-                ],
-                key=lambda app: (app.display_name or "").casefold(),
-            )
-        )
-        should_resize = operator.length_hint(filtered_apps_iter) == len(self._all_apps)
-
-        self._arranger_handler = idle_add(
-            lambda apps_iter: self.add_next_application(apps_iter) or self.handle_arrange_complete(should_resize, query),
-            filtered_apps_iter,
-            pin=True,
-        )
-
-    def handle_arrange_complete(self, should_resize, query):
-        if query.strip() != "" and self.viewport.get_children():
-            self.update_selection(0)
-        return False
-
-    def add_next_application(self, apps_iter: Iterator[DesktopApp]):
-        if not (app := next(apps_iter, None)):
-            return False
-        self.viewport.add(self.bake_application_slot(app))
-        return True
+        app_index = get_desktop_app_index()
+        self._search.set_apps(app_index.get_apps(), app_index.generation)
+        results = self._search.search(query)
+        self.viewport.set_items(results, selected_index=0 if query.strip() else -1)
+        self.selected_index = self.viewport.selected_index
 
     def resize_viewport(self):
         # Removed set_min_content_width to prevent size retention issues
         # when switching between modules in the notch stack
         pass
 
-    def bake_application_slot(self, app: DesktopApp, **kwargs) -> Button:
+    def create_row(self, kind) -> Button:
+        """Build a pooled viewport row; VirtualList binds it to data later."""
+        if kind == "history":
+            label = Label(
+                name="calc-label",
+                ellipsization="end",
+                v_align="center",
+                h_align="center",
+            )
+            button = Button(
+                name="slot-button",
+                child=Box(name="calc-slot-box", orientation="h", spacing=10, children=[label]),
+                on_clicked=lambda b, *_: self.copy_text_to_clipboard(b.item),
+            )
+            button.text_label = label
+            return button
+
+        icon = Image(name="app-icon", h_align="start")
+        label = Label(
+            name="app-label",
+            ellipsization="end",
+            v_align="center",
+            h_align="center",
+        )
+        description = Label(
+            name="app-desc",
+            ellipsization="end",
+            v_align="center",
+            h_align="start",
+            h_expand=True,
+        )
         button = Button(
             name="slot-button",
-            child=Box(
-                name="slot-box",
-                orientation="h",
-                spacing=10,
-                children=[
-                    Image(name="app-icon", pixbuf=app.get_icon_pixbuf(size=24), h_align="start"),
-                    Label(
-                        name="app-label",
-                        label=app.display_name or "Unknown",
-                        ellipsization="end",
-                        v_align="center",
-                        h_align="center",
-                    ),
-                    Label(
-                        name="app-desc",
-                        label=app.description or "",
-                        ellipsization="end",
-                        v_align="center",
-                        h_align="start",
-                        h_expand=True,
-                    ),
-                ],
-            ),
-            tooltip_text=app.description,
-            on_clicked=lambda *_: (app.launch(), self.close_launcher()),
-            **kwargs,
+            child=Box(name="slot-box", orientation="h", spacing=10, children=[icon, label, description]),
+            on_clicked=lambda b, *_: self.launch_app(b.item),
         )
+        button.icon, button.app_label, button.description = icon, label, description
         return button
 
-    def update_selection(self, new_index: int):
-
-        if self.selected_index != -1 and self.selected_index < len(self.viewport.get_children()):
-            current_button = self.viewport.get_children()[self.selected_index]
-            current_button.get_style_context().remove_class("selected")
-
-        if new_index != -1 and new_index < len(self.viewport.get_children()):
-            new_button = self.viewport.get_children()[new_index]
-            new_button.get_style_context().add_class("selected")
-            self.selected_index = new_index
-            self.scroll_to_selected(new_button)
-        else:
-            self.selected_index = -1
-
-    def scroll_to_selected(self, button):
-        def scroll():
-            adj = self.scrolled_window.get_vadjustment()
-            alloc = button.get_allocation()
-            if alloc.height == 0:
-                return False
-
-            y = alloc.y
-            height = alloc.height
-            page_size = adj.get_page_size()
-            current_value = adj.get_value()
-
-            visible_top = current_value
-            visible_bottom = current_value + page_size
+    def bind_row(self, button: Button, item, index: int):
+        if isinstance(item, str):
+            display_text = item
+            if "=>" in item:
+                expression, result = (part.strip() for part in item.split("=>", 1))
+                if len(result) > 50:
+                    display_text = f"{expression} => {result[:47]}..."
+            button.text_label.set_label(display_text)
+            button.set_tooltip_text(item)
+            return
 
-            if y < visible_top:
+        app: DesktopApp = item
+        button.icon.set_from_pixbuf(self.get_app_icon(app))
+        button.app_label.set_label(app.display_name or "Unknown")
+        button.description.set_label(app.description or "")
+        button.set_tooltip_text(app.description)
 
-                adj.set_value(y)
-            elif y + height > visible_bottom:
+    def get_app_icon(self, app: DesktopApp):
+        key = getattr(app, "desktop_id", None) or app.name
+        if key not in self._icon_cache:
+            self._icon_cache[key] = app.get_icon_pixbuf(size=24)
+        return self._icon_cache[key]
 
-                new_value = y + height - page_size
-                adj.set_value(new_value)
+    def launch_app(self, app: DesktopApp):
+        self._search.record_launch(app)
+        app.launch()
+        self.close_launcher()
 
-            return False
-        GLib.idle_add(scroll)
+    def update_selection(self, new_index: int):
+        self.viewport.select(new_index)
+        self.selected_index = self.viewport.selected_index
 
     def on_search_entry_activate(self, text):
         if text.startswith("="):
@@ -313,14 +269,14 @@ class AppLauncher(Box):
             case ":update":
                 GLib.idle_add(lambda: run_updater(force=True))
             case _:
-                children = self.viewport.get_children()
-                if children:
+                if len(self.viewport):
 
                     if text.strip() == "" and self.selected_index == -1:
                         return
                     selected_index = self.selected_index if self.selected_index != -1 else 0
-                    if 0 <= selected_index < len(children):
-                        children[selected_index].clicked()
+                    app = self.viewport.get_item(selected_index)
+                    if app is not None and not isinstance(app, str):
+                        self.launch_app(app)
 
     def on_search_entry_key_press(self, widget, event):
         text = widget.get_text()
@@ -405,26 +361,19 @@ class AppLauncher(Box):
         """Handle text changes in the search entry"""
         text = entry.get_text()
         if text.startswith("="):
-            self.update_calculator_viewport()
-
             self.selected_index = -1
+            self.update_calculator_viewport()
         elif text.startswith(";"):
-            self.update_conversion_viewport()
             # Always reset selection when typing a new expression
             self.selected_index = -1
+            self.update_conversion_viewport()
         else:
             self.arrange_viewport(text)
 
     def add_selected_app_to_dock(self):
         """Adds the currently selected application to the dock.json file with comprehensive metadata."""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1 or self.selected_index >= len(children):
-            return
-
-        selected_button = children[self.selected_index]
-
-        selected_app = next((app for app in self._all_apps if app.display_name == selected_button.get_child().get_children()[1].props.label), None)
-        if not selected_app:
+        selected_app = self.viewport.get_item(self.selected_index)
+        if selected_app is None or isinstance(selected_app, str):
             return
 
         app_data = {k: v for k, v in {
@@ -468,15 +417,15 @@ class AppLauncher(Box):
         Dock.notify_config_change()
 
     def move_selection(self, delta: int):
-        children = self.viewport.get_children()
-        if not children:
+        count = len(self.viewport)
+        if not count:
             return
 
         if self.selected_index == -1 and delta == 1:
             new_index = 0
         else:
             new_index = self.selected_index + delta
-        new_index = max(0, min(new_index, len(children) - 1))
+        new_index = max(0, min(new_index, count - 1))
         self.update_selection(new_index)
 
     def save_calc_history(self):
@@ -599,132 +548,15 @@ class AppLauncher(Box):
         self.update_conversion_viewport()
         
     def update_calculator_viewport(self):
-        self.viewport.children = []
-        for item in self.calc_history:
-            btn = self.create_calc_history_button(item)
-            self.viewport.add(btn)
-
-        if self.selected_index >= len(self.calc_history):
-            self.selected_index = -1
+        self.viewport.set_items(self.calc_history, selected_index=self.selected_index)
+        self.selected_index = self.viewport.selected_index
     
     def update_conversion_viewport(self):
-        self.viewport.children = []
-        for item in self.conversion_history:
-            btn = self.create_conversion_history_button(item)
-            self.viewport.add(btn)
         # Don't reset selection index here automatically
         # Ensure selection state stays valid
-        if self.selected_index >= len(self.conversion_history):
-            self.selected_index = -1
-
-    def create_calc_history_button(self, text: str) -> Button:
-
-        if "=>" in text:
-            parts = text.split("=>")
-            expression = parts[0].strip()
-            result = parts[1].strip()
-            
-
-            display_text = text
-            if len(result) > 50:
-                display_text = f"{expression} => {result[:47]}..."
-                
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=display_text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        else:
+        self.viewport.set_items(self.conversion_history, selected_index=self.selected_index)
+        self.selected_index = self.viewport.selected_index
 
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        return btn
-
-    def create_conversion_history_button(self, text: str) -> Button:
-        # Parse the result to create a more readable display
-        if "=>" in text:
-            parts = text.split("=>")
-            expression = parts[0].strip()
-            result = parts[1].strip()
-            
-            # For very long results, truncate for display but keep full in tooltip
-            display_text = text
-            if len(result) > 50:  # Truncate long results
-                display_text = f"{expression} => {result[:47]}..."
-                
-            btn = Button(
-                name="slot-button",  # reuse existing CSS styling
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=display_text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        else:
-            # Fallback for non-calculation entries
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        return btn
-    
     def copy_text_to_clipboard(self, text: str):
 
         parts = text.split("=>", 1)
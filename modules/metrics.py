@@ -1,11 +1,8 @@
-import json
+import atexit
 import logging
-import subprocess
 import time
 
-import psutil
-from fabric.core.fabricator import Fabricator
-from fabric.utils.helpers import invoke_repeater
+from fabric.core.service import Service, Signal
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.circularprogressbar import CircularProgressBar
@@ -17,117 +14,278 @@ from fabric.widgets.scale import Scale
 from gi.repository import GLib
 
 import config.data as data
-from modules.upower.upower import UPowerManager
+from modules.upower.upower import get_upower_service
 import modules.icons as icons
 from services.network import NetworkClient
+from utils.gpu_telemetry import GpuTelemetry
+from utils.metrics_history import MetricsHistory, RingBuffer
+from utils.proc_readers import CpuReader, MemoryReader, NetReader, disk_usage_percent
+from widgets.sparkline import Sparkline
 
 logger = logging.getLogger(__name__)
 
-class MetricsProvider:
+# Slack so a wakeup landing just before a source is due still samples it
+SAMPLE_SLACK = 0.5
+
+# Closed one-minute history buckets to collect before rewriting the history file
+HISTORY_SAVE_BUCKETS = 10
+
+SOURCES = ("cpu", "memory", "disks", "gpu", "battery", "network")
+# Sources whose values are pushed to the provider and never polled
+PUSHED_SOURCES = ("battery",)
+
+
+class MetricsSubscription:
     """
-    Class responsible for obtaining centralized CPU, memory, disk usage, and battery metrics.
-    It updates periodically so that all widgets querying it display the same values.
+    Interest in some metric sources at a given rate, in seconds.
+
+    With a `widget`, the subscription only counts while that widget is mapped,
+    so hidden bars and dashboard pages stop their sources from being sampled.
     """
-    def __init__(self):
+
+    def __init__(self, provider, sources, interval, callback, widget=None):
+        self.provider = provider
+        self.sources = frozenset([sources] if isinstance(sources, str) else sources)
+        self.interval = max(1, int(interval))
+        self.callback = callback
+        self.active = widget is None or widget.get_mapped()
+        self._handler = provider.connect("sampled", self._on_sampled)
+        if widget is not None:
+            widget.connect("map", lambda *_: self.set_active(True))
+            widget.connect("unmap", lambda *_: self.set_active(False))
+            widget.connect("destroy", lambda *_: self.cancel())
+
+    def set_active(self, active: bool):
+        if active == self.active:
+            return
+        self.active = active
+        self.provider._reschedule()
+        if active:
+            # Show fresh values right away instead of waiting for the next wakeup
+            self.provider.sample_stale(self.sources, self.interval)
+
+    def cancel(self):
+        if self._handler:
+            self.provider.disconnect(self._handler)
+            self._handler = 0
+        self.active = False
+        self.provider._unsubscribe(self)
+
+    def _on_sampled(self, _, sources):
+        if self.active and not self.sources.isdisjoint(sources):
+            self.callback()
+
+
+class MetricsProvider(Service):
+    """
+    Class responsible for obtaining centralized CPU, memory, disk, GPU, battery and network metrics.
+
+    Widgets subscribe to the sources they display at the rate they need. Each
+    source is sampled once at the fastest rate requested by its active
+    subscribers, all sources share a single once-per-second wakeup, and the
+    wakeup is removed entirely while nothing visible is subscribed.
+    """
+
+    @Signal
+    def sampled(self, sources: object) -> None:
+        """Emitted with the set of sources refreshed by a wakeup."""
+
+    @Signal
+    def gpu_devices_changed(self) -> None:
+        """Emitted when GPU detection finds a different set of devices."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         self.gpu = []
         self.cpu = 0.0
+        self.cpu_per_core = []
         self.mem = 0.0
         self.disk = []
 
-        self.upower = UPowerManager()
-        self.display_device = self.upower.get_display_device()
+        self._cpu_reader = CpuReader()
+        self._memory_reader = MemoryReader()
+        self._net_reader = NetReader()
+
+        self.upower = get_upower_service()
         self.bat_percent = 0.0
         self.bat_charging = None
         self.bat_time = 0
+        self.upower.connect("changed", self._on_battery_changed)
 
-        self._gpu_update_running = False
-        self._gpu_update_counter = 0
+        self.net_download = 0.0
+        self.net_upload = 0.0
+        self._net_counters = None
+        self._net_time = 0.0
 
-        GLib.timeout_add_seconds(2, self._update)
-
-    def _update(self):
-        self.cpu = psutil.cpu_percent(interval=0)
-        self.mem = psutil.virtual_memory().percent
-        self.disk = [psutil.disk_usage(path).percent for path in data.BAR_METRICS_DISKS]
+        self.gpu_telemetry = GpuTelemetry(
+            f"{data.CACHE_DIR}/gpu_devices.json",
+            on_devices_changed=lambda: self.emit("gpu-devices-changed"),
+        )
 
-        self._gpu_update_counter += 1
-        if self._gpu_update_counter >= 5:  # Update GPU every 10 seconds (5 * 2s)
-            self._gpu_update_counter = 0
-            if not self._gpu_update_running:
-                self._start_gpu_update_async()
+        self.history = MetricsHistory(f"{data.CACHE_DIR}/metrics_history.bin")
+        atexit.register(self.history.save)
+
+        self._samplers = {
+            "cpu": self._sample_cpu,
+            "memory": self._sample_memory,
+            "disks": self._sample_disks,
+            "gpu": self._sample_gpu,
+            "battery": self._sample_battery,
+            "network": self._sample_network,
+        }
+        self._subscriptions = []
+        self._intervals = {}
+        self._last_sampled = {source: 0.0 for source in SOURCES}
+        self._timer_id = None
+
+    # ------------------------------------------------------------------
+    # Subscriptions and scheduling
+    # ------------------------------------------------------------------
+
+    def subscribe(self, sources, interval, callback, widget=None) -> MetricsSubscription:
+        """Call `callback()` whenever one of `sources` has been sampled, at most every `interval` seconds."""
+        subscription = MetricsSubscription(self, sources, interval, callback, widget)
+        self._subscriptions.append(subscription)
+        self._reschedule()
+        if subscription.active:
+            self.sample_stale(subscription.sources, subscription.interval)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            self._reschedule()
+
+    def _reschedule(self):
+        intervals = {}
+        for subscription in self._subscriptions:
+            if not subscription.active:
+                continue
+            for source in subscription.sources:
+                intervals[source] = min(intervals.get(source, subscription.interval), subscription.interval)
+        if ("gpu" in intervals) != ("gpu" in self._intervals):
+            # Only keep the nvidia-smi stream alive while someone shows GPU usage
+            if "gpu" in intervals:
+                self.gpu_telemetry.start()
+            else:
+                self.gpu_telemetry.stop()
+        self._intervals = intervals
+
+        if intervals and self._timer_id is None:
+            # Whole-second timeouts are batched by GLib with every other one in the process
+            self._timer_id = GLib.timeout_add_seconds(1, self._tick)
+        elif not intervals and self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+
+    def _tick(self):
+        now = time.monotonic()
+        due = [
+            source
+            for source, interval in self._intervals.items()
+            if now - self._last_sampled[source] >= interval - SAMPLE_SLACK
+        ]
+        self._sample([source for source in due if source not in PUSHED_SOURCES])
+        # Pushed sources are not polled, but their last known value still
+        # goes into the history, which would otherwise only get the changes
+        pushed = [source for source in due if source in PUSHED_SOURCES]
+        if pushed:
+            for source in pushed:
+                self._last_sampled[source] = now
+            self._record_history(pushed)
+        return True
 
-        battery = self.upower.get_full_device_information(self.display_device)
-        if battery is None:
+    def sample(self, sources=SOURCES):
+        """Sample `sources` now, regardless of their schedule."""
+        self._sample(sources)
+
+    def sample_stale(self, sources, max_age):
+        """Sample the `sources` whose last value is older than `max_age` seconds."""
+        now = time.monotonic()
+        self._sample([s for s in sources if now - self._last_sampled[s] >= max_age - SAMPLE_SLACK])
+
+    def _sample(self, sources):
+        now = time.monotonic()
+        refreshed = set()
+        for source in sources:
+            self._last_sampled[source] = now
+            self._samplers[source]()
+            refreshed.add(source)
+        if refreshed:
+            self._record_history(refreshed)
+            self.emit("sampled", refreshed)
+
+    def _record_history(self, sources):
+        now = time.time()
+        record = self.history.record
+        if "cpu" in sources:
+            record("cpu", self.cpu, now)
+        if "memory" in sources:
+            record("memory", self.mem, now)
+        if "disks" in sources:
+            for path, percent in zip(data.BAR_METRICS_DISKS, self.disk):
+                record(f"disk:{path}", percent, now)
+        if "gpu" in sources:
+            for i, percent in enumerate(self.gpu):
+                record(f"gpu:{i}", percent, now)
+        if "battery" in sources and self.bat_charging is not None:
+            record("battery", self.bat_percent, now)
+        if "network" in sources:
+            record("net_down", self.net_download, now)
+            record("net_up", self.net_upload, now)
+        if self.history.unsaved_buckets >= HISTORY_SAVE_BUCKETS:
+            self.history.save()
+
+    def get_history(self, name: str) -> RingBuffer:
+        """Recent samples of a series: cpu, memory, disk:<path>, gpu:<n>, battery, net_down, net_up."""
+        return self.history.get(name).recent
+
+    def get_long_history(self, name: str) -> RingBuffer:
+        """Per-minute averages of a series over the last day."""
+        return self.history.get(name).long
+
+    # ------------------------------------------------------------------
+    # Samplers
+    # ------------------------------------------------------------------
+
+    def _sample_cpu(self):
+        self.cpu = self._cpu_reader.sample()
+        self.cpu_per_core = self._cpu_reader.per_core
+
+    def _sample_memory(self):
+        self.mem = self._memory_reader.sample()
+
+    def _sample_disks(self):
+        self.disk = [disk_usage_percent(path) for path in data.BAR_METRICS_DISKS]
+
+    def _sample_gpu(self):
+        self.gpu = self.gpu_telemetry.sample()
+
+    def _sample_battery(self):
+        if not self.upower.is_present:
             self.bat_percent = 0.0
             self.bat_charging = None
             self.bat_time = 0
         else:
-            self.bat_percent = battery['Percentage']
-            self.bat_charging = battery['State'] == 1
-            self.bat_time = battery['TimeToFull'] if self.bat_charging else battery['TimeToEmpty']
-
-        return True
-
-    def _start_gpu_update_async(self):
-        """Starts a new GLib thread to run nvtop in the background."""
-        self._gpu_update_running = True
-
-        GLib.Thread.new("nvtop-thread", lambda _: self._run_nvtop_in_thread(), None)
-
-    def _run_nvtop_in_thread(self):
-        """Runs nvtop via subprocess in a separate GLib thread."""
-        output = None
-        error_message = None
-        try:
-            result = subprocess.check_output(["nvtop", "-s"], text=True, timeout=10)
-            output = result
-        except FileNotFoundError:
-            error_message = "nvtop command not found."
-            logger.warning(error_message)
-        except subprocess.CalledProcessError as e:
-            error_message = f"nvtop failed with exit code {e.returncode}: {e.stderr.strip()}"
-            logger.error(error_message)
-        except subprocess.TimeoutExpired:
-            error_message = "nvtop command timed out."
-            logger.error(error_message)
-        except Exception as e:
-            error_message = f"Unexpected error running nvtop: {e}"
-            logger.error(error_message)
-
-        GLib.idle_add(self._process_gpu_output, output, error_message)
-        self._gpu_update_running = False
-
-    def _process_gpu_output(self, output, error_message):
-        """Process nvtop JSON output on the main loop."""
-        try:
-            if error_message:
-                logger.error(f"GPU update failed: {error_message}")
-                self.gpu = []
-            elif output:
-                info = json.loads(output)
-                try:
-                    self.gpu = [
-                        (
-                            int(v["gpu_util"].strip("%"))
-                            if v["gpu_util"] is not None
-                            else 0
-                        )
-                        for v in info
-                    ]
-                except (KeyError, ValueError, TypeError) as e:
-                    logger.error(f"Failed parsing nvtop JSON: {e}")
-                    self.gpu = []
-            else:
-                logger.warning("nvtop returned no output.")
-                self.gpu = []
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            self.gpu = []
-        except Exception as e:
-            logger.error(f"Error processing nvtop output: {e}")
-            self.gpu = []
-
-        return False
+            self.bat_percent = self.upower.percentage
+            self.bat_charging = self.upower.is_charging
+            self.bat_time = self.upower.time_to_full if self.bat_charging else self.upower.time_to_empty
+
+    def _on_battery_changed(self, *_):
+        # UPower pushes changes, so a subscribed battery is refreshed right
+        # away on plug/unplug instead of at the next wakeup
+        if any(s.active and "battery" in s.sources for s in self._subscriptions):
+            self._sample(["battery"])
+
+    def _sample_network(self):
+        now = time.monotonic()
+        counters = self._net_reader.sample()
+        if self._net_counters is not None and now > self._net_time:
+            elapsed = now - self._net_time
+            self.net_download = max(0, counters[0] - self._net_counters[0]) / elapsed
+            self.net_upload = max(0, counters[1] - self._net_counters[1]) / elapsed
+        self._net_counters = counters
+        self._net_time = now
 
     def get_metrics(self):
         return (self.cpu, self.mem, self.disk, self.gpu)
@@ -135,30 +293,53 @@ class MetricsProvider:
     def get_battery(self):
         return (self.bat_percent, self.bat_charging, self.bat_time)
 
+    def get_network(self):
+        return (self.net_download, self.net_upload)
+
     def get_gpu_info(self):
-        try:
-            result = subprocess.check_output(["nvtop", "-s"], text=True, timeout=5)
-            return json.loads(result)
-        except FileNotFoundError:
-            logger.warning("nvtop not found; GPU info unavailable.")
-            return []
-        except subprocess.CalledProcessError as e:
-            logger.error(f"nvtop init sync failed: {e}")
-            return []
-        except subprocess.TimeoutExpired:
-            logger.error("nvtop init call timed out.")
-            return []
-        except json.JSONDecodeError as e:
-            logger.error(f"Init JSON parse error: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error during GPU init: {e}")
-            return []
+        """Detected GPUs, from the previous run's cache until detection completes."""
+        return [{"device_name": device["name"]} for device in self.gpu_telemetry.devices]
 
 shared_provider = MetricsProvider()
 
+class HistoryTooltip(Box):
+    """Tooltip content with a label and a sparkline of recent history per metric."""
+
+    def __init__(self, **kwargs):
+        super().__init__(name="metrics-tooltip", orientation="v", spacing=4, **kwargs)
+        self.rows = []
+
+    def add_row(self, markup, buffer, maximum=100.0):
+        """`markup` is a callable, re-evaluated whenever the tooltip is refreshed."""
+        label = Label(name="metrics-tooltip-label", markup=markup(), h_align="start")
+        sparkline = Sparkline(buffer, maximum=maximum, name="metrics-sparkline", size=(160, 28))
+        self.add(label)
+        self.add(sparkline)
+        self.rows.append((label, sparkline, markup))
+
+    def clear(self):
+        for label, sparkline, _ in self.rows:
+            label.destroy()
+            sparkline.destroy()
+        self.rows = []
+
+    def refresh(self):
+        for label, sparkline, markup in self.rows:
+            label.set_markup(markup())
+            sparkline.queue_draw()
+
+    def attach(self, widget):
+        self.show_all()
+        widget.set_has_tooltip(True)
+        widget.connect("query-tooltip", self._on_query_tooltip)
+
+    def _on_query_tooltip(self, widget, x, y, keyboard_mode, tooltip):
+        self.refresh()
+        tooltip.set_custom(self)
+        return True
+
 class SingularMetric:
-    def __init__(self, id, name, icon):
+    def __init__(self, id, name, icon, series):
         self.usage = Scale(
             name=f"{id}-usage",
             value=0.25,
@@ -173,6 +354,13 @@ class SingularMetric:
             markup=icon,
         )
 
+        self.sparkline = Sparkline(
+            shared_provider.get_history(series),
+            name=f"{id}-sparkline",
+            h_align="center",
+            size=(32, 16),
+        )
+
         self.box = Box(
             name=f"{id}-box",
             orientation='v',
@@ -180,10 +368,18 @@ class SingularMetric:
             children=[
                 self.usage,
                 self.label,
+                self.sparkline,
             ]
         )
 
-        self.box.set_tooltip_markup(f"{icon} {name}")
+        self.tooltip = HistoryTooltip()
+        self.tooltip.add_row(lambda: f"{icon} {name}", shared_provider.get_history(series))
+        self.tooltip.attach(self.box)
+
+def watch_gpu_devices(widget, callback):
+    """Call `callback()` when the detected GPUs change, until `widget` is destroyed."""
+    handler = shared_provider.connect("gpu-devices-changed", lambda *_: callback())
+    widget.connect("destroy", lambda *_: shared_provider.disconnect(handler))
 
 class Metrics(Box):
     def __init__(self, **kwargs):
@@ -197,23 +393,21 @@ class Metrics(Box):
         )
 
         visible = getattr(data, "METRICS_VISIBLE", {'cpu': True, 'ram': True, 'disk': True, 'gpu': True})
-        disks = [SingularMetric("disk", f"DISK ({path})" if len(data.BAR_METRICS_DISKS) != 1 else "DISK", icons.disk)
+        disks = [SingularMetric("disk", f"DISK ({path})" if len(data.BAR_METRICS_DISKS) != 1 else "DISK", icons.disk, f"disk:{path}")
                  for path in data.BAR_METRICS_DISKS] if visible.get('disk', True) else []
 
-        gpu_info = shared_provider.get_gpu_info()
-        gpus = [SingularMetric(f"gpu", f"GPU ({v['device_name']})" if len(gpu_info) != 1 else "GPU", icons.gpu)
-                for v in gpu_info] if visible.get('gpu', True) else []
-
-        self.cpu = SingularMetric("cpu", "CPU", icons.cpu) if visible.get('cpu', True) else None
-        self.ram = SingularMetric("ram", "RAM", icons.memory) if visible.get('ram', True) else None
+        self.show_gpu = visible.get('gpu', True)
+        self.cpu = SingularMetric("cpu", "CPU", icons.cpu, "cpu") if visible.get('cpu', True) else None
+        self.ram = SingularMetric("ram", "RAM", icons.memory, "memory") if visible.get('ram', True) else None
         self.disk = disks
-        self.gpu = gpus
+        self.gpu = self._create_gpus()
 
-        self.scales = []
-        if self.disk: self.scales.extend([v.box for v in self.disk])
-        if self.ram: self.scales.append(self.ram.box)
-        if self.cpu: self.scales.append(self.cpu.box)
-        if self.gpu: self.scales.extend([v.box for v in self.gpu])
+        self.metrics = []
+        if self.disk: self.metrics.extend(self.disk)
+        if self.ram: self.metrics.append(self.ram)
+        if self.cpu: self.metrics.append(self.cpu)
+        if self.gpu: self.metrics.extend(self.gpu)
+        self.scales = [v.box for v in self.metrics]
 
         if self.cpu: self.cpu.usage.set_sensitive(False)
         if self.ram: self.ram.usage.set_sensitive(False)
@@ -225,7 +419,32 @@ class Metrics(Box):
         for x in self.scales:
             self.add(x)
 
-        GLib.timeout_add_seconds(2, self.update_status)
+        self.subscription = shared_provider.subscribe(
+            ("cpu", "memory", "disks", "gpu"), 2, self.update_status, widget=self
+        )
+        watch_gpu_devices(self, self.rebuild_gpus)
+
+    def _create_gpus(self):
+        if not self.show_gpu:
+            return []
+        gpu_info = shared_provider.get_gpu_info()
+        return [SingularMetric(f"gpu", f"GPU ({v['device_name']})" if len(gpu_info) != 1 else "GPU", icons.gpu, f"gpu:{i}")
+                for i, v in enumerate(gpu_info)]
+
+    def rebuild_gpus(self):
+        """Replace the GPU scales after GPU detection found different devices."""
+        for gpu in self.gpu:
+            self.metrics.remove(gpu)
+            self.remove(gpu.box)
+            gpu.box.destroy()
+        self.gpu = self._create_gpus()
+        for gpu in self.gpu:
+            gpu.usage.set_sensitive(False)
+            self.metrics.append(gpu)
+            self.add(gpu.box)
+            gpu.box.show_all()
+        self.scales = [v.box for v in self.metrics]
+        self.update_status()
 
     def update_status(self):
         cpu, mem, disks, gpus = shared_provider.get_metrics()
@@ -242,12 +461,15 @@ class Metrics(Box):
 
             if i < len(gpus):
                 gpu.usage.value = gpus[i] / 100.0
-        return True
+
+        for metric in self.metrics:
+            metric.sparkline.queue_draw()
 
 class SingularMetricSmall:
-    def __init__(self, id, name, icon):
+    def __init__(self, id, name, icon, series):
         self.name_markup = name
         self.icon_markup = icon
+        self.series = series
 
         self.icon = Label(name="metrics-icon", markup=icon)
         self.circle = CircularProgressBar(
@@ -293,17 +515,17 @@ class MetricsSmall(Button):
         )
 
         visible = getattr(data, "METRICS_SMALL_VISIBLE", {'cpu': True, 'ram': True, 'disk': True, 'gpu': True})
-        disks = [SingularMetricSmall("disk", f"DISK ({path})" if len(data.BAR_METRICS_DISKS) != 1 else "DISK", icons.disk)
+        disks = [SingularMetricSmall("disk", f"DISK ({path})" if len(data.BAR_METRICS_DISKS) != 1 else "DISK", icons.disk, f"disk:{path}")
                  for path in data.BAR_METRICS_DISKS] if visible.get('disk', True) else []
 
-        gpu_info = shared_provider.get_gpu_info()
-        gpus = [SingularMetricSmall(f"gpu", f"GPU ({v['device_name']})" if len(gpu_info) != 1 else "GPU", icons.gpu)
-                for v in gpu_info] if visible.get('gpu', True) else []
-
-        self.cpu = SingularMetricSmall("cpu", "CPU", icons.cpu) if visible.get('cpu', True) else None
-        self.ram = SingularMetricSmall("ram", "RAM", icons.memory) if visible.get('ram', True) else None
+        self.show_gpu = visible.get('gpu', True)
+        self.cpu = SingularMetricSmall("cpu", "CPU", icons.cpu, "cpu") if visible.get('cpu', True) else None
+        self.ram = SingularMetricSmall("ram", "RAM", icons.memory, "memory") if visible.get('ram', True) else None
         self.disk = disks
-        self.gpu = gpus
+        self.gpu = self._create_gpus()
+        self.main_box = main_box
+        # Separators placed before each GPU, removed along with it
+        self.gpu_separators = []
 
         for disk in self.disk:
             main_box.add(disk.box)
@@ -313,20 +535,62 @@ class MetricsSmall(Button):
             main_box.add(Box(name="metrics-sep"))
         if self.cpu:
             main_box.add(self.cpu.box)
-        for gpu in self.gpu:
-            main_box.add(Box(name="metrics-sep"))
-            main_box.add(gpu.box)
+        self._add_gpu_boxes()
 
         self.add(main_box)
 
+        self.history_tooltip = HistoryTooltip()
+        self._fill_tooltip()
+        self.history_tooltip.attach(self)
+
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-        GLib.timeout_add_seconds(2, self.update_metrics)
-
         self.hide_timer = None
         self.hover_counter = 0
 
+        self.subscription = shared_provider.subscribe(
+            ("cpu", "memory", "disks", "gpu"), 2, self.update_metrics, widget=self
+        )
+        watch_gpu_devices(self, self.rebuild_gpus)
+
+    def _create_gpus(self):
+        if not self.show_gpu:
+            return []
+        gpu_info = shared_provider.get_gpu_info()
+        return [SingularMetricSmall(f"gpu", f"GPU ({v['device_name']})" if len(gpu_info) != 1 else "GPU", icons.gpu, f"gpu:{i}")
+                for i, v in enumerate(gpu_info)]
+
+    def _add_gpu_boxes(self):
+        for gpu in self.gpu:
+            separator = Box(name="metrics-sep")
+            self.gpu_separators.append(separator)
+            self.main_box.add(separator)
+            self.main_box.add(gpu.box)
+
+    def _fill_tooltip(self):
+        tooltip_metrics = []
+        if self.disk: tooltip_metrics.extend(self.disk)
+        if self.ram: tooltip_metrics.append(self.ram)
+        if self.cpu: tooltip_metrics.append(self.cpu)
+        if self.gpu: tooltip_metrics.extend(self.gpu)
+        for metric in tooltip_metrics:
+            self.history_tooltip.add_row(metric.markup, shared_provider.get_history(metric.series))
+
+    def rebuild_gpus(self):
+        """Replace the GPU indicators after GPU detection found different devices."""
+        for widget in self.gpu_separators + [gpu.box for gpu in self.gpu]:
+            self.main_box.remove(widget)
+            widget.destroy()
+        self.gpu_separators = []
+        self.gpu = self._create_gpus()
+        self._add_gpu_boxes()
+        self.main_box.show_all()
+        self.history_tooltip.clear()
+        self._fill_tooltip()
+        self.history_tooltip.show_all()
+        self.update_metrics()
+
     def _format_percentage(self, value: int) -> str:
         """Formato natural del porcentaje sin forzar ancho fijo."""
         return f"{value}%"
@@ -387,14 +651,7 @@ class MetricsSmall(Button):
                 gpu.circle.set_value(gpus[i] / 100.0)
                 gpu.level.set_label(self._format_percentage(int(gpus[i])))
 
-        tooltip_metrics = []
-        if self.disk: tooltip_metrics.extend(self.disk)
-        if self.ram: tooltip_metrics.append(self.ram)
-        if self.cpu: tooltip_metrics.append(self.cpu)
-        if self.gpu: tooltip_metrics.extend(self.gpu)
-        self.set_tooltip_markup((" - " if not data.VERTICAL else "\n").join([v.markup() for v in tooltip_metrics]))
-
-        return True
+        self.history_tooltip.refresh()
 
 class Battery(Button):
     def __init__(self, **kwargs):
@@ -438,22 +695,25 @@ class Battery(Button):
 
         self.add(main_box)
 
+        # Charging status over a sparkline of the battery level
+        self.tooltip_markup = "Battery"
+        self.history_tooltip = HistoryTooltip()
+        self.history_tooltip.add_row(lambda: self.tooltip_markup, shared_provider.get_history("battery"))
+        self.history_tooltip.attach(self)
+
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-        self.batt_fabricator = Fabricator(
-            poll_from=lambda v: shared_provider.get_battery(),
-            on_changed=lambda f, v: self.update_battery,
-            interval=1000,
-            stream=False,
-            default_value=0
-        )
-        self.batt_fabricator.changed.connect(self.update_battery)
-        GLib.idle_add(self.update_battery, None, shared_provider.get_battery())
-
         self.hide_timer = None
         self.hover_counter = 0
 
+        # UPower pushes battery changes, so this never polls. Not tied to
+        # visibility: the widget hides itself while no battery is reported
+        # and still has to notice when one shows up.
+        self.subscription = shared_provider.subscribe(
+            "battery", 2, lambda: self.update_battery(None, shared_provider.get_battery())
+        )
+
     def _format_percentage(self, value: int) -> str:
         """Formato natural del porcentaje sin forzar ancho fijo."""
         return f"{value}%"
@@ -527,7 +787,8 @@ class Battery(Button):
             self.bat_icon.set_markup(icons.battery)
             charging_status = "Battery"
 
-        self.set_tooltip_markup(f"{charging_status}" if not data.VERTICAL else f"{charging_status}: {percentage}%")
+        self.tooltip_markup = f"{charging_status}" if not data.VERTICAL else f"{charging_status}: {percentage}%"
+        self.history_tooltip.refresh()
 
 class NetworkApplet(Button):
     def __init__(self, **kwargs):
@@ -566,19 +827,13 @@ class NetworkApplet(Button):
             self.upload_icon.set_margin_top(4)
             self.download_icon.set_margin_bottom(4)
 
-        self.last_counters = psutil.net_io_counters()
-        self.last_time = time.time()
-        invoke_repeater(1000, self.update_network)
-
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
+        self.subscription = shared_provider.subscribe("network", 1, self.update_network, widget=self)
+
     def update_network(self):
-        current_time = time.time()
-        elapsed = current_time - self.last_time
-        current_counters = psutil.net_io_counters()
-        download_speed = (current_counters.bytes_recv - self.last_counters.bytes_recv) / elapsed
-        upload_speed = (current_counters.bytes_sent - self.last_counters.bytes_sent) / elapsed
+        download_speed, upload_speed = shared_provider.get_network()
         download_str = self.format_speed(download_speed)
         upload_str = self.format_speed(upload_speed)
         self.download_label.set_markup(download_str)
@@ -649,10 +904,6 @@ class NetworkApplet(Button):
         else:
             self.set_tooltip_text(tooltip_base)
 
-        self.last_counters = current_counters
-        self.last_time = current_time
-        return True
-
     def format_speed(self, speed):
         if speed < 1024:
             return f"{speed:.0f} B/s"
@@ -1,5 +1,5 @@
 from fabric.hyprland.widgets import HyprlandActiveWindow as ActiveWindow
-from fabric.utils.helpers import FormattedString, get_desktop_applications
+from fabric.utils.helpers import FormattedString
 from fabric.widgets.box import Box
 from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.image import Image
@@ -19,8 +19,12 @@ from modules.player import PlayerSmall
 from modules.power import PowerMenu
 from modules.tmux import TmuxManager
 from modules.tools import Toolbox
+from services.desktop_apps import get_desktop_app_index
+from services.event_coalescer import ACTIVE_WINDOW, get_event_coalescer
+from services.hyprland_state import get_hyprland_state
+from services.occlusion import get_occlusion_engine
+from utils.hyprland_socket import get_hyprctl_client
 from utils.icon_resolver import IconResolver
-from utils.occlusion import check_occlusion
 from widgets.wayland import WaylandWindow as Window
 
 from fabric.widgets.button import Button
@@ -152,10 +156,11 @@ class Notch(Window):
         self._prevent_occlusion = False
         self._occlusion_timer_id = None
         self._forced_occlusion = False
+        self._occlusion_watcher = None
 
+        self.hypr_state = get_hyprland_state()
         self.icon_resolver = IconResolver()
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
+        self.app_index = get_desktop_app_index()
 
         self.dashboard = Dashboard(notch=self)
         self.nhistory = self.dashboard.widgets.notification_history
@@ -207,10 +212,9 @@ class Notch(Window):
             lambda widget, event: (self.open_notch("dashboard"), False)[1],
         )
 
-        self.active_window.connect("notify::label", self.update_window_icon)
-
-        if data.PANEL_THEME == "Notch":
-            self.active_window.connect("notify::label", self.on_active_window_changed)
+        # Focus changes are delivered once per frame, after the label has
+        # been updated, so the active client is always the new one.
+        get_event_coalescer().connect("changed", self._on_hyprland_changes)
 
         self.active_window.get_children()[0].set_hexpand(True)
         self.active_window.get_children()[0].set_halign(Gtk.Align.FILL)
@@ -431,7 +435,11 @@ class Notch(Window):
         self._current_window_class = self._get_current_window_class()
 
         if data.PANEL_THEME == "Notch" and data.BAR_POSITION != "Top":
-            GLib.timeout_add(500, self._check_occlusion)
+            self._occlusion_watcher = get_occlusion_engine().watch(
+                self.monitor_id, ("top", 40)
+            )
+            self._occlusion_watcher.connect("occluded-changed", self._check_occlusion)
+            self._check_occlusion()
         elif data.PANEL_THEME == "Notch":
             self.notch_revealer.set_reveal_child(True)
         else:
@@ -441,6 +449,8 @@ class Notch(Window):
 
     def on_button_enter(self, widget, event):
         self.is_hovered = True
+        self._resync_occlusion()
+        self._check_occlusion()
         window = widget.get_window()
         if window:
             window.set_cursor(Gdk.Cursor(Gdk.CursorType.HAND2))
@@ -451,6 +461,8 @@ class Notch(Window):
             return False
 
         self.is_hovered = False
+        self._resync_occlusion()
+        self._check_occlusion()
         window = widget.get_window()
         if window:
             window.set_cursor(None)
@@ -461,6 +473,7 @@ class Notch(Window):
         self.is_hovered = True
         if data.PANEL_THEME == "Notch" and data.BAR_POSITION != "Top":
             self.notch_revealer.set_reveal_child(True)
+        self._check_occlusion()
         return False
 
     def on_notch_hover_area_leave(self, widget, event):
@@ -470,6 +483,8 @@ class Notch(Window):
             return False
 
         self.is_hovered = False
+        self._resync_occlusion()
+        self._check_occlusion()
 
         return False
 
@@ -497,6 +512,8 @@ class Notch(Window):
             else:
                 self.set_margin("-40px 8px 8px 8px")
 
+        self._check_occlusion()
+
     def open_notch(self, widget_name: str):
         # Debug info for troubleshooting
         if hasattr(self, "_debug_monitor_focus") and self._debug_monitor_focus:
@@ -545,46 +562,15 @@ class Notch(Window):
 
     def _get_real_focused_monitor_id(self):
         """Get the real focused monitor ID directly from Hyprland."""
-        # Use thread to avoid blocking UI
-        self._focused_monitor_result = None
-        GLib.Thread.new("get-focused-monitor", self._get_focused_monitor_thread, None)
-        # Wait for result (not ideal, but for compatibility)
-        import time
-
-        start = time.time()
-        while self._focused_monitor_result is None and time.time() - start < 2.0:
-            time.sleep(0.01)
-        return self._focused_monitor_result
-
-    def _get_focused_monitor_thread(self, user_data):
-        try:
-            import json
-            import subprocess
-
-            # Get focused monitor from Hyprland
-            result = subprocess.run(
-                ["hyprctl", "monitors", "-j"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=2.0,
-            )
-
-            monitors = json.loads(result.stdout)
-            for i, monitor in enumerate(monitors):
-                if monitor.get("focused", False):
-                    self._focused_monitor_result = i
-                    return
+        monitors = get_hyprctl_client().query_json("j/monitors")
+        if not isinstance(monitors, list):
+            print("Warning: Could not get focused monitor from Hyprland")
+            return None
 
-        except (
-            subprocess.CalledProcessError,
-            json.JSONDecodeError,
-            FileNotFoundError,
-            subprocess.TimeoutExpired,
-        ) as e:
-            print(f"Warning: Could not get focused monitor from Hyprland: {e}")
-
-        self._focused_monitor_result = None
+        for i, monitor in enumerate(monitors):
+            if monitor.get("focused", False):
+                return i
+        return None
 
     def _open_notch_internal(self, widget_name: str):
         self.notch_revealer.set_reveal_child(True)
@@ -785,33 +771,17 @@ class Notch(Window):
 
             self.update_window_icon()
 
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers (class names, executables, names) to DesktopApp objects"""
-        identifiers = {}
-        for app in self._all_apps:
-            if app.name:
-                identifiers[app.name.lower()] = app
-
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
-
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
-
-            if app.executable:
-                exe_basename = app.executable.split("/")[-1].lower()
-                identifiers[exe_basename] = app
-
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split("/")[-1].lower()
-                identifiers[cmd_base] = app
-
-        return identifiers
-
     def find_app(self, app_id: str):
-        """Find a DesktopApp object by various identifiers using the pre-built map."""
+        """Find a DesktopApp object by various identifiers using the shared index."""
         normalized_id = app_id.lower()
-        return self.app_identifiers.get(normalized_id)
+        return self.app_index.identifiers.get(normalized_id)
+
+    def _on_hyprland_changes(self, _, changes):
+        if ACTIVE_WINDOW not in changes:
+            return
+        self.update_window_icon()
+        if data.PANEL_THEME == "Notch":
+            self.on_active_window_changed()
 
     def update_window_icon(self, *args):
         """Update the window icon based on the current active window title"""
@@ -827,18 +797,12 @@ class Notch(Window):
 
         self.window_icon.set_visible(True)
 
-        from fabric.hyprland.widgets import get_hyprland_connection
-
-        conn = get_hyprland_connection()
-        if conn:
+        active_client = self.hypr_state.get_active_client()
+        if active_client is not None:
             try:
-                import json
-
-                active_window_json = conn.send_command("j/activewindow").reply.decode()
-                active_window_data = json.loads(active_window_json)
-                app_id = active_window_data.get(
+                app_id = active_client.get(
                     "initialClass", ""
-                ) or active_window_data.get("class", "")
+                ) or active_client.get("class", "")
 
                 icon_size = 20
                 desktop_app = self.find_app(app_id)
@@ -883,32 +847,33 @@ class Notch(Window):
                     "application-x-executable-symbolic", 20
                 )
 
-    def _check_occlusion(self):
-        """
-        Check if top 40px of the screen is occluded by any window
-        and update the notch_revealer accordingly.
+    def _resync_occlusion(self):
+        """Pick up floating windows moved or resized since the last event."""
+        if self._occlusion_watcher is not None:
+            get_occlusion_engine().resync()
+
+    def _check_occlusion(self, *args):
         """
+        Update the notch_revealer from the top 40px occlusion state.
 
-        occlusion_edge = "top"
-        occlusion_size = 40
+        Runs whenever the occlusion watcher flips or one of the hover/open/
+        forced flags changes, instead of on a timer.
+        """
 
         if self._forced_occlusion:
             # When forced occlusion is active, show only on hover
-            self.notch_revealer.set_reveal_child(self.is_hovered)
-        elif not (self.is_hovered or self._is_notch_open or self._prevent_occlusion):
-            is_occluded = check_occlusion((occlusion_edge, occlusion_size))
-            self.notch_revealer.set_reveal_child(not is_occluded)
-
-        return True
+            if self._occlusion_watcher is not None or data.BAR_POSITION in ["Left", "Right"]:
+                self.notch_revealer.set_reveal_child(self.is_hovered)
+        elif self._occlusion_watcher is not None and not (
+            self.is_hovered or self._is_notch_open or self._prevent_occlusion
+        ):
+            self.notch_revealer.set_reveal_child(not self._occlusion_watcher.occluded)
     
     def force_occlusion(self):
         """Force notch to occlusion mode (hidden)."""
         self._forced_occlusion = True
         self._prevent_occlusion = False
         self.notch_revealer.set_reveal_child(False)
-        # Start occlusion check timer if in vertical mode (left/right)
-        if data.BAR_POSITION in ["Left", "Right"]:
-            GLib.timeout_add(100, self._check_occlusion)
     
     def restore_from_occlusion(self):
         """Restore notch from occlusion mode."""
@@ -919,24 +884,14 @@ class Notch(Window):
                 self.notch_revealer.set_reveal_child(True)
             else:
                 self._prevent_occlusion = False
+                self._check_occlusion()
 
     def _get_current_window_class(self):
         """Get the class of the currently active window"""
-        try:
-            from fabric.hyprland.widgets import get_hyprland_connection
-
-            conn = get_hyprland_connection()
-            if conn:
-                import json
-
-                active_window_json = conn.send_command("j/activewindow").reply.decode()
-                active_window_data = json.loads(active_window_json)
-                return active_window_data.get(
-                    "initialClass", ""
-                ) or active_window_data.get("class", "")
-        except Exception as e:
-            print(f"Error getting window class: {e}")
-        return ""
+        active_client = self.hypr_state.get_active_client()
+        if active_client is None:
+            return ""
+        return active_client.get("initialClass", "") or active_client.get("class", "")
 
     def on_active_window_changed(self, *args):
         """
@@ -968,6 +923,7 @@ class Notch(Window):
 
         self._prevent_occlusion = False
         self._occlusion_timer_id = None
+        self._check_occlusion()
 
         return False
 
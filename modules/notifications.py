@@ -1,7 +1,7 @@
-import json
 import locale
 import os
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 from fabric.notifications.service import Notification, NotificationAction, Notifications
@@ -17,11 +17,20 @@ from loguru import logger
 
 import config.data as data
 import modules.icons as icons
+from utils.notification_store import PAGE_SIZE, NotificationStore
 from widgets.image import CustomImage
+from widgets.virtual_list import VirtualList
 from widgets.wayland import WaylandWindow as Window
 
 PERSISTENT_DIR = f"/tmp/{data.APP_NAME}/notifications"
+# Read once to import histories saved before the SQLite store
 PERSISTENT_HISTORY_FILE = os.path.join(PERSISTENT_DIR, "notification_history.json")
+PERSISTENT_HISTORY_DB = os.path.join(PERSISTENT_DIR, "notification_history.sqlite")
+
+# History rows refresh their relative time labels this often while shown
+TIME_TICK_SECONDS = 60
+CACHED_PAGES = 4
+CACHED_PIXBUFS = 128
 
 
 # Get configurable app lists from settings
@@ -35,6 +44,15 @@ def get_history_ignored_apps():
     return config.get("history_ignored_apps", ["Hyprshot"])
 
 
+def remove_cached_image(path):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+            logger.info(f"Deleted cached image: {path}")
+        except Exception as e:
+            logger.error(f"Error deleting cached image {path}: {e}")
+
+
 def cache_notification_pixbuf(notification_box):
     """
     Saves a scaled pixbuf (48x48) in the cache directory and returns the cache file path.
@@ -137,6 +155,21 @@ def get_app_icon_pixbuf(icon_path, width, height):
         return None
 
 
+def load_history_pixbuf(note, size):
+    """
+    Loads the image of a stored notification, or its app icon.
+    """
+    cached_image_path = note.get("cached_image_path")
+    if cached_image_path and os.path.exists(cached_image_path):
+        try:
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                cached_image_path, size, size, False
+            )
+        except Exception as e:
+            logger.error(f"Error loading cached image from {cached_image_path}: {e}")
+    return get_app_icon_pixbuf(note.get("app_icon"), size, size)
+
+
 class ActionButton(Button):
     def __init__(
         self, action: NotificationAction, index: int, total: int, notification_box
@@ -438,27 +471,20 @@ class NotificationBox(Box):
             self._container.resume_all_timeouts()
 
 
-class HistoricalNotification(object):
-    def __init__(
-        self, id, app_icon, summary, body, app_name, timestamp, cached_image_path=None
-    ):
-        self.id = id
-        self.app_icon = app_icon
-        self.summary = summary
-        self.body = body
-        self.app_name = app_name
-        self.timestamp = timestamp
-        self.cached_image_path = cached_image_path
-        self.image_pixbuf = None
-        self.actions = []
-        self.cached_scaled_pixbuf = None
+class NotificationHistory(Box):
+    """
+    Stored notifications, grouped by day, newest first.
 
+    The list is a VirtualList of day headers and notification rows. Its items
+    are built from the store's per-day counts alone; a row's notification is
+    only fetched, a page at a time, when the row comes into view, so opening
+    a long history costs the same as a short one. One minute tick, running
+    while the history is mapped, updates the time labels of the bound rows.
+    """
 
-class NotificationHistory(Box):
     def __init__(self, **kwargs):
         super().__init__(name="notification-history", orientation="v", **kwargs)
 
-        self.containers = []
         self.header_label = Label(
             name="nhh",
             label="Notifications",
@@ -485,15 +511,6 @@ class NotificationHistory(Box):
             center_children=[self.header_label],
             end_children=[self.header_clean],
         )
-        self.notifications_list = Box(
-            name="notifications-list",
-            orientation="v",
-            spacing=4,
-            h_expand=True,
-            v_expand=True,
-            h_align="fill",
-            v_align="fill",
-        )
         self.no_notifications_label = Label(
             name="no-notif",
             markup=icons.notifications_clear,
@@ -511,6 +528,14 @@ class NotificationHistory(Box):
             h_expand=True,
             children=[self.no_notifications_label],
         )
+        self.notifications_list = VirtualList(
+            name="notifications-list",
+            spacing=4,
+            create_row=self.create_row,
+            bind_row=self.bind_row,
+            row_kind=lambda item: item[0],
+            placeholder=self.no_notifications_box,
+        )
         self.scrolled_window = ScrolledWindow(
             name="notification-history-scrolled-window",
             orientation="v",
@@ -518,18 +543,26 @@ class NotificationHistory(Box):
             v_expand=True,
             h_align="fill",
             v_align="fill",
+            child=self.notifications_list,
             propagate_width=False,
             propagate_height=False,
         )
-        self.scrolled_window_viewport_box = Box(
-            orientation="v",
-            children=[self.notifications_list, self.no_notifications_box],
-        )
-        self.scrolled_window.add_with_viewport(self.scrolled_window_viewport_box)
-        self.persistent_notifications = []
+        self.store = NotificationStore(
+            PERSISTENT_HISTORY_DB,
+            max_count=data.NOTIFICATION_HISTORY_MAX_COUNT,
+            max_age_days=data.NOTIFICATION_HISTORY_MAX_AGE_DAYS,
+        )
+        # Store pages (by page number) that rows in view were bound from
+        self._pages = OrderedDict()
+        self._pixbufs = OrderedDict()
+        self._rebuild_id = None
+        self._tick_id = None
+        self._day = None
         self.add(self.history_header)
         self.add(self.scrolled_window)
-        GLib.idle_add(self._load_persistent_history().__next__)
+        self.connect("map", self.on_map)
+        self.connect("unmap", self.on_unmap)
+        GLib.idle_add(self._load_persistent_history)
 
     def get_ordinal(self, n):
         if 11 <= (n % 100) <= 13:
@@ -563,228 +596,105 @@ class NotificationHistory(Box):
                 locale.setlocale(locale.LC_TIME, original_locale)
             return result
 
-    def schedule_midnight_update(self):
-        now = datetime.now()
-        next_midnight = datetime.combine(
-            now.date() + timedelta(days=1), datetime.min.time()
-        )
-        delta_seconds = (next_midnight - now).total_seconds()
-        GLib.timeout_add_seconds(int(delta_seconds), self.on_midnight)
+    def get_time_label(self, arrival_time):
+        minutes = int((datetime.now() - arrival_time).total_seconds() // 60)
+        if minutes < 1:
+            return "now"
+        if minutes < 60:
+            return f"{minutes} min ago"
+        return arrival_time.strftime("%H:%M")
+
+    def on_map(self, *_):
+        if self._day != datetime.now().date():
+            self._do_rebuild_with_separators()
+        else:
+            self._refresh_time_labels()
+        if self._tick_id is None:
+            self._tick_id = GLib.timeout_add_seconds(TIME_TICK_SECONDS, self._on_tick)
+
+    def on_unmap(self, *_):
+        if self._tick_id is not None:
+            GLib.source_remove(self._tick_id)
+            self._tick_id = None
+
+    def _on_tick(self):
+        if self._day != datetime.now().date():
+            # Past midnight, "Today" and "Yesterday" moved
+            self._do_rebuild_with_separators()
+        else:
+            self._refresh_time_labels()
+        return GLib.SOURCE_CONTINUE
 
-    def on_midnight(self):
-        self.rebuild_with_separators()
-        self.schedule_midnight_update()
-        return GLib.SOURCE_REMOVE
-
-    def create_date_separator(self, date_header):
-        return Box(
-            name="notif-date-sep",
-            children=[
-                Label(
-                    name="notif-date-sep-label",
-                    label=date_header,
-                    h_align="center",
-                    h_expand=True,
-                )
-            ],
-        )
+    def _refresh_time_labels(self):
+        for row in self.notifications_list.bound_rows():
+            if row.kind == "note" and row.arrival_time is not None:
+                row.time_label.set_label(self.get_time_label(row.arrival_time))
 
     def rebuild_with_separators(self):
-        GLib.idle_add(self._do_rebuild_with_separators)
+        if self._rebuild_id is None:
+            self._rebuild_id = GLib.idle_add(self._do_rebuild_with_separators)
 
     def _do_rebuild_with_separators(self):
-        children = list(self.notifications_list.get_children())
-        for child in children:
-            self.notifications_list.remove(child)
-
-        current_date_header = None
-        last_date_header = None
-        for container in sorted(
-            self.containers, key=lambda x: x.arrival_time, reverse=True
-        ):
-            arrival_time = container.arrival_time
-            date_header = self.get_date_header(arrival_time)
-            if date_header != current_date_header:
-                sep = self.create_date_separator(date_header)
-                self.notifications_list.add(sep)
-                current_date_header = date_header
-                last_date_header = date_header
-            self.notifications_list.add(container)
-
-        if not self.containers and last_date_header:
-            for child in list(self.notifications_list.get_children()):
-                if child.get_name() == "notif-date-sep":
-                    self.notifications_list.remove(child)
-
-        self.notifications_list.show_all()
-        self.update_no_notifications_label_visibility()
-
-    def on_do_not_disturb_changed(self, switch, pspec):
-        self.do_not_disturb_enabled = switch.get_active()
-        logger.info(
-            f"Do Not Disturb mode {'enabled' if self.do_not_disturb_enabled else 'disabled'}"
-        )
-
-    def clear_history(self, *args):
-        for child in self.notifications_list.get_children()[:]:
-            container = child
-            notif_box = (
-                container.notification_box
-                if hasattr(container, "notification_box")
-                else None
-            )
-            if notif_box:
-                notif_box.destroy(from_history_delete=True)
-            self.notifications_list.remove(child)
-            child.destroy()
-
-        if os.path.exists(PERSISTENT_HISTORY_FILE):
-            try:
-                os.remove(PERSISTENT_HISTORY_FILE)
-                logger.info("Notification history cleared and persistent file deleted.")
-            except Exception as e:
-                logger.error(f"Error deleting persistent history file: {e}")
-        self.persistent_notifications = []
-        self.containers = []
-        self.rebuild_with_separators()
-
-    def _load_persistent_history(self):
-        if not os.path.exists(PERSISTENT_DIR):
-            os.makedirs(PERSISTENT_DIR, exist_ok=True)
-        if os.path.exists(PERSISTENT_HISTORY_FILE):
-            try:
-                with open(PERSISTENT_HISTORY_FILE, "r") as f:
-                    self.persistent_notifications = json.load(f)
-                for note in reversed(self.persistent_notifications):
-                    self._add_historical_notification(note)
-                    yield True
-            except Exception as e:
-                logger.error(f"Error loading persistent history: {e}")
-        GLib.idle_add(self.update_no_notifications_label_visibility)
-        self._cleanup_orphan_cached_images()
-        self.schedule_midnight_update()
-
-    def _save_persistent_history(self):
-        try:
-            with open(PERSISTENT_HISTORY_FILE, "w") as f:
-                json.dump(self.persistent_notifications, f)
-        except Exception as e:
-            logger.error(f"Error saving persistent history: {e}")
-
-    def delete_historical_notification(self, note_id, container):
-        if hasattr(container, "notification_box"):
-            notif_box = container.notification_box
-            notif_box.destroy(from_history_delete=True)
-
-        target_note_id_str = str(note_id)
-
-        new_persistent_notifications = []
-        removed_from_list = False
-        for note_in_list in self.persistent_notifications:
-            current_note_id_str = str(note_in_list.get("id"))
-            if current_note_id_str == target_note_id_str:
-                removed_from_list = True
-
-                continue
-            new_persistent_notifications.append(note_in_list)
+        if self._rebuild_id is not None:
+            GLib.source_remove(self._rebuild_id)
+            self._rebuild_id = None
+        self._pages.clear()
+        items = []
+        position = 0
+        for day, count in self.store.day_counts():
+            items.append(("header", day))
+            items.extend(("note", i) for i in range(position, position + count))
+            position += count
+        self._day = datetime.now().date()
+        self.notifications_list.set_items(items, keep_scroll=True)
+        return False
 
-        if removed_from_list:
-            self.persistent_notifications = new_persistent_notifications
-            logger.info(
-                f"Notification with ID {target_note_id_str} was marked for removal from persistent_notifications list."
-            )
-        else:
-            logger.warning(
-                f"Notification with ID {target_note_id_str} was NOT found in persistent_notifications list. The list remains unchanged."
+    def create_row(self, kind):
+        if kind == "header":
+            label = Label(
+                name="notif-date-sep-label",
+                h_align="center",
+                h_expand=True,
             )
+            row = Box(name="notif-date-sep", children=[label])
+            row.label = label
+            return row
 
-        self._save_persistent_history()
-        container.destroy()
-        self.containers = [c for c in self.containers if c != container]
-        self.rebuild_with_separators()
-
-    def _add_historical_notification(self, note):
-        hist_notif = HistoricalNotification(
-            id=note.get("id"),
-            app_icon=note.get("app_icon"),
-            summary=note.get("summary"),
-            body=note.get("body"),
-            app_name=note.get("app_name"),
-            timestamp=note.get("timestamp"),
-            cached_image_path=note.get("cached_image_path"),
-        )
-
-        hist_box = NotificationBox(hist_notif, timeout_ms=0)
-        hist_box.uuid = hist_notif.id
-        hist_box.cached_image_path = hist_notif.cached_image_path
-        hist_box.set_is_history(True)
-        for child in hist_box.get_children():
-            if child.get_name() == "notification-action-buttons":
-                hist_box.remove(child)
-        container = Box(
-            name="notification-container",
-            orientation="v",
-            h_align="fill",
-            h_expand=True,
-        )
-        container.notification_box = hist_box
-        try:
-            arrival = datetime.fromisoformat(hist_notif.timestamp)
-        except Exception:
-            arrival = datetime.now()
-        container.arrival_time = arrival
-
-        def compute_time_label(arrival_time):
-            return arrival_time.strftime("%H:%M")
-
-        self.hist_time_label = Label(
-            name="notification-timestamp",
-            markup=compute_time_label(container.arrival_time),
-            h_align="start",
-            ellipsization="end",
-        )
-        self.hist_notif_image_box = Box(
+        image = CustomImage()
+        image_box = Box(
             name="notification-image",
             orientation="v",
-            children=[
-                CustomImage(pixbuf=load_scaled_pixbuf(hist_box, 48, 48)),
-                Box(v_expand=True),
-            ],
+            children=[image, Box(v_expand=True)],
         )
-        self.hist_notif_summary_label = Label(
+        # Rows share one height, whether or not they have an image
+        image_box.set_size_request(-1, 48)
+        summary_label = Label(
             name="notification-summary",
-            markup=hist_notif.summary,
             h_align="start",
             ellipsization="end",
         )
-
-        self.hist_notif_app_name_label = Label(
+        app_name_label = Label(
             name="notification-app-name",
-            markup=f"{hist_notif.app_name}",
             h_align="start",
             ellipsization="end",
         )
-
-        self.hist_notif_body_label = (
-            Label(
-                name="notification-body",
-                markup=hist_notif.body,
-                h_align="start",
-                ellipsization="end",
-                line_wrap="word-char",
-            )
-            if hist_notif.body
-            else Box()
+        time_label = Label(
+            name="notification-timestamp",
+            h_align="start",
+            ellipsization="end",
         )
-        self.hist_notif_body_label.set_single_line_mode(
-            True
-        ) if hist_notif.body else None
-
-        self.hist_notif_summary_box = Box(
+        body_label = Label(
+            name="notification-body",
+            h_align="start",
+            ellipsization="end",
+            line_wrap="word-char",
+        )
+        body_label.set_single_line_mode(True)
+        summary_box = Box(
             name="notification-summary-box",
             orientation="h",
             children=[
-                self.hist_notif_summary_label,
+                summary_label,
                 Box(
                     name="notif-sep",
                     h_expand=False,
@@ -792,7 +702,7 @@ class NotificationHistory(Box):
                     h_align="center",
                     v_align="center",
                 ),
-                self.hist_notif_app_name_label,
+                app_name_label,
                 Box(
                     name="notif-sep",
                     h_expand=False,
@@ -800,46 +710,124 @@ class NotificationHistory(Box):
                     h_align="center",
                     v_align="center",
                 ),
-                self.hist_time_label,
+                time_label,
             ],
         )
-        self.hist_notif_text_box = Box(
+        text_box = Box(
             name="notification-text",
             orientation="v",
             v_align="center",
             h_expand=True,
-            children=[
-                self.hist_notif_summary_box,
-                self.hist_notif_body_label,
-            ],
+            children=[summary_box, body_label],
+        )
+        row = Box(
+            name="notification-container",
+            orientation="v",
+            h_align="fill",
+            h_expand=True,
         )
-        self.hist_notif_close_button = Button(
+        close_button = Button(
             name="notif-close-button",
             child=Label(name="notif-close-label", markup=icons.cancel),
-            on_clicked=lambda *_: self.delete_historical_notification(
-                hist_notif.id, container
-            ),
+            on_clicked=lambda *_: self.delete_historical_notification(row.note_id),
         )
-        self.hist_notif_close_button_box = Box(
-            orientation="v",
-            children=[
-                self.hist_notif_close_button,
-                Box(v_expand=True),
-            ],
+        row.add(
+            Box(
+                name="notification-box-hist",
+                spacing=8,
+                children=[
+                    image_box,
+                    text_box,
+                    Box(orientation="v", children=[close_button, Box(v_expand=True)]),
+                ],
+            )
         )
-        content_box = Box(
-            name="notification-box-hist",
-            spacing=8,
-            children=[
-                self.hist_notif_image_box,
-                self.hist_notif_text_box,
-                self.hist_notif_close_button_box,
-            ],
+        row.image = image
+        row.summary_label = summary_label
+        row.app_name_label = app_name_label
+        row.time_label = time_label
+        row.body_label = body_label
+        row.note_id = None
+        row.arrival_time = None
+        return row
+
+    def bind_row(self, row, item, index):
+        kind, value = item
+        if kind == "header":
+            row.label.set_label(self.get_date_header(datetime.fromisoformat(value)))
+            return
+
+        note = self._note_at(value) or {}
+        row.note_id = note.get("id")
+        try:
+            row.arrival_time = datetime.fromisoformat(note["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            row.arrival_time = None
+        row.summary_label.set_markup(note.get("summary") or "")
+        row.app_name_label.set_markup(note.get("app_name") or "")
+        row.body_label.set_markup(note.get("body") or "")
+        row.time_label.set_label(
+            self.get_time_label(row.arrival_time) if row.arrival_time else ""
+        )
+        row.image.set_from_pixbuf(self._note_pixbuf(note) if note else None)
+
+    def _note_at(self, position):
+        """The stored notification at `position`, newest first."""
+        page, offset = divmod(position, PAGE_SIZE)
+        notes = self._pages.get(page)
+        if notes is None:
+            notes = self._pages[page] = self.store.page(offset=page * PAGE_SIZE)
+            while len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return notes[offset] if offset < len(notes) else None
+
+    def _note_pixbuf(self, note):
+        note_id = note.get("id")
+        if note_id in self._pixbufs:
+            self._pixbufs.move_to_end(note_id)
+            return self._pixbufs[note_id]
+        pixbuf = load_history_pixbuf(note, 48)
+        self._pixbufs[note_id] = pixbuf
+        while len(self._pixbufs) > CACHED_PIXBUFS:
+            self._pixbufs.popitem(last=False)
+        return pixbuf
+
+    def on_do_not_disturb_changed(self, switch, pspec):
+        self.do_not_disturb_enabled = switch.get_active()
+        logger.info(
+            f"Do Not Disturb mode {'enabled' if self.do_not_disturb_enabled else 'disabled'}"
         )
-        container.add(content_box)
-        self.containers.insert(0, container)
+
+    def clear_history(self, *args):
+        self._drop_removed_notes(self.store.clear())
+        logger.info("Notification history cleared.")
+        self.rebuild_with_separators()
+
+    def _load_persistent_history(self):
+        self.store.migrate_json(PERSISTENT_HISTORY_FILE)
+        self._drop_removed_notes(self.store.apply_retention())
+        self._do_rebuild_with_separators()
+        self._cleanup_orphan_cached_images()
+        return False
+
+    def _drop_removed_notes(self, notes):
+        """Remove the cached images of notes the store deleted."""
+        for note in notes:
+            self._pixbufs.pop(note.get("id"), None)
+            remove_cached_image(note.get("cached_image_path"))
+
+    def delete_historical_notification(self, note_id):
+        if note_id is None:
+            return
+        note = self.store.delete(note_id)
+        if note:
+            self._drop_removed_notes([note])
+            logger.info(f"Notification with ID {note_id} was removed from history.")
+        else:
+            logger.warning(f"Notification with ID {note_id} was NOT found in history.")
         self.rebuild_with_separators()
-        self.update_no_notifications_label_visibility()
 
     def add_notification(self, notification_box):
         app_name = notification_box.notification.app_name
@@ -853,157 +841,8 @@ class NotificationHistory(Box):
         if app_name in get_limited_apps_history():
             self.clear_history_for_app(app_name)
 
-        if len(self.containers) >= 50:
-            oldest_container = self.containers.pop()
-            if (
-                hasattr(oldest_container, "notification_box")
-                and hasattr(oldest_container.notification_box, "cached_image_path")
-                and oldest_container.notification_box.cached_image_path
-                and os.path.exists(oldest_container.notification_box.cached_image_path)
-            ):
-                try:
-                    os.remove(oldest_container.notification_box.cached_image_path)
-                    logger.info(
-                        f"Deleted cached image of oldest notification due to history limit: {oldest_container.notification_box.cached_image_path}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image of oldest notification: {e}"
-                    )
-            oldest_container.destroy()
-
-        def on_container_destroy(container):
-            if (
-                hasattr(container, "_timestamp_timer_id")
-                and container._timestamp_timer_id
-            ):
-                GLib.source_remove(container._timestamp_timer_id)
-            if hasattr(container, "notification_box"):
-                notif_box = container.notification_box
-            container.destroy()
-            self.containers.remove(container)
-            self.rebuild_with_separators()
-            self.update_no_notifications_label_visibility()
-
-        container = Box(
-            name="notification-container",
-            orientation="v",
-            h_align="fill",
-            h_expand=True,
-        )
-        container.arrival_time = datetime.now()
-
-        def compute_time_label(arrival_time):
-            return arrival_time.strftime("%H:%M")
-
-        self.current_time_label = Label(
-            name="notification-timestamp",
-            markup=compute_time_label(container.arrival_time),
-        )
-        self.current_notif_image_box = Box(
-            name="notification-image",
-            orientation="v",
-            children=[
-                CustomImage(pixbuf=load_scaled_pixbuf(notification_box, 48, 48)),
-                Box(v_expand=True, v_align="fill"),
-            ],
-        )
-        self.current_notif_summary_label = Label(
-            name="notification-summary",
-            markup=notification_box.notification.summary,
-            h_align="start",
-            ellipsization="end",
-        )
-        self.current_notif_app_name_label = Label(
-            name="notification-app-name",
-            markup=f"{notification_box.notification.app_name}",
-            h_align="start",
-            ellipsization="end",
-        )
-        self.current_notif_body_label = (
-            Label(
-                name="notification-body",
-                markup=notification_box.notification.body,
-                h_align="start",
-                ellipsization="end",
-                line_wrap="word-char",
-            )
-            if notification_box.notification.body
-            else Box()
-        )
-        self.current_notif_body_label.set_single_line_mode(
-            True
-        ) if notification_box.notification.body else None
-        self.current_notif_summary_box = Box(
-            name="notification-summary-box",
-            orientation="h",
-            children=[
-                self.current_notif_summary_label,
-                Box(
-                    name="notif-sep",
-                    h_expand=False,
-                    v_expand=False,
-                    h_align="center",
-                    v_align="center",
-                ),
-                self.current_notif_app_name_label,
-                Box(
-                    name="notif-sep",
-                    h_expand=False,
-                    v_expand=False,
-                    h_align="center",
-                    v_align="center",
-                ),
-                self.current_time_label,
-            ],
-        )
-        self.current_notif_text_box = Box(
-            name="notification-text",
-            orientation="v",
-            v_align="center",
-            h_expand=True,
-            children=[
-                self.current_notif_summary_box,
-                self.current_notif_body_label,
-            ],
-        )
-        self.current_notif_close_button = Button(
-            name="notif-close-button",
-            child=Label(name="notif-close-label", markup=icons.cancel),
-            on_clicked=lambda *_: on_container_destroy(container),
-        )
-        self.current_notif_close_button_box = Box(
-            orientation="v",
-            children=[
-                self.current_notif_close_button,
-                Box(v_expand=True),
-            ],
-        )
-        content_box = Box(
-            name="notification-content",
-            spacing=8,
-            children=[
-                self.current_notif_image_box,
-                self.current_notif_text_box,
-                self.current_notif_close_button_box,
-            ],
-        )
-        container.notification_box = notification_box
-        hist_box = Box(
-            name="notification-box-hist",
-            orientation="v",
-            h_align="fill",
-            h_expand=True,
-        )
-        hist_box.add(content_box)
-        content_box.get_children()[2].get_children()[0].connect(
-            "clicked", lambda *_: on_container_destroy(container)
-        )
-        container.add(hist_box)
-        self.containers.insert(0, container)
+        self._append_persistent_notification(notification_box, datetime.now())
         self.rebuild_with_separators()
-        self._append_persistent_notification(notification_box, container.arrival_time)
-        self.update_no_notifications_label_visibility()
 
     def _append_persistent_notification(self, notification_box, arrival_time):
         note = {
@@ -1015,9 +854,7 @@ class NotificationHistory(Box):
             "timestamp": arrival_time.isoformat(),
             "cached_image_path": notification_box.cached_image_path,
         }
-        self.persistent_notifications.insert(0, note)
-        self.persistent_notifications = self.persistent_notifications[:50]
-        self._save_persistent_history()
+        self._drop_removed_notes(self.store.add(note))
 
     def _cleanup_orphan_cached_images(self):
         logger.debug("Starting orphan cached image cleanup.")
@@ -1034,9 +871,7 @@ class NotificationHistory(Box):
             logger.debug("No cached image files found, skipping cleanup.")
             return
 
-        history_uuids = {
-            note.get("id") for note in self.persistent_notifications if note.get("id")
-        }
+        history_uuids = self.store.image_ids()
         deleted_count = 0
         for cached_file in cached_files:
             try:
@@ -1062,52 +897,10 @@ class NotificationHistory(Box):
         else:
             logger.info("Orphan cached image cleanup finished. No orphan images found.")
 
-    def update_no_notifications_label_visibility(self):
-        has_notifications = bool(self.containers)
-        self.no_notifications_box.set_visible(not has_notifications)
-        self.notifications_list.set_visible(has_notifications)
-
     def clear_history_for_app(self, app_name):
         """Clears all notifications in history for a specific app."""
-        containers_to_remove = []
-        persistent_notes_to_remove_ids = set()
-        for container in list(self.containers):
-            if (
-                hasattr(container, "notification_box")
-                and container.notification_box.notification.app_name == app_name
-            ):
-                containers_to_remove.append(container)
-                persistent_notes_to_remove_ids.add(container.notification_box.uuid)
-
-        for container in containers_to_remove:
-            if (
-                hasattr(container, "notification_box")
-                and hasattr(container.notification_box, "cached_image_path")
-                and container.notification_box.cached_image_path
-                and os.path.exists(container.notification_box.cached_image_path)
-            ):
-                try:
-                    os.remove(container.notification_box.cached_image_path)
-                    logger.info(
-                        f"Deleted cached image of replaced history notification: {container.notification_box.cached_image_path}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image of replaced history notification: {e}"
-                    )
-            self.containers.remove(container)
-            self.notifications_list.remove(container)
-            container.notification_box.destroy(from_history_delete=True)
-            container.destroy()
-
-        self.persistent_notifications = [
-            note
-            for note in self.persistent_notifications
-            if note.get("id") not in persistent_notes_to_remove_ids
-        ]
-        self._save_persistent_history()
+        self._drop_removed_notes(self.store.delete_app(app_name))
         self.rebuild_with_separators()
-        self.update_no_notifications_label_visibility()
 
 
 class NotificationContainer(Box):
@@ -1,10 +1,10 @@
 # Thanks to https://github.com/muhchaudhary for the original code. You are a legend.
-import json
+
+from collections import OrderedDict
 
 import cairo
 import gi
 from fabric.hyprland.service import Hyprland
-from fabric.utils.helpers import get_desktop_applications
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -15,6 +15,9 @@ from loguru import logger
 
 import config.data as data
 import modules.icons as icons
+from services.desktop_apps import get_desktop_app_index, normalize_window_class
+from services.event_coalescer import CLIENTS, MONITORS, get_event_coalescer
+from services.hyprland_state import get_hyprland_state
 # WIP icon resolver (app_id to guessing the icon name)
 from utils.icon_resolver import IconResolver
 
@@ -29,6 +32,57 @@ icon_resolver = IconResolver()
 connection = Hyprland()
 BASE_SCALE = 0.1  # Base scale factor for overview
 
+# Resolved window icons by (app id, size); buttons are recreated and resized
+# far more often than icon themes change. Entries belong to one generation
+# of the desktop app index, since a new or edited entry can change an icon.
+ICON_CACHE_SIZE = 256
+_icon_cache: "OrderedDict[tuple[str, int], object]" = OrderedDict()
+_icon_cache_generation = None
+
+
+def get_window_icon(window: Box, app_id: str, size: int):
+    global _icon_cache_generation
+    if _icon_cache_generation != window.app_index.generation:
+        _icon_cache.clear()
+        _icon_cache_generation = window.app_index.generation
+
+    key = (app_id, size)
+    if key in _icon_cache:
+        _icon_cache.move_to_end(key)
+        return _icon_cache[key]
+
+    # Enhanced icon resolution using desktop apps
+    desktop_app = window.find_app(app_id)
+
+    # Get icon using improved method with fallbacks
+    icon_pixbuf = None
+    if desktop_app:
+        icon_pixbuf = desktop_app.get_icon_pixbuf(size=size)
+
+    if not icon_pixbuf:
+        # Fallback to IconResolver
+        icon_pixbuf = icon_resolver.get_icon_pixbuf(app_id, size)
+
+    if not icon_pixbuf:
+        # Additional fallbacks for common apps
+        icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", size)
+        if not icon_pixbuf:
+            icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", size)
+
+    # Ensure icon is scaled to the correct size
+    if icon_pixbuf and (icon_pixbuf.get_width() != size or icon_pixbuf.get_height() != size):
+        icon_pixbuf = icon_pixbuf.scale_simple(
+            size,
+            size,
+            gi.repository.GdkPixbuf.InterpType.BILINEAR
+        )
+
+    _icon_cache[key] = icon_pixbuf
+    if len(_icon_cache) > ICON_CACHE_SIZE:
+        _icon_cache.popitem(last=False)
+    return icon_pixbuf
+
+
 # Credit to Aylur for the drag and drop code
 TARGET = [Gtk.TargetEntry.new("text/plain", Gtk.TargetFlags.SAME_APP, 0)]
 
@@ -68,36 +122,13 @@ class HyprlandWindowButton(Button):
         # Compute dynamic icon sizes based on the button size.
         # Using the minimum dimension of the button for scaling.
         icon_size_main = int(min(self.size) * 0.5)  # adjust factor as needed
-
-        # Enhanced icon resolution using desktop apps
+        self.icon_size = icon_size_main
+        self.icon_image = Image(pixbuf=get_window_icon(window, app_id, icon_size_main))
         desktop_app = window.find_app(app_id)
-        
-        # Get icon using improved method with fallbacks
-        icon_pixbuf = None
-        if desktop_app:
-            icon_pixbuf = desktop_app.get_icon_pixbuf(size=icon_size_main)
-        
-        if not icon_pixbuf:
-            # Fallback to IconResolver
-            icon_pixbuf = icon_resolver.get_icon_pixbuf(app_id, icon_size_main)
-        
-        if not icon_pixbuf:
-            # Additional fallbacks for common apps
-            icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", icon_size_main)
-            if not icon_pixbuf:
-                icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", icon_size_main)
-                
-        # Ensure icon is scaled to the correct size
-        if icon_pixbuf and (icon_pixbuf.get_width() != icon_size_main or icon_pixbuf.get_height() != icon_size_main):
-            icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_main, 
-                icon_size_main, 
-                gi.repository.GdkPixbuf.InterpType.BILINEAR
-            )
 
         super().__init__(
             name="overview-client-box",
-            image=Image(pixbuf=icon_pixbuf),
+            image=self.icon_image,
             tooltip_text=title,
             size=size,
             on_clicked=self.on_button_click,
@@ -132,30 +163,24 @@ class HyprlandWindowButton(Button):
                 return True
         return False
 
+    def set_geometry(self, size, transform: int = 0):
+        """Resize the button in place, refreshing the icon if its size changed."""
+        self.transform = transform % 4
+        self.size = size if transform in [0, 2] else (size[1], size[0])
+        self.set_size_request(int(size[0]), int(size[1]))
+        icon_size = int(min(self.size) * 0.5)
+        if icon_size != self.icon_size:
+            self.icon_size = icon_size
+            self.icon_image.set_from_pixbuf(get_window_icon(self.window, self.app_id, icon_size))
+
+    def set_title(self, title: str):
+        self.title = title
+        self.set_tooltip_text(title)
+
     def update_image(self, image):
         # Compute overlay icon size dynamically.
         icon_size_overlay = int(min(self.size) * 0.5)  # adjust factor as needed
-        
-        # Enhanced icon resolution for overlay
-        icon_pixbuf = None
-        if hasattr(self, 'desktop_app') and self.desktop_app:
-            icon_pixbuf = self.desktop_app.get_icon_pixbuf(size=icon_size_overlay)
-            
-        if not icon_pixbuf:
-            icon_pixbuf = icon_resolver.get_icon_pixbuf(self.app_id, icon_size_overlay)
-            
-        if not icon_pixbuf:
-            icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", icon_size_overlay)
-            if not icon_pixbuf:
-                icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", icon_size_overlay)
-        
-        # Ensure icon is scaled to the correct size
-        if icon_pixbuf and (icon_pixbuf.get_width() != icon_size_overlay or icon_pixbuf.get_height() != icon_size_overlay):
-            icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_overlay, 
-                icon_size_overlay, 
-                gi.repository.GdkPixbuf.InterpType.BILINEAR
-            )
+        icon_pixbuf = get_window_icon(self.window, self.app_id, icon_size_overlay)
                 
         self.set_image(
             Overlay(
@@ -176,7 +201,13 @@ class HyprlandWindowButton(Button):
 
 class WorkspaceEventBox(EventBox):
     def __init__(self, workspace_id: int, fixed: Gtk.Fixed | None = None, monitor_width: int = None, monitor_height: int = None, monitor_scale: float = 1.0):
-        self.fixed = fixed
+        self.fixed = fixed or Gtk.Fixed.new()
+        self.add_label = Label(
+            name="overview-add-label",
+            h_expand=True,
+            v_expand=True,
+            markup=icons.circle_plus,
+        )
         
         # Use provided monitor dimensions or fallback to current screen
         width = monitor_width or CURRENT_WIDTH
@@ -191,14 +222,7 @@ class WorkspaceEventBox(EventBox):
             h_expand=True,
             v_expand=True,
             size=(int(width * container_scale), int(height * container_scale)),
-            child=fixed
-            if fixed
-            else Label(
-                name="overview-add-label",
-                h_expand=True,
-                v_expand=True,
-                markup=icons.circle_plus,
-            ),
+            child=self.fixed if self.fixed.get_children() else self.add_label,
             on_drag_data_received=lambda _w, _c, _x, _y, data, *_: connection.send_command(
                 f"/dispatch movetoworkspacesilent {workspace_id},address:{data.get_data().decode()}"
             ),
@@ -208,8 +232,17 @@ class WorkspaceEventBox(EventBox):
             TARGET,
             Gdk.DragAction.COPY,
         )
-        if fixed:
-            fixed.show_all()
+        self.fixed.show_all()
+
+    def refresh_placeholder(self):
+        """Show the windows, or the add label once the workspace is empty."""
+        child = self.fixed if self.fixed.get_children() else self.add_label
+        current = self.get_child()
+        if current is not child:
+            if current is not None:
+                self.remove(current)
+            self.add(child)
+            child.show_all()
 
 
 
@@ -240,34 +273,27 @@ class Overview(Box):
                 monitor_height = monitor_info['height']
         # Initialize as a Box instead of a PopupWindow.
         super().__init__(name="overview", orientation="v", spacing=8, **kwargs)
-        self.workspace_boxes: dict[int, Box] = {}
+        self.workspace_boxes: dict[int, WorkspaceEventBox] = {}
         self.clients: dict[str, HyprlandWindowButton] = {}
+        # address -> (workspace, x, y, width, height, transform, title) last applied
+        self._client_layout: dict[str, tuple] = {}
+        self._dirty = True
         
-        # Initialize app registry for better icon resolution
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
+        # Shared, cached app registry for better icon resolution
+        self.app_index = get_desktop_app_index()
         
         # Remove the window_class_aliases dictionary completely
 
-        connection.connect("event::openwindow", self.do_update)
-        connection.connect("event::closewindow", self.do_update)
-        connection.connect("event::movewindow", self.do_update)
-        self.update()
+        self.build_workspaces(monitor_width, monitor_height)
+
+        self.hypr_state = get_hyprland_state()
+        get_event_coalescer().connect("changed", self._on_hyprland_changes)
+        # Nothing is patched while hidden; catch up once when shown
+        self.connect("map", self.on_map)
         
     def _normalize_window_class(self, class_name):
         """Normalize window class by removing common suffixes and lowercase."""
-        if not class_name:
-            return ""
-            
-        normalized = class_name.lower()
-        
-        # Remove common suffixes
-        suffixes = [".bin", ".exe", ".so", "-bin", "-gtk"]
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)]
-                
-        return normalized
+        return normalize_window_class(class_name)
     
     def _classes_match(self, class1, class2):
         """Check if two window class names match with stricter comparison."""
@@ -286,80 +312,12 @@ class Overview(Box):
         # This avoids incorrectly matching flatpak apps and others
         return False
         
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers (class names, executables, names) to DesktopApp objects"""
-        identifiers = {}
-        for app in self._all_apps:
-            # Map by name (lowercase)
-            if app.name:
-                identifiers[app.name.lower()] = app
-                
-            # Map by display name
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
-                
-            # Map by window class if available
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
-                
-            # Map by executable name if available
-            if app.executable:
-                exe_basename = app.executable.split('/')[-1].lower()
-                identifiers[exe_basename] = app
-                
-            # Map by command line if available (without parameters)
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split('/')[-1].lower()
-                identifiers[cmd_base] = app
-                
-        return identifiers
-        
     def find_app(self, app_identifier):
         """Return the DesktopApp object by matching any app identifier."""
-        if not app_identifier:
-            return None
-        
-        # Try direct lookup in our identifiers map
-        normalized_id = str(app_identifier).lower()
-        if normalized_id in self.app_identifiers:
-            return self.app_identifiers[normalized_id]
-            
-        # Try with normalized class name
-        norm_id = self._normalize_window_class(normalized_id)
-        if norm_id in self.app_identifiers:
-            return self.app_identifiers[norm_id]
-            
-        # More targeted matching with exact names only
-        for app in self._all_apps:
-            if app.name and app.name.lower() == normalized_id:
-                return app
-            if app.window_class and app.window_class.lower() == normalized_id:
-                return app
-            if app.display_name and app.display_name.lower() == normalized_id:
-                return app
-            # Try with executable basename
-            if app.executable:
-                exe_base = app.executable.split('/')[-1].lower()
-                if exe_base == normalized_id:
-                    return app
-            # Try with command basename
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split('/')[-1].lower()
-                if cmd_base == normalized_id:
-                    return app
-                
-        return None
-
-    def update(self, signal_update=False):
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
-        for client in self.clients.values():
-            client.destroy()
-        self.clients.clear()
-        for workspace in self.workspace_boxes.values():
-            workspace.destroy()
-        self.workspace_boxes.clear()
+        return self.app_index.find_app(app_identifier)
 
+    def build_workspaces(self, monitor_width, monitor_height):
+        """Create the workspace grid once; windows are patched into it later."""
         if data.PANEL_THEME == "Panel" and data.BAR_POSITION in ["Left", "Right"]:
             rows = 5
             cols = 2
@@ -369,48 +327,11 @@ class Overview(Box):
 
         self.children = [Box(spacing=8) for _ in range(rows)]
 
-        # Get monitor dimensions and scale for scaling
-        monitor_width = CURRENT_WIDTH
-        monitor_height = CURRENT_HEIGHT
         monitor_scale = 1.0
-        
         if self.monitor_manager:
             monitor_info = self.monitor_manager.get_monitor_by_id(self.monitor_id)
             if monitor_info:
-                monitor_width = monitor_info['width']
-                monitor_height = monitor_info['height']
                 monitor_scale = monitor_info.get('scale', 1.0)
-        
-        # Calculate effective scale for this monitor
-        # Higher scale monitors need larger overview elements to appear the same physical size
-        effective_scale = BASE_SCALE * monitor_scale
-
-        monitors = {
-            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
-            for monitor in json.loads(connection.send_command("j/monitors").reply.decode())
-        }
-        
-        # Filter clients to only show those in this monitor's workspace range
-        for client in json.loads(connection.send_command("j/clients").reply.decode()):
-            workspace_id = client["workspace"]["id"]
-            if workspace_id > 0 and self.workspace_start <= workspace_id <= self.workspace_end:
-                btn = HyprlandWindowButton(
-                    window=self,
-                    title=client["title"],
-                    address=client["address"],
-                    app_id=client["initialClass"],
-                    size=(client["size"][0] * effective_scale, client["size"][1] * effective_scale),
-                    transform=monitors[client["monitor"]][2],
-                )
-                self.clients[client["address"]] = btn
-                w_id = workspace_id
-                if w_id not in self.workspace_boxes:
-                    self.workspace_boxes[w_id] = Gtk.Fixed.new()
-                self.workspace_boxes[w_id].put(
-                    btn,
-                    abs(client["at"][0] - monitors[client["monitor"]][0]) * effective_scale,
-                    abs(client["at"][1] - monitors[client["monitor"]][1]) * effective_scale,
-                )
 
         # Generate workspaces only for this monitor's range
         for w_id in range(self.workspace_start, self.workspace_end + 1):
@@ -419,24 +340,121 @@ class Overview(Box):
                 row = 0 if idx < cols else 1
             else:
                 row = idx // cols
-            overview_row = self.children[row]
-            overview_row.add(
+            self.workspace_boxes[w_id] = WorkspaceEventBox(
+                w_id,
+                monitor_width=monitor_width,
+                monitor_height=monitor_height,
+                monitor_scale=monitor_scale
+            )
+            self.children[row].add(
                 Box(
                     name="overview-workspace-box",
                     orientation="vertical",
                     children=[
                         Label(name="overview-workspace-label", label=f"Workspace {w_id}"),
-                        WorkspaceEventBox(
-                            w_id,
-                            self.workspace_boxes.get(w_id),
-                            monitor_width=monitor_width,
-                            monitor_height=monitor_height,
-                            monitor_scale=monitor_scale
-                        ),
+                        self.workspace_boxes[w_id],
                     ],
                 )
             )
 
-    def do_update(self, *_):
-        logger.info(f"[Overview] Updating for :{_[1].name}")
-        self.update(signal_update=True)
+    def _remove_client(self, address: str) -> int:
+        button = self.clients.pop(address)
+        workspace_id = self._client_layout.pop(address)[0]
+        self.workspace_boxes[workspace_id].fixed.remove(button)
+        button.destroy()
+        return workspace_id
+
+    def update(self, signal_update=False):
+        """Reconcile window buttons with the Hyprland state, touching only what changed."""
+        self._dirty = False
+
+        # Get monitor scale for scaling
+        monitor_scale = 1.0
+        if self.monitor_manager:
+            monitor_info = self.monitor_manager.get_monitor_by_id(self.monitor_id)
+            if monitor_info:
+                monitor_scale = monitor_info.get('scale', 1.0)
+        
+        # Calculate effective scale for this monitor
+        # Higher scale monitors need larger overview elements to appear the same physical size
+        effective_scale = BASE_SCALE * monitor_scale
+
+        monitors = {
+            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
+            for monitor in self.hypr_state.get_monitors()
+        }
+
+        # Filter clients to only show those in this monitor's workspace range
+        wanted = {}
+        for client in self.hypr_state.get_clients():
+            workspace_id = client["workspace"]["id"]
+            if client.get("monitor") not in monitors:
+                continue
+            if workspace_id > 0 and self.workspace_start <= workspace_id <= self.workspace_end:
+                mon_x, mon_y, transform = monitors[client["monitor"]]
+                wanted[client["address"]] = (client, (
+                    workspace_id,
+                    abs(client["at"][0] - mon_x) * effective_scale,
+                    abs(client["at"][1] - mon_y) * effective_scale,
+                    client["size"][0] * effective_scale,
+                    client["size"][1] * effective_scale,
+                    transform,
+                    client["title"],
+                ))
+
+        touched = set()
+        for address in [a for a in self.clients if a not in wanted]:
+            touched.add(self._remove_client(address))
+
+        for address, (client, layout) in wanted.items():
+            w_id, x, y, width, height, transform, title = layout
+            button = self.clients.get(address)
+            previous = self._client_layout.get(address)
+
+            if button is not None and button.app_id != client["initialClass"]:
+                touched.add(self._remove_client(address))
+                button = None
+
+            if button is None:
+                button = HyprlandWindowButton(
+                    window=self,
+                    title=title,
+                    address=address,
+                    app_id=client["initialClass"],
+                    size=(width, height),
+                    transform=transform,
+                )
+                self.clients[address] = button
+                self.workspace_boxes[w_id].fixed.put(button, x, y)
+                button.show_all()
+                touched.add(w_id)
+            elif previous != layout:
+                old_w_id, old_x, old_y, old_width, old_height, old_transform, old_title = previous
+                if old_w_id != w_id:
+                    self.workspace_boxes[old_w_id].fixed.remove(button)
+                    self.workspace_boxes[w_id].fixed.put(button, x, y)
+                    touched.update((old_w_id, w_id))
+                elif (old_x, old_y) != (x, y):
+                    self.workspace_boxes[w_id].fixed.move(button, x, y)
+                if (old_width, old_height, old_transform) != (width, height, transform):
+                    button.set_geometry((width, height), transform)
+                if old_title != title:
+                    button.set_title(title)
+
+            self._client_layout[address] = layout
+
+        for w_id in touched:
+            self.workspace_boxes[w_id].refresh_placeholder()
+
+    def _on_hyprland_changes(self, _, changes):
+        if not changes.has_any(CLIENTS, MONITORS):
+            return
+        self._dirty = True
+        # Changes already arrive once per frame; while hidden, wait for map
+        if self.get_mapped():
+            self.update(signal_update=True)
+
+    def on_map(self, *_):
+        if self._dirty:
+            logger.info("[Overview] Reconciling windows on open")
+            self.update()
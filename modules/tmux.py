@@ -1,7 +1,7 @@
 import os
 import subprocess
 
-from fabric.utils import exec_shell_command_async, idle_add, remove_handler
+from fabric.utils import exec_shell_command_async
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
@@ -11,6 +11,7 @@ from gi.repository import Gdk, GLib, Gtk
 
 import config.data as data
 import modules.icons as icons
+from widgets.virtual_list import VirtualList
 
 
 class TmuxManager(Box):
@@ -25,9 +26,29 @@ class TmuxManager(Box):
         self.notch = kwargs["notch"]
         self.selected_index = -1  # Track the selected item index
 
-        self._arranger_handler: int = 0
-
-        self.viewport = Box(name="viewport", spacing=4, orientation="v")
+        self.viewport = VirtualList(
+            name="viewport",
+            spacing=4,
+            create_row=self.create_session_slot,
+            bind_row=self.bind_session_slot,
+            placeholder=Box(
+                name="no-tmux-container",
+                orientation="v",
+                h_align="center",
+                v_align="center",
+                h_expand=True,
+                v_expand=True,
+                children=[
+                    # Shown when there are no sessions
+                    Label(
+                        name="no-tmux",
+                        markup=icons.terminal,
+                        h_align="center",
+                        v_align="center",
+                    )
+                ],
+            ),
+        )
         self.session_name_entry = Entry(
             name="session-name-entry",
             placeholder="Create Tmux Session...",
@@ -86,7 +107,7 @@ class TmuxManager(Box):
 
     def close_manager(self):
         """Close the tmux manager"""
-        self.viewport.children = []
+        self.viewport.clear()
         self.selected_index = -1  # Reset selection
         self.notch.close_notch()
 
@@ -98,39 +119,8 @@ class TmuxManager(Box):
 
     def refresh_sessions(self):
         """Get tmux sessions and populate the viewport"""
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.children = []
         self.selected_index = -1  # Clear selection when viewport changes
-
-        # Get tmux sessions
-        sessions = self.get_tmux_sessions()
-        if not sessions:
-            # Create a container box to better center the message
-            container = Box(
-                name="no-tmux-container",
-                orientation="v",
-                h_align="center",
-                v_align="center",
-                h_expand=True,
-                v_expand=True
-            )
-            
-            # Show a message if no sessions
-            label = Label(
-                name="no-tmux",
-                markup=icons.terminal,
-                h_align="center",
-                v_align="center",
-            )
-            
-            container.add(label)
-            
-            self.viewport.add(container)
-            return
-
-        # Add session slots to viewport
-        for session in sessions:
-            self.viewport.add(self.create_session_slot(session))
+        self.viewport.set_items(self.get_tmux_sessions())
 
     def get_tmux_sessions(self):
         """Get list of tmux sessions"""
@@ -147,21 +137,19 @@ class TmuxManager(Box):
             print(f"Error getting tmux sessions: {e}")
             return []
 
-    def create_session_slot(self, session_name):
-        """Create a button for a tmux session"""
+    def create_session_slot(self, kind=None):
+        """Create a pooled button for tmux sessions; bind_session_slot fills it in"""
         # Create an entry for inline editing (initially hidden)
         name_entry = Entry(
             name="session-name-entry",
-            text=session_name,
             visible=False,
-            on_activate=lambda entry, *_: self.finish_rename(button, session_name, entry),
+            on_activate=lambda entry, *_: self.finish_rename(button, button.item, entry),
             on_key_press_event=self.on_rename_key_press,
         )
         
         # Create the label showing the session name
         name_label = Label(
             name="app-label",
-            label=session_name,
             ellipsization="end",
             v_align="center",
             h_align="center",
@@ -185,24 +173,32 @@ class TmuxManager(Box):
         button = Button(
             name="slot-button",  # reuse existing CSS styling
             child=slot_box,
-            tooltip_text=f"Attach to session: {session_name}",
-            on_clicked=lambda *_: self.attach_to_session(session_name),
+            on_clicked=lambda b, *_: self.attach_to_session(b.item),
             can_focus=True,  # Ensure the button can receive focus
         )
         
         # Add double-click handler to start renaming
-        button.connect("button-press-event", self.on_session_click, session_name, name_label, name_entry)
+        button.connect("button-press-event", lambda b, event: self.on_session_click(b, event, b.item, b.name_label, b.name_entry))
         
         # Add key press handler for 'r' to rename
-        button.connect("key-press-event", self.on_slot_key_press, session_name, name_label, name_entry)
+        button.connect("key-press-event", lambda b, event: self.on_slot_key_press(b, event, b.item, b.name_label, b.name_entry))
         
         # Store reference to entry and label in button for later access
         button.name_entry = name_entry
         button.name_label = name_label
-        button.session_name = session_name
         
         return button
 
+    def bind_session_slot(self, button, session_name, index):
+        """Show a session in a pooled button, leaving any inline rename"""
+        button.session_name = session_name
+        button.name_label.set_label(session_name)
+        button.name_entry.set_text(session_name)
+        button.name_entry.set_visible(False)
+        button.name_label.set_visible(True)
+        button.get_style_context().remove_class("editing")
+        button.set_tooltip_text(f"Attach to session: {session_name}")
+
     def on_session_click(self, button, event, session_name, label, entry):
         """Handle clicks on session buttons"""
         # Handle double-click to rename
@@ -1,152 +1,133 @@
-import dbus
-
-class UPowerManager():
-
-    def __init__(self):
-        self.UPOWER_NAME = "org.freedesktop.UPower"
-        self.UPOWER_PATH = "/org/freedesktop/UPower"
-
-        self.DBUS_PROPERTIES = "org.freedesktop.DBus.Properties"
-        self.bus = dbus.SystemBus()
-
-    def detect_devices(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.UPOWER_NAME)
-
-        devices = upower_interface.EnumerateDevices()
-        return devices
-
-    def get_display_device(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.UPOWER_NAME)
-
-        dispdev = upower_interface.GetDisplayDevice()
-        return dispdev
-
-    def get_critical_action(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.UPOWER_NAME)
-
-        critical_action = upower_interface.GetCriticalAction()
-        return critical_action
-
-    def get_device_percentage(self, battery):
-        battery_proxy = self.bus.get_object(self.UPOWER_NAME, battery)
-        battery_proxy_interface = dbus.Interface(battery_proxy, self.DBUS_PROPERTIES)
-
-        return battery_proxy_interface.Get(self.UPOWER_NAME + ".Device", "Percentage")
-
-    def get_full_device_information(self, battery):
-        battery_proxy = self.bus.get_object(self.UPOWER_NAME, battery)
-        battery_proxy_interface = dbus.Interface(battery_proxy, self.DBUS_PROPERTIES)
-
-        # Use GetAll to retrieve all properties in a single DBus call
-        all_properties = battery_proxy_interface.GetAll(self.UPOWER_NAME + ".Device")
-        
-        # Extract properties with default values for missing keys
-        information_table = {
-            'HasHistory': all_properties.get('HasHistory', False),
-            'HasStatistics': all_properties.get('HasStatistics', False), 
-            'IsPresent': all_properties.get('IsPresent', False),
-            'IsRechargeable': all_properties.get('IsRechargeable', False),
-            'Online': all_properties.get('Online', False),
-            'PowerSupply': all_properties.get('PowerSupply', False),
-            'Capacity': all_properties.get('Capacity', 0.0),
-            'Energy': all_properties.get('Energy', 0.0),
-            'EnergyEmpty': all_properties.get('EnergyEmpty', 0.0),
-            'EnergyFull': all_properties.get('EnergyFull', 0.0),
-            'EnergyFullDesign': all_properties.get('EnergyFullDesign', 0.0),
-            'EnergyRate': all_properties.get('EnergyRate', 0.0),
-            'Luminosity': all_properties.get('Luminosity', 0.0),
-            'Percentage': all_properties.get('Percentage', 0.0),
-            'Temperature': all_properties.get('Temperature', 0.0),
-            'Voltage': all_properties.get('Voltage', 0.0),
-            'TimeToEmpty': all_properties.get('TimeToEmpty', 0),
-            'TimeToFull': all_properties.get('TimeToFull', 0),
-            'IconName': all_properties.get('IconName', ''),
-            'Model': all_properties.get('Model', ''),
-            'NativePath': all_properties.get('NativePath', ''),
-            'Serial': all_properties.get('Serial', ''),
-            'Vendor': all_properties.get('Vendor', ''),
-            'State': all_properties.get('State', 0),
-            'Technology': all_properties.get('Technology', 0),
-            'Type': all_properties.get('Type', 0),
-            'WarningLevel': all_properties.get('WarningLevel', 0),
-            'UpdateTime': all_properties.get('UpdateTime', 0)
-        }
-
-        return information_table
-
-    def is_lid_present(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.DBUS_PROPERTIES)
-
-        is_lid_present = bool(upower_interface.Get(self.UPOWER_NAME, 'LidIsPresent'))
-        return is_lid_present
-
-    def is_lid_closed(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.DBUS_PROPERTIES)
-
-        is_lid_closed = bool(upower_interface.Get(self.UPOWER_NAME, 'LidIsClosed'))
-        return is_lid_closed
-
-    def on_battery(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH)
-        upower_interface = dbus.Interface(upower_proxy, self.DBUS_PROPERTIES)
-
-        on_battery = bool(upower_interface.Get(self.UPOWER_NAME, 'OnBattery'))
-        return on_battery
-
-    def has_wakeup_capabilities(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH + "/Wakeups")
-        upower_interface = dbus.Interface(upower_proxy, self.DBUS_PROPERTIES)
-
-        has_wakeup_capabilities = bool(upower_interface.Get(self.UPOWER_NAME+ '.Wakeups', 'HasCapability'))
-        return has_wakeup_capabilities
-
-    def get_wakeups_data(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH + "/Wakeups")
-        upower_interface = dbus.Interface(upower_proxy, self.UPOWER_NAME + '.Wakeups')
-
-        data = upower_interface.GetData()
-        return data
-
-    def get_wakeups_total(self):
-        upower_proxy = self.bus.get_object(self.UPOWER_NAME, self.UPOWER_PATH + "/Wakeups")
-        upower_interface = dbus.Interface(upower_proxy, self.UPOWER_NAME + '.Wakeups')
-
-        data = upower_interface.GetTotal()
-        return data
-
-    def is_loading(self, battery):
-        battery_proxy = self.bus.get_object(self.UPOWER_NAME, battery)
-        battery_proxy_interface = dbus.Interface(battery_proxy, self.DBUS_PROPERTIES)
-
-        state = int(battery_proxy_interface.Get(self.UPOWER_NAME + ".Device", "State"))
-
-        if (state == 1):
-            return True
-        else:
-            return False
-
-    def get_state(self, battery):
-        battery_proxy = self.bus.get_object(self.UPOWER_NAME, battery)
-        battery_proxy_interface = dbus.Interface(battery_proxy, self.DBUS_PROPERTIES)
-
-        state = int(battery_proxy_interface.Get(self.UPOWER_NAME + ".Device", "State"))
-
-        if (state == 0):
-            return "Unknown"
-        elif (state == 1):
-            return "Loading"
-        elif (state == 2):
-            return "Discharging"
-        elif (state == 3):
-            return "Empty"
-        elif (state == 4):
-            return "Fully charged"
-        elif (state == 5):
-            return "Pending charge"
-        elif (state == 6):
-            return "Pending discharge"
+"""
+UPower display device state over D-Bus.
+
+The DisplayDevice proxy is created asynchronously and kept up to date by
+UPower's PropertiesChanged signal, so reading the battery state never
+blocks and nothing polls the system bus.
+"""
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+UPOWER_NAME = "org.freedesktop.UPower"
+DISPLAY_DEVICE_PATH = "/org/freedesktop/UPower/devices/DisplayDevice"
+DEVICE_INTERFACE = "org.freedesktop.UPower.Device"
+
+# Device.State values
+STATE_UNKNOWN = 0
+STATE_CHARGING = 1
+STATE_DISCHARGING = 2
+STATE_EMPTY = 3
+STATE_FULLY_CHARGED = 4
+STATE_PENDING_CHARGE = 5
+STATE_PENDING_DISCHARGE = 6
+
+
+class UPowerService(Service):
+    """Battery percentage, state and time estimates of UPower's DisplayDevice."""
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if UPowerService.instance is None:
+            UPowerService.instance = UPowerService()
+
+        return UPowerService.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Emitted once after any of the signals below, or when the battery comes or goes."""
+
+    @Signal
+    def percentage_changed(self, percentage: float) -> None: ...
+
+    @Signal
+    def state_changed(self, state: int) -> None: ...
+
+    @Signal
+    def time_changed(self, time_to_empty: int, time_to_full: int) -> None: ...
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.is_present = False
+        self.percentage = 0.0
+        self.state = STATE_UNKNOWN
+        self.time_to_empty = 0
+        self.time_to_full = 0
+        self._proxy = None
+
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SYSTEM,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            UPOWER_NAME,
+            DISPLAY_DEVICE_PATH,
+            DEVICE_INTERFACE,
+            None,
+            self._on_proxy_ready,
+            None,
+        )
+
+    @property
+    def is_charging(self) -> bool:
+        return self.state == STATE_CHARGING
+
+    def _on_proxy_ready(self, _, result, __):
+        try:
+            self._proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            logger.warning(f"[UPower] Display device unavailable: {e.message}")
+            return
+        self._proxy.connect("g-properties-changed", self._on_properties_changed)
+        self._apply(
+            {
+                name: self._get_cached(name)
+                for name in ("IsPresent", "Percentage", "State", "TimeToEmpty", "TimeToFull")
+            }
+        )
+
+    def _get_cached(self, name: str):
+        value = self._proxy.get_cached_property(name)
+        return value.unpack() if value is not None else None
+
+    def _on_properties_changed(self, proxy, changed: GLib.Variant, invalidated):
+        self._apply(changed.unpack())
+
+    def _apply(self, properties: dict):
+        is_present = properties.get("IsPresent")
+        presence_changed = is_present is not None and bool(is_present) != self.is_present
+        if presence_changed:
+            self.is_present = bool(is_present)
+
+        percentage = properties.get("Percentage")
+        percentage_changed = percentage is not None and percentage != self.percentage
+        if percentage_changed:
+            self.percentage = float(percentage)
+
+        state = properties.get("State")
+        state_changed = state is not None and state != self.state
+        if state_changed:
+            self.state = int(state)
+
+        time_changed = False
+        for name, attribute in (("TimeToEmpty", "time_to_empty"), ("TimeToFull", "time_to_full")):
+            value = properties.get(name)
+            if value is not None and value != getattr(self, attribute):
+                setattr(self, attribute, int(value))
+                time_changed = True
+
+        if percentage_changed:
+            self.emit("percentage-changed", self.percentage)
+        if state_changed:
+            self.emit("state-changed", self.state)
+        if time_changed:
+            self.emit("time-changed", self.time_to_empty, self.time_to_full)
+        if presence_changed or percentage_changed or state_changed or time_changed:
+            self.emit("changed")
+
+
+def get_upower_service() -> UPowerService:
+    """Get the global UPowerService instance."""
+    return UPowerService.get_initial()
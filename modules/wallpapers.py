@@ -1,9 +1,8 @@
 import colorsys
-import concurrent.futures
-import hashlib
 import os
 import random  # <--- AÑADIDO
 import shutil
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
 from fabric.utils.helpers import exec_shell_command_async
@@ -13,11 +12,16 @@ from fabric.widgets.entry import Entry
 from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
 from gi.repository import Gdk, GdkPixbuf, Gio, GLib, Gtk, Pango
-from PIL import Image
 
 import config.config
 import config.data as data
 import modules.icons as icons
+from utils.thumbnail_queue import ThumbnailRenderQueue
+from utils.wallpaper_search import WallpaperSearchIndex
+from utils.wallpaper_thumbnails import THUMBNAIL_SIZE, ThumbnailCache
+
+# Thumbnails moved from the UI thread into the view per idle callback
+THUMBNAIL_BATCH_SIZE = 50
 
 
 class WallpaperSelector(Box):
@@ -30,20 +34,41 @@ class WallpaperSelector(Box):
             shutil.rmtree(old_cache_dir)
 
         super().__init__(name="wallpapers", spacing=4, orientation="v", h_expand=False, v_expand=False, **kwargs)
-        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        self.thumbs = ThumbnailCache(self.CACHE_DIR)
 
         self.files = []
+        self.file_stats = {}
         GLib.idle_add(self._load_wallpapers_async().__next__)
-        self.thumbnails = []
+        self.thumbnails = {}  # file name -> pixbuf
+        self.failed_files = set()
         self.thumbnail_queue = []
+        self._queue_lock = threading.Lock()
+        self._batch_scheduled = False
+        self._index_save_id = None
         self.executor = ThreadPoolExecutor(max_workers=4)  # Shared executor
+        # Missing thumbnails are rendered here, visible ones first
+        self.render_queue = ThumbnailRenderQueue(
+            self._on_thumbnail_rendered,
+            self._visible_files,
+            use_processes=data.WALLPAPERS_PROCESS_POOL,
+        )
+
+        # Rows by file name; shown blank until their thumbnail is ready
+        self._rows = {}
+        self.search_index = WallpaperSearchIndex()
+        self.placeholder = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self.placeholder.fill(0x00000000)
 
         # Variable to control the selection (similar to AppLauncher)
         self.selected_index = -1
 
         # Initialize UI components
         self.viewport = Gtk.IconView(name="wallpaper-icons")
-        self.viewport.set_model(Gtk.ListStore(GdkPixbuf.Pixbuf, str))
+        # Every wallpaper has a row; searching only flips the visible column
+        self.store = Gtk.ListStore(GdkPixbuf.Pixbuf, str, bool)
+        self.filter_model = self.store.filter_new()
+        self.filter_model.set_visible_column(2)
+        self.viewport.set_model(self.filter_model)
         self.viewport.set_pixbuf_column(0)
         # Hide text column so only the image is shown
         self.viewport.set_text_column(-1)
@@ -175,8 +200,8 @@ class WallpaperSelector(Box):
 
         # Removed the old main_content_box and its add
 
-        self._start_thumbnail_thread()
         self.connect("map", self.on_map)
+        self.connect("unmap", self.on_unmap)
         self.setup_file_monitor()
         self.show_all()
         self.randomize_dice_icon()
@@ -204,30 +229,24 @@ class WallpaperSelector(Box):
                             )
                         except Exception as e:
                             print(f"Error renaming file {full_path}: {e}")
-                        yield
-
-        # Process files in small batches to keep UI responsive
-        file_list = os.listdir(data.WALLPAPERS_DIR)
-        batch_size = 20
-
-        # Process files in batches
-        for i in range(0, len(file_list), batch_size):
-            batch = file_list[i : i + batch_size]
-            for filename in batch:
-                if self._is_image(filename):
-                    self.files.append(filename)
-
-            # Sort the current batch to maintain order
-            self.files.sort()
-
-            # Yield to let the main loop process events
-            yield True
+                        yield True
 
-        # Final sort of the complete list
-        self.files.sort()
-
-        # Start thumbnail loading after files are processed
-        self._start_thumbnail_thread()
+        # One stat per wallpaper is all the thumbnail index needs
+        with os.scandir(data.WALLPAPERS_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and self._is_image(entry.name):
+                    try:
+                        self.file_stats[entry.name] = entry.stat()
+                    except OSError:
+                        continue
+        self.files = sorted(self.file_stats)
+
+        # Show every wallpaper right away and fill in thumbnails in view order
+        self._rebuild_store()
+        for order, file_name in enumerate(self.files):
+            self._queue_thumbnail(file_name, order)
+        live_paths = [os.path.join(data.WALLPAPERS_DIR, f) for f in self.files]
+        self.executor.submit(self._prune_cache, live_paths)
 
         # Return False to stop the idle callback
         yield False
@@ -284,14 +303,15 @@ class WallpaperSelector(Box):
         if event_type == Gio.FileMonitorEvent.DELETED:
             if file_name in self.files:
                 self.files.remove(file_name)
-                cache_path = self._get_cache_path(file_name)
-                if os.path.exists(cache_path):
-                    try:
-                        os.remove(cache_path)
-                    except Exception as e:
-                        print(f"Error deleting cache {cache_path}: {e}")
-                self.thumbnails = [(p, n) for p, n in self.thumbnails if n != file_name]
-                GLib.idle_add(self.arrange_viewport, self.search_entry.get_text())
+                self.file_stats.pop(file_name, None)
+                self.thumbnails.pop(file_name, None)
+                self.failed_files.discard(file_name)
+                self.search_index.remove(file_name)
+                self.executor.submit(self.thumbs.forget, os.path.join(data.WALLPAPERS_DIR, file_name))
+                self._schedule_index_save()
+                row = self._rows.pop(file_name, None)
+                if row is not None:
+                    self.store.remove(row)
         elif event_type == Gio.FileMonitorEvent.CREATED:
             if self._is_image(file_name):
                 # Convert filename to lowercase and replace spaces with "-"
@@ -308,28 +328,44 @@ class WallpaperSelector(Box):
                 if file_name not in self.files:
                     self.files.append(file_name)
                     self.files.sort()
-                    self.executor.submit(self._process_file, file_name)
+                    self._refresh_file(file_name)
+                    self._rebuild_store()
         elif event_type == Gio.FileMonitorEvent.CHANGED:
             if self._is_image(file_name) and file_name in self.files:
-                cache_path = self._get_cache_path(file_name)
-                if os.path.exists(cache_path):
-                    try:
-                        os.remove(cache_path)
-                    except Exception as e:
-                        print(f"Error deleting cache for changed file {file_name}: {e}")
-                self.executor.submit(self._process_file, file_name)
+                # A new mtime or size means a new thumbnail key
+                self._refresh_file(file_name)
+
+    def _refresh_file(self, file_name: str):
+        try:
+            stat = os.stat(os.path.join(data.WALLPAPERS_DIR, file_name))
+        except OSError:
+            return
+        self.file_stats[file_name] = stat
+        self.failed_files.discard(file_name)
+        self._queue_thumbnail(file_name, self.files.index(file_name))
+
+    def _rebuild_store(self):
+        """Recreate the rows after the set of wallpapers changed."""
+        self.store.clear()
+        self._rows = {}
+        for file_name in sorted(self.files, key=str.lower):
+            if file_name in self.failed_files:
+                continue
+            pixbuf = self.thumbnails.get(file_name, self.placeholder)
+            # ListStore iters stay valid until the row is removed
+            self._rows[file_name] = self.store.append([pixbuf, file_name, True])
+        self.arrange_viewport(self.search_entry.get_text())
+
+    def _apply_filter(self, query: str):
+        matches = self.search_index.search(query)
+        for file_name, row in self._rows.items():
+            visible = matches is None or file_name in matches
+            if self.store.get_value(row, 2) != visible:
+                self.store.set_value(row, 2, visible)
 
     def arrange_viewport(self, query: str = ""):
+        self._apply_filter(query)
         model = self.viewport.get_model()
-        model.clear()
-        filtered_thumbnails = [
-            (thumb, name)
-            for thumb, name in self.thumbnails
-            if query.casefold() in name.casefold()
-        ]
-        filtered_thumbnails.sort(key=lambda x: x[1].lower())
-        for pixbuf, file_name in filtered_thumbnails:
-            model.append([pixbuf, file_name])
         # If the search entry is empty, no icon is selected; otherwise, select the first one.
         if query.strip() == "":
             self.viewport.unselect_all()
@@ -472,52 +508,106 @@ class WallpaperSelector(Box):
         self.viewport.scroll_to_path(path, False, 0.5, 0.5)  # Ensure the selected icon is visible
         self.selected_index = new_index
 
-    def _start_thumbnail_thread(self):
-        thread = GLib.Thread.new("thumbnail-loader", self._preload_thumbnails, None)
-
-    def _preload_thumbnails(self, _data):
-        futures = [self.executor.submit(self._process_file, file_name) for file_name in self.files]
-        concurrent.futures.wait(futures)
-        GLib.idle_add(self._process_batch)
-
-    def _process_file(self, file_name):
+    def _queue_thumbnail(self, file_name: str, order: int):
         full_path = os.path.join(data.WALLPAPERS_DIR, file_name)
-        cache_path = self._get_cache_path(file_name)
-        if not os.path.exists(cache_path):
+        cache_path = self.thumbs.lookup(full_path, self.file_stats[file_name])
+        self.search_index.add(file_name, self.thumbs.metadata(full_path) if cache_path else None)
+        if cache_path is not None:
+            self.executor.submit(self._load_thumbnail, file_name, cache_path, order)
+        elif self.get_mapped():
+            # Renders run while the selector is shown; on_map queues the rest
+            self.render_queue.submit(file_name, full_path, order)
+
+    def _load_thumbnail(self, file_name: str, cache_path: str, order: int):
+        """Runs on the executor."""
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
+        except GLib.Error:
+            # Thumbnail file lost; render it again
+            GLib.idle_add(lambda: self.render_queue.submit(
+                file_name, os.path.join(data.WALLPAPERS_DIR, file_name), order
+            ))
+            return
+        self._push_thumbnail(file_name, pixbuf)
+
+    def _on_thumbnail_rendered(self, file_name: str, result):
+        """Runs on a render queue thread with the encoded thumbnail and its metadata."""
+        stat = self.file_stats.get(file_name)
+        if stat is None:
+            return
+        pixbuf = None
+        metadata = None
+        if result is not None:
+            png, metadata = result
             try:
-                with Image.open(full_path) as img:
-                    width, height = img.size
-                    side = min(width, height)
-                    left = (img.width - side) // 2
-                    top = (height - side) // 2
-                    right = left + side
-                    bottom = top + side
-                    img_cropped = img.crop((left, top, right, bottom))
-                    img_cropped.thumbnail((96, 96), Image.Resampling.LANCZOS)
-                    img_cropped.save(cache_path, "PNG")
-            except Exception as e:
+                self.thumbs.store(os.path.join(data.WALLPAPERS_DIR, file_name), stat, png, metadata)
+                loader = GdkPixbuf.PixbufLoader.new_with_type("png")
+                loader.write(png)
+                loader.close()
+                pixbuf = loader.get_pixbuf()
+            except (OSError, GLib.Error) as e:
                 print(f"Error processing {file_name}: {e}")
-                return
-        self.thumbnail_queue.append((cache_path, file_name))
-        GLib.idle_add(self._process_batch)
+        self._push_thumbnail(file_name, pixbuf, metadata)
+
+    def _push_thumbnail(self, file_name: str, pixbuf, metadata=None):
+        with self._queue_lock:
+            self.thumbnail_queue.append((file_name, pixbuf, metadata))
+            if not self._batch_scheduled:
+                self._batch_scheduled = True
+                GLib.idle_add(self._process_batch)
+
+    def _visible_files(self):
+        visible = self.viewport.get_visible_range()
+        if not visible:
+            return []
+        model = self.viewport.get_model()
+        start, end = visible[0].get_indices()[0], visible[1].get_indices()[0]
+        return [model[i][1] for i in range(start, end + 1)]
 
     def _process_batch(self):
-        batch = self.thumbnail_queue[:10]
-        del self.thumbnail_queue[:10]
-        for cache_path, file_name in batch:
-            try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
-                self.thumbnails.append((pixbuf, file_name))
-                self.viewport.get_model().append([pixbuf, file_name])
-            except Exception as e:
-                print(f"Error loading thumbnail {cache_path}: {e}")
-        if self.thumbnail_queue:
-            GLib.idle_add(self._process_batch)
+        with self._queue_lock:
+            batch = self.thumbnail_queue[:THUMBNAIL_BATCH_SIZE]
+            del self.thumbnail_queue[:THUMBNAIL_BATCH_SIZE]
+            more = bool(self.thumbnail_queue)
+            self._batch_scheduled = more
+        new_metadata = False
+        for file_name, pixbuf, metadata in batch:
+            if file_name not in self.file_stats:
+                continue  # Deleted while it was being processed
+            row = self._rows.get(file_name)
+            if pixbuf is None:
+                # Unreadable images are not offered, as before
+                self.failed_files.add(file_name)
+                if row is not None:
+                    self.store.remove(self._rows.pop(file_name))
+                continue
+            self.thumbnails[file_name] = pixbuf
+            if row is not None:
+                self.store.set_value(row, 0, pixbuf)
+            if metadata is not None:
+                self.search_index.add(file_name, metadata)
+                new_metadata = True
+        if new_metadata and self.search_entry.get_text().strip():
+            # Freshly rendered wallpapers may now match tags like "dark"
+            self._apply_filter(self.search_entry.get_text())
+        if self.thumbs.dirty:
+            self._schedule_index_save()
+        return more
+
+    def _schedule_index_save(self):
+        if self._index_save_id is None:
+            self._index_save_id = GLib.timeout_add_seconds(2, self._save_index)
+
+    def _save_index(self):
+        self._index_save_id = None
+        self.executor.submit(self.thumbs.save_index)
         return False
 
-    def _get_cache_path(self, file_name: str) -> str:
-        file_hash = hashlib.md5(file_name.encode("utf-8")).hexdigest()
-        return os.path.join(self.CACHE_DIR, f"{file_hash}.png")
+    def _prune_cache(self, live_paths):
+        removed = self.thumbs.prune(live_paths)
+        if removed:
+            print(f"Removed {removed} orphaned wallpaper thumbnails")
+        self.thumbs.save_index()
 
     @staticmethod
     def _is_image(file_name: str) -> bool:
@@ -532,6 +622,18 @@ class WallpaperSelector(Box):
         """Handles the map signal to set initial visibility of the color selector."""
         # Set visibility based on the loaded state when the widget becomes visible
         self.custom_color_selector_box.set_visible(not self.matugen_enabled)
+        # Render whatever was cancelled or changed while the selector was hidden
+        for order, file_name in enumerate(self.files):
+            full_path = os.path.join(data.WALLPAPERS_DIR, file_name)
+            if (
+                file_name not in self.failed_files
+                and file_name not in self.render_queue
+                and self.thumbs.lookup(full_path, self.file_stats[file_name]) is None
+            ):
+                self.render_queue.submit(file_name, full_path, order)
+
+    def on_unmap(self, widget):
+        self.render_queue.cancel()
 
     def hsl_to_rgb_hex(self, h: float, s: float = 1.0, l: float = 0.5) -> str:
         """Converts HSL color value to RGB HEX string."""
@@ -0,0 +1,183 @@
+"""
+Clipboard history from cliphist, kept in memory between picker opens.
+
+`cliphist list` prints entries newest first, so a sync only reads lines
+until it reaches the newest id already known and then stops the process;
+usually that is a handful of lines. cliphist's database file is only
+stat()ed, read-only, to skip syncing entirely when nothing was copied
+since the last one; its bbolt format is not parsed here. Deletes and
+wipes are applied to the model right away while cliphist catches up.
+"""
+
+import os
+import time
+from typing import List, Optional
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+CLIPHIST_DB = os.path.join(GLib.get_user_cache_dir(), "cliphist", "db")
+
+# cliphist trims old entries and deduplicates on its own; a full listing
+# this often drops whatever an incremental sync cannot see go away
+FULL_SYNC_INTERVAL = 300
+
+
+def entry_id(line: str) -> int:
+    """Numeric id of a `cliphist list` line."""
+    try:
+        return int(line.split("\t", 1)[0])
+    except ValueError:
+        return 0
+
+
+def entry_content(line: str) -> str:
+    return line.split("\t", 1)[1] if "\t" in line else line
+
+
+class ClipboardHistory(Service):
+    """`cliphist list` lines, newest first, synced incrementally."""
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if ClipboardHistory.instance is None:
+            ClipboardHistory.instance = ClipboardHistory()
+
+        return ClipboardHistory.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Emitted after entries were added or removed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.items: List[str] = []
+        self.max_id = 0
+        self._db_mtime: Optional[int] = None
+        self._last_full_sync = 0.0
+        self._syncing = False
+        self._sync_again = False
+
+    def sync(self, full: bool = False):
+        """Merge entries added since the last sync; lines arrive asynchronously."""
+        if self._syncing:
+            self._sync_again = True
+            return
+        if time.monotonic() - self._last_full_sync > FULL_SYNC_INTERVAL:
+            full = True
+        db_mtime = self._get_db_mtime()
+        if not full and db_mtime is not None and db_mtime == self._db_mtime:
+            return
+
+        try:
+            process = Gio.Subprocess.new(
+                ["cliphist", "list"],
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            logger.error(f"[Clipboard] Could not run cliphist: {e.message}")
+            return
+        self._syncing = True
+        self._db_mtime = db_mtime
+        stream = Gio.DataInputStream.new(process.get_stdout_pipe())
+        state = {"process": process, "lines": [], "full": full or not self.items}
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, None, self._on_line, state)
+
+    @staticmethod
+    def _get_db_mtime() -> Optional[int]:
+        try:
+            return os.stat(CLIPHIST_DB).st_mtime_ns
+        except OSError:
+            return None
+
+    def _on_line(self, stream, result, state):
+        try:
+            raw, _ = stream.read_line_finish(result)
+        except GLib.Error as e:
+            logger.error(f"[Clipboard] Reading cliphist failed: {e.message}")
+            self._finish_sync()
+            return
+
+        if raw is None:
+            self._apply(state)
+            return
+        line = raw.decode("utf-8", errors="replace")
+        if line and "<meta http-equiv" not in line:
+            if not state["full"] and entry_id(line) <= self.max_id:
+                # Everything from here on is already known
+                state["process"].force_exit()
+                if entry_id(line) != self.max_id:
+                    # Our newest entry is gone; start over with a full listing
+                    self._finish_sync(full=True)
+                    return
+                self._apply(state)
+                return
+            state["lines"].append(line)
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, None, self._on_line, state)
+
+    def _apply(self, state):
+        lines = state["lines"]
+        if state["full"]:
+            self._last_full_sync = time.monotonic()
+            changed = lines != self.items
+            self.items = lines
+        else:
+            changed = bool(lines)
+            if lines:
+                # cliphist drops older copies of re-copied content
+                contents = {entry_content(line) for line in lines}
+                self.items = lines + [i for i in self.items if entry_content(i) not in contents]
+        self.max_id = entry_id(self.items[0]) if self.items else 0
+        self._finish_sync()
+        if changed:
+            self.emit("changed")
+
+    def _finish_sync(self, full: bool = False):
+        self._syncing = False
+        if full:
+            self._db_mtime = None
+            self._last_full_sync = 0.0
+        if self._sync_again or full:
+            self._sync_again = False
+            GLib.idle_add(self.sync)
+
+    def delete(self, line: str):
+        """Remove an entry now and tell cliphist in the background."""
+        if line in self.items:
+            self.items.remove(line)
+            self.max_id = entry_id(self.items[0]) if self.items else 0
+            self.emit("changed")
+        # cliphist delete takes whole `cliphist list` lines on stdin
+        self._run(["cliphist", "delete"], f"{line}\n")
+
+    def wipe(self):
+        self.items = []
+        self.max_id = 0
+        self.emit("changed")
+        self._run(["cliphist", "wipe"])
+
+    def _run(self, command: List[str], stdin: Optional[str] = None):
+        flags = Gio.SubprocessFlags.STDERR_SILENCE
+        if stdin is not None:
+            flags |= Gio.SubprocessFlags.STDIN_PIPE
+        try:
+            process = Gio.Subprocess.new(command, flags)
+        except GLib.Error as e:
+            logger.error(f"[Clipboard] {' '.join(command)} failed: {e.message}")
+            return
+
+        def on_done(process, result):
+            try:
+                process.communicate_utf8_finish(result)
+            except GLib.Error as e:
+                logger.error(f"[Clipboard] {' '.join(command)} failed: {e.message}")
+
+        process.communicate_utf8_async(stdin, None, on_done)
+
+
+def get_clipboard_history() -> ClipboardHistory:
+    """Get the global ClipboardHistory instance."""
+    return ClipboardHistory.get_initial()
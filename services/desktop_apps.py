@@ -0,0 +1,340 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from fabric.core.service import Service, Signal
+from fabric.utils import DesktopApp
+from gi.repository import Gio, GLib
+from loguru import logger
+
+import config.data as data
+
+CACHE_FILE = f"{data.CACHE_DIR}/desktop_apps.json"
+CACHE_VERSION = 1
+
+# Package managers touch many files at once; re-parse after the burst settles
+RELOAD_DELAY_MS = 500
+
+FIELDS = (
+    "name",
+    "generic_name",
+    "display_name",
+    "description",
+    "window_class",
+    "executable",
+    "command_line",
+    "icon_name",
+    "hidden",
+)
+
+
+def get_application_dirs() -> List[str]:
+    """XDG applications directories, highest precedence first."""
+    data_dirs = [GLib.get_user_data_dir(), *GLib.get_system_data_dirs()]
+    return list(dict.fromkeys(os.path.join(d, "applications") for d in data_dirs))
+
+
+def normalize_window_class(class_name: str) -> str:
+    """Lowercase a window class and strip common binary suffixes."""
+    if not class_name:
+        return ""
+    normalized = class_name.lower()
+    for suffix in [".bin", ".exe", ".so", "-bin", "-gtk"]:
+        if normalized.endswith(suffix):
+            normalized = normalized[: -len(suffix)]
+    return normalized
+
+
+def command_basename(command_line: Optional[str]) -> str:
+    if not command_line:
+        return ""
+    parts = command_line.split()
+    return parts[0].split("/")[-1].lower() if parts else ""
+
+
+class IndexedDesktopApp:
+    """
+    A desktop entry restored from the index cache.
+
+    Exposes the same fields as fabric's DesktopApp; the underlying
+    Gio.DesktopAppInfo is only loaded when the app is launched or its icon is
+    needed, so cached entries cost no .desktop parsing at startup.
+    """
+
+    def __init__(self, desktop_id: str, path: str, fields: dict):
+        self.desktop_id = desktop_id
+        self.path = path
+        self.name: str = fields.get("name") or ""
+        self.generic_name: Optional[str] = fields.get("generic_name")
+        self.display_name: Optional[str] = fields.get("display_name")
+        self.description: Optional[str] = fields.get("description")
+        self.window_class: Optional[str] = fields.get("window_class")
+        self.executable: Optional[str] = fields.get("executable")
+        self.command_line: Optional[str] = fields.get("command_line")
+        self.icon_name: Optional[str] = fields.get("icon_name")
+        self.hidden: bool = bool(fields.get("hidden"))
+        self._app: Optional[DesktopApp] = None
+
+    @property
+    def app(self) -> Optional[DesktopApp]:
+        if self._app is None:
+            app_info = Gio.DesktopAppInfo.new_from_filename(self.path)
+            if app_info is not None:
+                self._app = DesktopApp(app_info)
+        return self._app
+
+    @property
+    def icon(self):
+        return self.app.icon if self.app else None
+
+    def launch(self):
+        return self.app.launch() if self.app else False
+
+    def get_icon_pixbuf(self, *args, **kwargs):
+        return self.app.get_icon_pixbuf(*args, **kwargs) if self.app else None
+
+    def __repr__(self):
+        return f"<IndexedDesktopApp {self.desktop_id}>"
+
+
+class DesktopAppIndex(Service):
+    """
+    Process-wide index of installed desktop applications.
+
+    Parsed entries are persisted to CACHE_FILE keyed by path, mtime and
+    size, so startup only re-parses files that changed since the last run.
+    The XDG applications directories are watched with Gio.FileMonitor and
+    only the touched files are re-parsed. Lookup tables by window class,
+    executable, command and name are rebuilt once per change and shared by
+    every consumer.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if DesktopAppIndex.instance is None:
+            DesktopAppIndex.instance = DesktopAppIndex()
+
+        return DesktopAppIndex.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Emitted after the set of applications changed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries: Dict[str, dict] = {}  # path -> {"mtime", "size", "fields"}
+        self._apps_by_path: Dict[str, IndexedDesktopApp] = {}
+        self._apps: List[IndexedDesktopApp] = []
+        self._desktop_ids: Dict[str, str] = {}
+        self._monitors: Dict[str, Gio.FileMonitor] = {}
+        self._reload_id: Optional[int] = None
+        self.generation = 0
+
+        self.by_window_class: Dict[str, IndexedDesktopApp] = {}
+        self.by_executable: Dict[str, IndexedDesktopApp] = {}
+        self.by_command: Dict[str, IndexedDesktopApp] = {}
+        self.by_name: Dict[str, IndexedDesktopApp] = {}
+        self.identifiers: Dict[str, IndexedDesktopApp] = {}
+
+        self._load_cache()
+        changed = self._scan()
+        self._rebuild_tables()
+        if changed:
+            self._save_cache()
+        self._watch_directories()
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _load_cache(self):
+        try:
+            with open(CACHE_FILE, "r") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self._entries = cache.get("entries", {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            self._entries = {}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(data.CACHE_DIR, exist_ok=True)
+            tmp_path = f"{CACHE_FILE}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": CACHE_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, CACHE_FILE)
+        except OSError as e:
+            logger.warning(f"[DesktopAppIndex] Could not write cache: {e}")
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def _list_desktop_files(self) -> Dict[str, str]:
+        """Map desktop IDs to the path that wins under XDG precedence."""
+        files: Dict[str, str] = {}
+        for base in get_application_dirs():
+            for root, _, names in os.walk(base):
+                for file_name in names:
+                    if not file_name.endswith(".desktop"):
+                        continue
+                    path = os.path.join(root, file_name)
+                    desktop_id = os.path.relpath(path, base).replace("/", "-")
+                    files.setdefault(desktop_id, path)
+        return files
+
+    def _parse(self, path: str) -> Optional[dict]:
+        try:
+            app_info = Gio.DesktopAppInfo.new_from_filename(path)
+        except GLib.Error:
+            app_info = None
+        if app_info is None or not app_info.should_show():
+            return None
+        app = DesktopApp(app_info)
+        return {field: getattr(app, field, None) for field in FIELDS}
+
+    def _scan(self) -> bool:
+        """Bring entries in line with the filesystem; returns True if anything changed."""
+        changed = False
+        files = self._list_desktop_files()
+        live_paths = set(files.values())
+
+        for path in [p for p in self._entries if p not in live_paths]:
+            del self._entries[path]
+            changed = True
+
+        for path in live_paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = self._entries.get(path)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                continue
+            self._entries[path] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "fields": self._parse(path),
+            }
+            self._apps_by_path.pop(path, None)
+            changed = True
+
+        self._desktop_ids = {path: desktop_id for desktop_id, path in files.items()}
+        return changed
+
+    def _rebuild_tables(self):
+        apps = []
+        for path, entry in self._entries.items():
+            if not entry["fields"]:
+                continue
+            app = self._apps_by_path.get(path)
+            if app is None:
+                app = IndexedDesktopApp(self._desktop_ids.get(path, ""), path, entry["fields"])
+                self._apps_by_path[path] = app
+            apps.append(app)
+        for path in [p for p in self._apps_by_path if p not in self._entries]:
+            del self._apps_by_path[path]
+
+        apps.sort(key=lambda app: (app.display_name or app.name).casefold())
+        self._apps = apps
+
+        self.by_window_class = {}
+        self.by_executable = {}
+        self.by_command = {}
+        self.by_name = {}
+        self.identifiers = {}
+        for app in apps:
+            if app.name:
+                self.by_name[app.name.lower()] = app
+                self.identifiers[app.name.lower()] = app
+            if app.display_name:
+                self.by_name[app.display_name.lower()] = app
+                self.identifiers[app.display_name.lower()] = app
+            if app.window_class:
+                self.by_window_class[app.window_class.lower()] = app
+                self.identifiers[app.window_class.lower()] = app
+            if app.executable:
+                exe_basename = app.executable.split("/")[-1].lower()
+                self.by_executable[exe_basename] = app
+                self.identifiers[exe_basename] = app
+            if cmd_base := command_basename(app.command_line):
+                self.by_command[cmd_base] = app
+                self.identifiers[cmd_base] = app
+
+        self.generation += 1
+
+    # ------------------------------------------------------------------
+    # Watching
+    # ------------------------------------------------------------------
+
+    def _watch_directories(self):
+        for base in get_application_dirs():
+            self._watch_tree(base)
+
+    def _watch_tree(self, base: str):
+        # Missing directories are watched too, so a later install is noticed
+        roots = [root for root, _, _ in os.walk(base)] or [base]
+        for root in roots:
+            if root in self._monitors:
+                continue
+            try:
+                monitor = Gio.File.new_for_path(root).monitor_directory(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+            except GLib.Error as e:
+                logger.warning(f"[DesktopAppIndex] Cannot watch {root}: {e}")
+                continue
+            monitor.connect("changed", self._on_directory_changed)
+            self._monitors[root] = monitor
+
+    def _on_directory_changed(self, monitor, file, other_file, event_type):
+        if event_type in (
+            Gio.FileMonitorEvent.ATTRIBUTE_CHANGED,
+            Gio.FileMonitorEvent.PRE_UNMOUNT,
+            Gio.FileMonitorEvent.UNMOUNTED,
+        ):
+            return
+        # Directories created or moved in later need monitors of their own
+        added = other_file if event_type == Gio.FileMonitorEvent.RENAMED else file
+        if event_type in (
+            Gio.FileMonitorEvent.CREATED,
+            Gio.FileMonitorEvent.MOVED_IN,
+            Gio.FileMonitorEvent.RENAMED,
+        ) and added is not None and os.path.isdir(added.get_path() or ""):
+            self._watch_tree(added.get_path())
+        if self._reload_id is None:
+            self._reload_id = GLib.timeout_add(RELOAD_DELAY_MS, self._reload)
+
+    def _reload(self):
+        self._reload_id = None
+        # Only files whose mtime/size differ from the index are re-parsed
+        if self._scan():
+            self._rebuild_tables()
+            self._save_cache()
+            self.emit("changed")
+        return False
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_apps(self) -> List[IndexedDesktopApp]:
+        """All visible applications, sorted by display name."""
+        return self._apps
+
+    def find_app(self, identifier) -> Optional[IndexedDesktopApp]:
+        """Exact lookup by name, display name, window class, executable or command."""
+        if not identifier:
+            return None
+        normalized_id = str(identifier).lower()
+        app = self.identifiers.get(normalized_id)
+        if app is None:
+            app = self.identifiers.get(normalize_window_class(normalized_id))
+        return app
+
+
+def get_desktop_app_index() -> DesktopAppIndex:
+    """Get the global DesktopAppIndex instance."""
+    return DesktopAppIndex.get_initial()
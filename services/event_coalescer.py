@@ -0,0 +1,179 @@
+from typing import Dict, Hashable, List, Optional
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+from services.hyprland_state import get_hyprland_state
+
+# One frame at 60 Hz; events arriving within it are delivered together
+FRAME_INTERVAL_MS = 16
+# Flush before GTK relayouts and redraws the frame the changes belong to
+FLUSH_PRIORITY = GLib.PRIORITY_HIGH_IDLE + 5
+
+CLIENTS = "clients"
+WINDOW_OPENED = "window-opened"
+WINDOW_CLOSED = "window-closed"
+WINDOW_MOVED = "window-moved"
+WINDOW_TITLE = "window-title"
+ACTIVE_WINDOW = "active-window"
+WORKSPACE = "workspace"
+MONITOR_FOCUS = "monitor-focus"
+MONITORS = "monitors"
+
+
+class ChangeSet:
+    """
+    Hyprland changes collected during one frame.
+
+    Each change is keyed by its kind and, for per-window kinds, the window
+    address; a later event with the same key replaces the earlier one, so a
+    burst of workspace or focus events leaves only the final value.
+    """
+
+    __slots__ = ("_changes", "raw_events")
+
+    def __init__(self):
+        self._changes: Dict[str, Dict[Hashable, tuple]] = {}
+        self.raw_events = 0
+
+    def add(self, kind: str, key: Hashable = None, *values):
+        entries = self._changes.setdefault(kind, {})
+        # Re-insert so iteration order follows the latest occurrence
+        entries.pop(key, None)
+        entries[key] = values
+        self.raw_events += 1
+
+    def __contains__(self, kind: str) -> bool:
+        return kind in self._changes
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._changes.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._changes)
+
+    @property
+    def kinds(self) -> List[str]:
+        return list(self._changes)
+
+    def has_any(self, *kinds: str) -> bool:
+        return any(kind in self._changes for kind in kinds)
+
+    def keys(self, kind: str) -> List[Hashable]:
+        """Deduplicated keys of `kind`, e.g. the addresses of moved windows."""
+        return list(self._changes.get(kind, ()))
+
+    def get(self, kind: str, key: Hashable = None) -> Optional[tuple]:
+        return self._changes.get(kind, {}).get(key)
+
+    def latest(self, kind: str) -> Optional[tuple]:
+        """Values of the most recent change of `kind`."""
+        entries = self._changes.get(kind)
+        if not entries:
+            return None
+        return entries[next(reversed(entries))]
+
+
+class HyprlandEventCoalescer(Service):
+    """
+    Delivers Hyprland state changes as one merged ChangeSet per frame.
+
+    Workspace switches and window moves arrive as bursts of socket2 events.
+    Subscribing to `changed` instead of the individual HyprlandStateStore
+    signals turns such a burst into a single callback, and the counters show
+    how many raw events each delivered batch absorbed.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if HyprlandEventCoalescer.instance is None:
+            HyprlandEventCoalescer.instance = HyprlandEventCoalescer()
+
+        return HyprlandEventCoalescer.instance
+
+    @Signal
+    def changed(self, changes: object) -> None:
+        """Emitted at most once per frame with the ChangeSet collected in it."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pending = ChangeSet()
+        self._flush_id: Optional[int] = None
+
+        self.raw_events = 0
+        self.batches = 0
+        self.delivered_changes = 0
+        self.raw_events_by_kind: Dict[str, int] = {}
+
+        self.state = get_hyprland_state()
+        for signal_name, kind, keyed in (
+            ("clients-changed", CLIENTS, False),
+            ("window-opened", WINDOW_OPENED, True),
+            ("window-closed", WINDOW_CLOSED, True),
+            ("window-moved", WINDOW_MOVED, True),
+            ("window-title-changed", WINDOW_TITLE, True),
+            ("active-window-changed", ACTIVE_WINDOW, False),
+            ("workspace-changed", WORKSPACE, False),
+            ("monitor-focused", MONITOR_FOCUS, False),
+            ("monitors-changed", MONITORS, False),
+        ):
+            self.state.connect(
+                signal_name,
+                lambda _, *args, kind=kind, keyed=keyed: self.push(
+                    kind, args[0] if keyed else None, *args
+                ),
+            )
+
+    def push(self, kind: str, key: Hashable = None, *values):
+        """Queue a change for the next frame."""
+        self._pending.add(kind, key, *values)
+        self.raw_events += 1
+        self.raw_events_by_kind[kind] = self.raw_events_by_kind.get(kind, 0) + 1
+        if self._flush_id is None:
+            self._flush_id = GLib.timeout_add(
+                FRAME_INTERVAL_MS, self._flush, priority=FLUSH_PRIORITY
+            )
+
+    def flush(self):
+        """Deliver pending changes now instead of at the next frame."""
+        if self._flush_id is not None:
+            GLib.source_remove(self._flush_id)
+        self._flush()
+
+    def _flush(self):
+        self._flush_id = None
+        changes, self._pending = self._pending, ChangeSet()
+        if not changes:
+            return False
+        self.batches += 1
+        self.delivered_changes += len(changes)
+        logger.debug(
+            f"[EventCoalescer] Batch {self.batches}: {changes.raw_events} events -> "
+            f"{len(changes)} changes ({', '.join(changes.kinds)})"
+        )
+        self.emit("changed", changes)
+        return False
+
+    def get_stats(self) -> dict:
+        """Raw events received versus batches delivered since startup."""
+        return {
+            "raw_events": self.raw_events,
+            "batches": self.batches,
+            "delivered_changes": self.delivered_changes,
+            "events_per_batch": self.raw_events / self.batches if self.batches else 0.0,
+            "raw_events_by_kind": dict(self.raw_events_by_kind),
+        }
+
+    def reset_stats(self):
+        self.raw_events = 0
+        self.batches = 0
+        self.delivered_changes = 0
+        self.raw_events_by_kind = {}
+
+
+def get_event_coalescer() -> HyprlandEventCoalescer:
+    """Get the global HyprlandEventCoalescer instance."""
+    return HyprlandEventCoalescer.get_initial()
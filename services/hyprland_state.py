@@ -0,0 +1,477 @@
+from typing import Dict, List, Optional, Set, TypedDict
+
+from fabric.core.service import Service, Signal
+from fabric.hyprland.widgets import get_hyprland_connection
+from gi.repository import GLib
+from loguru import logger
+
+from utils.hyprland_socket import get_hyprctl_client
+
+# Delay used to fold a burst of geometry-affecting events into one resync
+RESYNC_DELAY_MS = 60
+
+
+class WorkspaceRef(TypedDict):
+    id: int
+    name: str
+
+
+class ClientInfo(TypedDict, total=False):
+    """A client record, shaped like an entry of `hyprctl -j clients`."""
+
+    address: str
+    mapped: bool
+    hidden: bool
+    at: List[int]
+    size: List[int]
+    workspace: WorkspaceRef
+    floating: bool
+    fullscreen: int
+    monitor: int
+    pid: int
+    title: str
+    initialTitle: str
+    initialClass: str
+    focusHistoryID: int
+
+
+class MonitorInfo(TypedDict, total=False):
+    """A monitor record, shaped like an entry of `hyprctl -j monitors`."""
+
+    id: int
+    name: str
+    width: int
+    height: int
+    x: int
+    y: int
+    scale: float
+    transform: int
+    focused: bool
+    activeWorkspace: WorkspaceRef
+    reserved: List[int]
+
+
+def normalize_address(address: str) -> str:
+    """Event payloads carry bare hex addresses, hyprctl replies prefix them with 0x."""
+    address = address.strip()
+    if not address:
+        return ""
+    return address if address.startswith("0x") else f"0x{address}"
+
+
+def client_class_key(client: ClientInfo) -> str:
+    return (client.get("initialClass") or client.get("class") or "").lower()
+
+
+class HyprlandStateStore(Service):
+    """
+    In-process cache of Hyprland clients, monitors and workspaces.
+
+    A single snapshot is loaded when the Hyprland connection is ready, after
+    which socket2 events are applied as deltas. Geometry (position/size) is not
+    part of any event payload, so geometry-affecting events schedule one
+    coalesced `j/clients` resync shared by every consumer.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if HyprlandStateStore.instance is None:
+            HyprlandStateStore.instance = HyprlandStateStore()
+
+        return HyprlandStateStore.instance
+
+    @Signal
+    def ready(self) -> None:
+        """Emitted once the initial snapshot is loaded."""
+
+    @Signal
+    def clients_changed(self) -> None:
+        """Emitted when the set of clients or their placement changes."""
+
+    @Signal
+    def window_opened(self, address: str) -> None: ...
+
+    @Signal
+    def window_closed(self, address: str) -> None: ...
+
+    @Signal
+    def window_moved(self, address: str, workspace_id: int) -> None: ...
+
+    @Signal
+    def window_title_changed(self, address: str) -> None: ...
+
+    @Signal
+    def active_window_changed(self, address: str) -> None: ...
+
+    @Signal
+    def workspace_changed(self, workspace_id: int) -> None: ...
+
+    @Signal
+    def monitor_focused(self, monitor_name: str, workspace_id: int) -> None: ...
+
+    @Signal
+    def monitors_changed(self) -> None: ...
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._clients: Dict[str, ClientInfo] = {}
+        self._by_workspace: Dict[int, Set[str]] = {}
+        self._by_monitor: Dict[int, Set[str]] = {}
+        self._by_class: Dict[str, Set[str]] = {}
+
+        self._monitors: Dict[int, MonitorInfo] = {}
+        self._monitor_ids_by_name: Dict[str, int] = {}
+        self._workspace_monitors: Dict[int, int] = {}
+        self._workspace_ids_by_name: Dict[str, int] = {}
+
+        self._active_address = ""
+        self._active_workspace_id = 1
+        self._focused_monitor_id = 0
+
+        self._ready = False
+        self._resync_id: Optional[int] = None
+
+        self._handlers = {
+            "openwindow": self._on_open_window,
+            "closewindow": self._on_close_window,
+            "movewindowv2": self._on_move_window,
+            "windowtitlev2": self._on_window_title,
+            "activewindowv2": self._on_active_window,
+            "workspacev2": self._on_workspace,
+            "focusedmon": self._on_focused_monitor,
+            "createworkspacev2": self._on_create_workspace,
+            "destroyworkspacev2": self._on_destroy_workspace,
+            "moveworkspacev2": self._on_move_workspace,
+            "changefloatingmode": self._on_geometry_event,
+            "fullscreen": self._on_geometry_event,
+            "monitoradded": self._on_monitors_event,
+            "monitorremoved": self._on_monitors_event,
+        }
+
+        self.conn = get_hyprland_connection()
+        for event_name, handler in self._handlers.items():
+            self.conn.connect(
+                f"event::{event_name}",
+                lambda _, event, handler=handler: self._dispatch(handler, event),
+            )
+
+        if self.conn.ready:
+            self.load_snapshot()
+        else:
+            self.conn.connect("event::ready", lambda *_: self.load_snapshot())
+
+    # ------------------------------------------------------------------
+    # Snapshot loading
+    # ------------------------------------------------------------------
+
+    def _query(self, *commands: str) -> list:
+        """Fetch several JSON replies in a single socket round trip."""
+        return get_hyprctl_client().query_batch_json(list(commands))
+
+    def load_snapshot(self):
+        """Load monitors, workspaces, clients and the active window in one round trip."""
+        monitors, workspaces, clients, active = self._query(
+            "j/monitors", "j/workspaces", "j/clients", "j/activewindow"
+        )
+        self._apply_monitors(monitors or [])
+        self._apply_workspaces(workspaces or [])
+        self._apply_clients(clients)
+        self._active_address = active.get("address", "") if isinstance(active, dict) else ""
+
+        was_ready = self._ready
+        self._ready = True
+        if not was_ready:
+            self.emit("ready")
+        self.emit("monitors-changed")
+        self.emit("clients-changed")
+
+    def _apply_monitors(self, monitors: List[MonitorInfo]):
+        self._monitors = {m["id"]: m for m in monitors}
+        self._monitor_ids_by_name = {m["name"]: m["id"] for m in monitors}
+        for monitor in monitors:
+            if monitor.get("focused"):
+                self._focused_monitor_id = monitor["id"]
+                self._active_workspace_id = monitor.get("activeWorkspace", {}).get(
+                    "id", self._active_workspace_id
+                )
+
+    def _apply_workspaces(self, workspaces: list):
+        self._workspace_ids_by_name = {ws["name"]: ws["id"] for ws in workspaces}
+        self._workspace_monitors = {
+            ws["id"]: ws.get("monitorID", 0) for ws in workspaces
+        }
+
+    def _apply_clients(self, clients: Optional[List[ClientInfo]]) -> bool:
+        """Replace every client; returns False when the snapshot is unchanged."""
+        if clients is None or {c["address"]: c for c in clients} == self._clients:
+            return False
+        self._clients = {}
+        self._by_workspace = {}
+        self._by_monitor = {}
+        self._by_class = {}
+        for client in clients:
+            self._index_client(client)
+        return True
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _index_client(self, client: ClientInfo):
+        address = client["address"]
+        self._clients[address] = client
+        self._by_workspace.setdefault(client["workspace"]["id"], set()).add(address)
+        self._by_monitor.setdefault(client.get("monitor", -1), set()).add(address)
+        self._by_class.setdefault(client_class_key(client), set()).add(address)
+
+    def _unindex_client(self, address: str) -> Optional[ClientInfo]:
+        client = self._clients.pop(address, None)
+        if client is None:
+            return None
+        for index, key in (
+            (self._by_workspace, client["workspace"]["id"]),
+            (self._by_monitor, client.get("monitor", -1)),
+            (self._by_class, client_class_key(client)),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(address)
+                if not bucket:
+                    del index[key]
+        return client
+
+    def _resolve_workspace_id(self, name: str) -> Optional[int]:
+        if name in self._workspace_ids_by_name:
+            return self._workspace_ids_by_name[name]
+        try:
+            return int(name)
+        except ValueError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Event handling
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, handler, event):
+        if not self._ready:
+            return
+        try:
+            handler(event.data)
+        except (IndexError, ValueError) as e:
+            logger.warning(f"[HyprlandState] Malformed {event.name} event {event.data}: {e}")
+            self.schedule_resync()
+
+    def _on_open_window(self, args: List[str]):
+        address = normalize_address(args[0])
+        workspace_name = args[1]
+        window_class = args[2]
+        title = ",".join(args[3:])
+        workspace_id = self._resolve_workspace_id(workspace_name)
+        if workspace_id is None:
+            self.schedule_resync()
+            return
+
+        self._unindex_client(address)
+        self._index_client(
+            {
+                "address": address,
+                "mapped": True,
+                "hidden": False,
+                "at": [0, 0],
+                "size": [0, 0],
+                "workspace": {"id": workspace_id, "name": workspace_name},
+                "floating": False,
+                "fullscreen": 0,
+                "monitor": self._workspace_monitors.get(
+                    workspace_id, self._focused_monitor_id
+                ),
+                "class": window_class,
+                "initialClass": window_class,
+                "title": title,
+                "initialTitle": title,
+            }
+        )
+        self.emit("window-opened", address)
+        self.emit("clients-changed")
+        # Position and size only arrive with the next j/clients reply
+        self.schedule_resync()
+
+    def _on_close_window(self, args: List[str]):
+        address = normalize_address(args[0])
+        if self._unindex_client(address) is None:
+            return
+        if address == self._active_address:
+            self._active_address = ""
+        self.emit("window-closed", address)
+        self.emit("clients-changed")
+
+    def _on_move_window(self, args: List[str]):
+        address = normalize_address(args[0])
+        workspace_id = int(args[1])
+        workspace_name = ",".join(args[2:])
+        client = self._unindex_client(address)
+        if client is None:
+            self.schedule_resync()
+            return
+
+        client["workspace"] = {"id": workspace_id, "name": workspace_name}
+        client["monitor"] = self._workspace_monitors.get(
+            workspace_id, client.get("monitor", -1)
+        )
+        self._index_client(client)
+        self.emit("window-moved", address, workspace_id)
+        self.emit("clients-changed")
+        self.schedule_resync()
+
+    def _on_window_title(self, args: List[str]):
+        address = normalize_address(args[0])
+        client = self._clients.get(address)
+        if client is None:
+            return
+        client["title"] = ",".join(args[1:])
+        self.emit("window-title-changed", address)
+
+    def _on_active_window(self, args: List[str]):
+        address = normalize_address(args[0]) if args else ""
+        if address == self._active_address:
+            return
+        self._active_address = address
+        self.emit("active-window-changed", address)
+
+    def _on_workspace(self, args: List[str]):
+        workspace_id = int(args[0])
+        self._active_workspace_id = workspace_id
+        self._workspace_monitors[workspace_id] = self._focused_monitor_id
+        monitor = self._monitors.get(self._focused_monitor_id)
+        if monitor is not None:
+            monitor["activeWorkspace"] = {"id": workspace_id, "name": ",".join(args[1:])}
+        self.emit("workspace-changed", workspace_id)
+
+    def _on_focused_monitor(self, args: List[str]):
+        monitor_name = args[0]
+        workspace_name = ",".join(args[1:])
+        monitor_id = self._monitor_ids_by_name.get(monitor_name)
+        if monitor_id is None:
+            self._on_monitors_event(args)
+            monitor_id = self._monitor_ids_by_name.get(monitor_name, 0)
+
+        for monitor in self._monitors.values():
+            monitor["focused"] = monitor["id"] == monitor_id
+        self._focused_monitor_id = monitor_id
+
+        workspace_id = self._resolve_workspace_id(workspace_name)
+        if workspace_id is not None:
+            self._active_workspace_id = workspace_id
+        self.emit("monitor-focused", monitor_name, self._active_workspace_id)
+
+    def _on_create_workspace(self, args: List[str]):
+        workspace_id = int(args[0])
+        self._workspace_ids_by_name[",".join(args[1:])] = workspace_id
+        self._workspace_monitors.setdefault(workspace_id, self._focused_monitor_id)
+
+    def _on_destroy_workspace(self, args: List[str]):
+        workspace_id = int(args[0])
+        self._workspace_ids_by_name.pop(",".join(args[1:]), None)
+        self._workspace_monitors.pop(workspace_id, None)
+
+    def _on_move_workspace(self, args: List[str]):
+        workspace_id = int(args[0])
+        monitor_id = self._monitor_ids_by_name.get(args[-1])
+        if monitor_id is not None:
+            self._workspace_monitors[workspace_id] = monitor_id
+        self.schedule_resync()
+
+    def _on_geometry_event(self, args: List[str]):
+        self.schedule_resync()
+
+    def _on_monitors_event(self, args: List[str]):
+        monitors, workspaces = self._query("j/monitors", "j/workspaces")
+        self._apply_monitors(monitors or [])
+        self._apply_workspaces(workspaces or [])
+        self.emit("monitors-changed")
+        self.schedule_resync()
+
+    # ------------------------------------------------------------------
+    # Resync
+    # ------------------------------------------------------------------
+
+    def schedule_resync(self):
+        """
+        Refresh client geometry once after the current burst of events.
+
+        clients-changed is only emitted again if Hyprland's answer differs
+        from what the events already put in the store.
+        """
+        if self._resync_id is None:
+            self._resync_id = GLib.timeout_add(RESYNC_DELAY_MS, self._resync)
+
+    def _resync(self):
+        self._resync_id = None
+        if self._apply_clients(self._query("j/clients")[0]):
+            self.emit("clients-changed")
+        return False
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    @property
+    def active_address(self) -> str:
+        return self._active_address
+
+    @property
+    def active_workspace_id(self) -> int:
+        return self._active_workspace_id
+
+    @property
+    def focused_monitor_id(self) -> int:
+        return self._focused_monitor_id
+
+    def get_clients(self) -> List[ClientInfo]:
+        return list(self._clients.values())
+
+    def get_client(self, address: str) -> Optional[ClientInfo]:
+        return self._clients.get(normalize_address(address))
+
+    def get_active_client(self) -> Optional[ClientInfo]:
+        return self._clients.get(self._active_address)
+
+    def get_clients_on_workspace(self, workspace_id: int) -> List[ClientInfo]:
+        return [self._clients[a] for a in self._by_workspace.get(workspace_id, ())]
+
+    def get_clients_on_monitor(self, monitor_id: int) -> List[ClientInfo]:
+        return [self._clients[a] for a in self._by_monitor.get(monitor_id, ())]
+
+    def get_clients_by_class(self, window_class: str) -> List[ClientInfo]:
+        return [self._clients[a] for a in self._by_class.get(window_class.lower(), ())]
+
+    def get_window_classes(self) -> List[str]:
+        return list(self._by_class.keys())
+
+    def get_monitors(self) -> List[MonitorInfo]:
+        return list(self._monitors.values())
+
+    def get_monitor(self, monitor_id: int) -> Optional[MonitorInfo]:
+        return self._monitors.get(monitor_id)
+
+    def get_monitor_by_name(self, monitor_name: str) -> Optional[MonitorInfo]:
+        monitor_id = self._monitor_ids_by_name.get(monitor_name)
+        return self._monitors.get(monitor_id) if monitor_id is not None else None
+
+    def get_focused_monitor(self) -> Optional[MonitorInfo]:
+        return self._monitors.get(self._focused_monitor_id)
+
+    def get_monitor_for_workspace(self, workspace_id: int) -> Optional[MonitorInfo]:
+        monitor_id = self._workspace_monitors.get(workspace_id)
+        return self._monitors.get(monitor_id) if monitor_id is not None else None
+
+
+def get_hyprland_state() -> HyprlandStateStore:
+    """Get the global HyprlandStateStore instance."""
+    return HyprlandStateStore.get_initial()
@@ -1,8 +1,7 @@
-import json
-import subprocess
-import threading
 from typing import Optional
 
+from utils.hyprland_socket import HyprlandEventReader
+
 
 class Signal:
     """Simple signal implementation for monitor focus service."""
@@ -27,8 +26,8 @@ class MonitorFocusService:
     """
     Service to track monitor focus changes through Hyprland events.
     
-    Listens to 'focusedmon' and 'workspace' events and emits signals
-    when monitor focus changes.
+    Reads the Hyprland socket2 stream from the GLib main loop and emits
+    signals when monitor focus or the active workspace changes.
     """
     
     _instance = None
@@ -48,7 +47,14 @@ class MonitorFocusService:
         self._current_workspace = 1
         self._current_monitor_name = ""
         self._listening = False
-        self._thread = None
+        self._event_reader = HyprlandEventReader()
+        for event_name, handler in {
+            "focusedmon": self._handle_focused_monitor,
+            "workspace": self._handle_workspace_change,
+            "monitoradded": self._handle_monitors_changed,
+            "monitorremoved": self._handle_monitors_changed,
+        }.items():
+            self._event_reader.connect(event_name, handler)
         
         # Signals
         self.monitor_focused = Signal()
@@ -86,62 +92,26 @@ class MonitorFocusService:
             self._monitor_info = {}
     
     def start_listening(self):
-        """Start listening to Hyprland events in a separate thread."""
+        """Start listening to Hyprland events on the main loop."""
         if self._listening:
             return
         
         self._listening = True
-        self._thread = threading.Thread(target=self._listen_to_hyprland, daemon=True)
-        self._thread.start()
+        self._event_reader.start()
     
     def stop_listening(self):
         """Stop listening to Hyprland events."""
         self._listening = False
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=1.0)
+        self._event_reader.stop()
     
-    def _listen_to_hyprland(self):
-        """Listen to Hyprland events via socat."""
+    def _handle_monitors_changed(self, data: str):
+        """Handle monitoradded/monitorremoved events: refresh the name to ID mapping."""
         try:
-            process = subprocess.Popen(
-                ["socat", "-U", "-", "UNIX-CONNECT:/tmp/hypr/$HYPRLAND_INSTANCE_SIGNATURE/.socket2.sock"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-            
-            while self._listening and process.poll() is None:
-                if process.stdout:
-                    line = process.stdout.readline()
-                    if line:
-                        self._handle_hyprland_event(line.strip())
-                    
-        except (subprocess.SubprocessError, FileNotFoundError) as e:
-            print(f"MonitorFocusService: Error listening to Hyprland: {e}")
-        except Exception as e:
-            print(f"MonitorFocusService: Unexpected error: {e}")
-    
-    def _handle_hyprland_event(self, event_line: str):
-        """Parse and handle Hyprland event."""
-        try:
-            if '>>' not in event_line:
-                return
-            
-            parts = event_line.split('>>')
-            if len(parts) < 2:
-                return
-            
-            event_type = parts[0]
-            event_data = parts[1]
-            
-            if event_type == "focusedmon":
-                self._handle_focused_monitor(event_data)
-            elif event_type == "workspace":
-                self._handle_workspace_change(event_data)
-                
-        except Exception as e:
-            print(f"MonitorFocusService: Error handling event '{event_line}': {e}")
+            from utils.monitor_manager import get_monitor_manager
+            get_monitor_manager().refresh_monitors()
+        except ImportError:
+            pass
+        self._update_monitor_mapping()
     
     def _handle_focused_monitor(self, data: str):
         """Handle focusedmon event: monitor_name,workspace_name"""
@@ -0,0 +1,239 @@
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from fabric.core.service import Service, Signal
+
+import config.data as data
+from services.event_coalescer import (
+    CLIENTS,
+    MONITOR_FOCUS,
+    MONITORS,
+    WORKSPACE,
+    get_event_coalescer,
+)
+from services.hyprland_state import ClientInfo, get_hyprland_state
+
+# Side length, in layout pixels, of a spatial index cell
+CELL_SIZE = 512
+
+Rect = Tuple[int, int, int, int]  # x1, y1, x2, y2
+Region = Union[Tuple[str, int], Tuple[int, int, int, int]]
+
+
+def _client_rect(client: ClientInfo) -> Optional[Tuple[int, Rect]]:
+    if not client.get("mapped", True) or client.get("hidden", False):
+        return None
+    position = client.get("at")
+    size = client.get("size")
+    if not position or not size or size[0] <= 0 or size[1] <= 0:
+        return None
+    x, y = position
+    return client["workspace"]["id"], (x, y, x + size[0], y + size[1])
+
+
+def _cells(rect: Rect):
+    x1, y1, x2, y2 = rect
+    for cx in range(x1 // CELL_SIZE, (x2 - 1) // CELL_SIZE + 1):
+        for cy in range(y1 // CELL_SIZE, (y2 - 1) // CELL_SIZE + 1):
+            yield cx, cy
+
+
+def _intersects(a: Rect, b: Rect) -> bool:
+    return not (a[2] <= b[0] or a[0] >= b[2] or a[3] <= b[1] or a[1] >= b[3])
+
+
+def region_to_rect(region: Region, monitor: Optional[dict]) -> Optional[Rect]:
+    """
+    Convert a monitor-relative region into a rectangle in layout coordinates.
+
+    `region` is either (side, size), where side is "top", "bottom", "left" or
+    "right", or a full (x, y, width, height) tuple.
+    """
+    if monitor is not None:
+        mon_x, mon_y = monitor.get("x", 0), monitor.get("y", 0)
+        width = monitor.get("width", data.CURRENT_WIDTH)
+        height = monitor.get("height", data.CURRENT_HEIGHT)
+        scale = monitor.get("scale", 1.0) or 1.0
+        # Client geometry is in logical pixels, monitor size in physical ones
+        if monitor.get("transform", 0) % 2:
+            width, height = height, width
+        width, height = int(width / scale), int(height / scale)
+    else:
+        mon_x, mon_y = 0, 0
+        width, height = data.CURRENT_WIDTH, data.CURRENT_HEIGHT
+
+    if len(region) == 2 and isinstance(region[0], str):
+        side, size = region
+        side = side.lower()
+        if side == "bottom":
+            region = (0, height - size, width, size)
+        elif side == "top":
+            region = (0, 0, width, size)
+        elif side == "left":
+            region = (0, 0, size, height)
+        elif side == "right":
+            region = (width - size, 0, size, height)
+        else:
+            return None
+
+    if len(region) != 4:
+        return None
+    x, y, w, h = region
+    return mon_x + x, mon_y + y, mon_x + x + w, mon_y + y + h
+
+
+class OcclusionWatcher(Service):
+    """Tracks whether a screen region of one monitor is covered by a window."""
+
+    @Signal
+    def occluded_changed(self, occluded: bool) -> None: ...
+
+    def __init__(self, engine: "OcclusionEngine", monitor_id: int, region: Region, **kwargs):
+        super().__init__(**kwargs)
+        self._engine = engine
+        self.monitor_id = monitor_id
+        self.region = region
+        self.occluded = False
+
+    def update(self):
+        rect = region_to_rect(self.region, self._engine.state.get_monitor(self.monitor_id))
+        workspace_id = self._engine.get_active_workspace(self.monitor_id)
+        occluded = rect is not None and self._engine.is_rect_occluded(rect, workspace_id)
+        if occluded != self.occluded:
+            self.occluded = occluded
+            self.emit("occluded-changed", occluded)
+
+    def stop(self):
+        self._engine.unwatch(self)
+
+
+class OcclusionEngine:
+    """
+    Event-driven window occlusion tracking.
+
+    Window rectangles are kept per workspace in a coarse grid index and
+    updated from HyprlandStateStore changes; only the clients whose geometry
+    or workspace changed are re-indexed. Watchers are re-evaluated when their
+    monitor's active workspace is affected and emit `occluded-changed` only
+    when the answer flips, so nothing polls while windows stay put.
+
+    Hyprland sends no socket2 event while a floating window is dragged or
+    resized, so its rectangle goes stale until some other event arrives.
+    Callers run resync() when the pointer leaves a watched region or
+    re-checks it on hover; that costs one batched j/clients query.
+    """
+
+    _instance = None
+
+    @staticmethod
+    def get_initial() -> "OcclusionEngine":
+        if OcclusionEngine._instance is None:
+            OcclusionEngine._instance = OcclusionEngine()
+        return OcclusionEngine._instance
+
+    def __init__(self):
+        self.state = get_hyprland_state()
+        self._rects: Dict[str, Tuple[int, Rect]] = {}
+        self._grid: Dict[Tuple[int, int, int], Set[str]] = {}
+        self._watchers: List[OcclusionWatcher] = []
+
+        get_event_coalescer().connect("changed", self._on_hyprland_changes)
+        self._sync_clients()
+
+    def watch(self, monitor_id: int, region: Region) -> OcclusionWatcher:
+        """Start tracking a monitor-relative region; see region_to_rect()."""
+        watcher = OcclusionWatcher(self, monitor_id, region)
+        self._watchers.append(watcher)
+        watcher.update()
+        return watcher
+
+    def unwatch(self, watcher: OcclusionWatcher):
+        if watcher in self._watchers:
+            self._watchers.remove(watcher)
+
+    def resync(self):
+        """Refresh client geometry Hyprland changed without an event."""
+        self.state.schedule_resync()
+
+    def get_active_workspace(self, monitor_id: int) -> Optional[int]:
+        monitor = self.state.get_monitor(monitor_id)
+        if monitor is None:
+            return self.state.active_workspace_id
+        return monitor.get("activeWorkspace", {}).get("id")
+
+    def is_rect_occluded(self, rect: Rect, workspace_id: Optional[int]) -> bool:
+        if workspace_id is None:
+            return False
+        seen: Set[str] = set()
+        for cx, cy in _cells(rect):
+            for address in self._grid.get((workspace_id, cx, cy), ()):
+                if address in seen:
+                    continue
+                seen.add(address)
+                if _intersects(rect, self._rects[address][1]):
+                    return True
+        return False
+
+    def is_region_occluded(self, region: Region, workspace_id: Optional[int] = None) -> bool:
+        """One-shot check of a region on the focused monitor."""
+        if workspace_id is None:
+            workspace_id = self.state.active_workspace_id
+        rect = region_to_rect(region, self.state.get_focused_monitor())
+        return rect is not None and self.is_rect_occluded(rect, workspace_id)
+
+    def _index(self, address: str, entry: Tuple[int, Rect]):
+        self._rects[address] = entry
+        workspace_id, rect = entry
+        for cx, cy in _cells(rect):
+            self._grid.setdefault((workspace_id, cx, cy), set()).add(address)
+
+    def _unindex(self, address: str):
+        workspace_id, rect = self._rects.pop(address)
+        for cx, cy in _cells(rect):
+            key = (workspace_id, cx, cy)
+            bucket = self._grid.get(key)
+            if bucket is not None:
+                bucket.discard(address)
+                if not bucket:
+                    del self._grid[key]
+
+    def _on_hyprland_changes(self, _, changes):
+        if CLIENTS in changes:
+            self._sync_clients()
+        if changes.has_any(WORKSPACE, MONITOR_FOCUS, MONITORS):
+            self._update_watchers()
+
+    def _sync_clients(self):
+        dirty_workspaces: Set[int] = set()
+        current: Dict[str, Tuple[int, Rect]] = {}
+        for client in self.state.get_clients():
+            entry = _client_rect(client)
+            if entry is not None:
+                current[client["address"]] = entry
+
+        for address in [a for a in self._rects if a not in current]:
+            dirty_workspaces.add(self._rects[address][0])
+            self._unindex(address)
+
+        for address, entry in current.items():
+            previous = self._rects.get(address)
+            if previous == entry:
+                continue
+            if previous is not None:
+                dirty_workspaces.add(previous[0])
+                self._unindex(address)
+            dirty_workspaces.add(entry[0])
+            self._index(address, entry)
+
+        if dirty_workspaces:
+            self._update_watchers(dirty_workspaces)
+
+    def _update_watchers(self, workspaces: Optional[Set[int]] = None):
+        for watcher in list(self._watchers):
+            if workspaces is not None and self.get_active_workspace(watcher.monitor_id) not in workspaces:
+                continue
+            watcher.update()
+
+
+def get_occlusion_engine() -> OcclusionEngine:
+    """Get the global OcclusionEngine instance."""
+    return OcclusionEngine.get_initial()
@@ -0,0 +1,275 @@
+"""
+Ranked application search for the launcher.
+
+AppSearchEngine builds its token, prefix and trigram indexes once per
+desktop app index generation. A query only collects candidates from those
+indexes and scores them, combining match quality with how often and how
+recently each app was launched.
+"""
+
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Set
+
+# Token prefixes up to this length are indexed directly
+PREFIX_LENGTH = 6
+# Below this many substring matches, subsequence (fuzzy) matches are added
+FUZZY_MIN_RESULTS = 3
+# Launch counts lose half their weight after this many seconds
+USAGE_HALF_LIFE = 7 * 24 * 3600
+# Upper bound of the usage boost; keeps a far better text match on top
+MAX_USAGE_BOOST = 40.0
+
+SCORE_EXACT = 100
+SCORE_PREFIX = 80
+SCORE_SUBSTRING = 50
+SCORE_FUZZY = 30
+NAME_BONUS = 15
+
+_TOKEN_RE = re.compile(r"[\w]+")
+
+
+def extract_command_name(command_line: Optional[str]) -> str:
+    """Base command name of a command line, without path or arguments."""
+    if not command_line or command_line.startswith("/bin/sh -c"):
+        return ""
+    parts = command_line.split()
+    return parts[0].split("/")[-1] if parts else ""
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def app_usage_key(app) -> str:
+    return getattr(app, "desktop_id", None) or app.name or ""
+
+
+class _Entry:
+    __slots__ = ("app", "name_key", "haystack", "name_tokens", "other_tokens", "tokens", "usage_key")
+
+    def __init__(self, app):
+        self.app = app
+        display_name = app.display_name or app.name or ""
+        executable = (app.executable or "").split("/")[-1]
+        fields = [
+            display_name,
+            app.name or "",
+            app.generic_name or "",
+            executable,
+            extract_command_name(app.command_line),
+        ]
+        self.name_key = display_name.casefold()
+        self.haystack = " ".join(f for f in fields if f).casefold()
+        name_tokens = tokenize(display_name)
+        self.tokens = list(dict.fromkeys(name_tokens + tokenize(" ".join(fields[1:]))))
+        self.name_tokens = frozenset(name_tokens)
+        self.other_tokens = frozenset(self.tokens) - self.name_tokens
+        self.usage_key = app_usage_key(app)
+
+
+def _fuzzy_score(term: str, text: str) -> int:
+    """Score `term` as an in-order subsequence of `text`; 0 when it is not one."""
+    pos = -1
+    start = None
+    gaps = 0
+    for ch in term:
+        found = text.find(ch, pos + 1)
+        if found < 0:
+            return 0
+        if start is None:
+            start = found
+        elif found != pos + 1:
+            gaps += 1
+        pos = found
+    # Mostly scattered characters are noise rather than an abbreviation
+    if gaps > len(term) // 2:
+        return 0
+    return max(1, SCORE_FUZZY - 3 * gaps - min(start, 10))
+
+
+class AppSearchEngine:
+    """
+    Prebuilt search index over desktop applications.
+
+    Launch frequency and recency are kept in a small JSON file so rankings
+    survive restarts.
+    """
+
+    def __init__(self, usage_path: Optional[str] = None):
+        self.usage_path = usage_path
+        self.generation = None
+        self._entries: List[_Entry] = []
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._name_prefixes: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._name_chars: Dict[str, Set[int]] = {}
+        self._alphabetical: List[int] = []
+        self._usage: Dict[str, dict] = {}
+        self._load_usage()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def set_apps(self, apps: Sequence, generation=None):
+        """(Re)build the index; a no-op if `generation` has already been indexed."""
+        if generation is not None and generation == self.generation:
+            return
+        self.generation = generation
+        self._entries = [_Entry(app) for app in apps]
+        self._prefixes = {}
+        self._name_prefixes = {}
+        self._trigrams = {}
+        self._name_chars = {}
+
+        for i, entry in enumerate(self._entries):
+            for token in entry.tokens:
+                index = self._name_prefixes if token in entry.name_tokens else None
+                for length in range(1, min(len(token), PREFIX_LENGTH) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(i)
+                    if index is not None:
+                        index.setdefault(token[:length], set()).add(i)
+            haystack = entry.haystack
+            for j in range(len(haystack) - 2):
+                self._trigrams.setdefault(haystack[j : j + 3], set()).add(i)
+            for ch in set(entry.name_key):
+                self._name_chars.setdefault(ch, set()).add(i)
+
+        self._alphabetical = sorted(
+            range(len(self._entries)), key=lambda i: self._entries[i].name_key
+        )
+
+    def _term_candidates(self, term: str) -> Set[int]:
+        found = set(self._prefixes.get(term[:PREFIX_LENGTH], ()))
+        if len(term) > PREFIX_LENGTH:
+            found = {i for i in found if any(t.startswith(term) for t in self._entries[i].tokens)}
+        if len(term) >= 3:
+            substring = None
+            for j in range(len(term) - 2):
+                bucket = self._trigrams.get(term[j : j + 3])
+                if not bucket:
+                    substring = set()
+                    break
+                substring = set(bucket) if substring is None else substring & bucket
+            if substring:
+                found |= {i for i in substring if term in self._entries[i].haystack}
+        return found
+
+    def _fuzzy_candidates(self, terms: List[str]) -> Set[int]:
+        # Fuzzy matches are scored against the display name, and abbreviations
+        # like "blndr" start where one of its words starts
+        candidates = None
+        for term in terms:
+            found = set(self._name_prefixes.get(term[0], ()))
+            for ch in set(term[1:]):
+                found &= self._name_chars.get(ch, set())
+            candidates = found if candidates is None else candidates & found
+        return candidates or set()
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score_term(self, term: str, i: int) -> int:
+        entry = self._entries[i]
+        if term in entry.name_tokens:
+            return SCORE_EXACT + NAME_BONUS
+        if term in entry.other_tokens:
+            return SCORE_EXACT
+        if len(term) <= PREFIX_LENGTH:
+            if i in self._name_prefixes.get(term, ()):
+                return SCORE_PREFIX + NAME_BONUS
+            if i in self._prefixes.get(term, ()):
+                return SCORE_PREFIX
+        else:
+            for token in entry.name_tokens:
+                if token.startswith(term):
+                    return SCORE_PREFIX + NAME_BONUS
+            for token in entry.other_tokens:
+                if token.startswith(term):
+                    return SCORE_PREFIX
+
+        position = entry.haystack.find(term)
+        if position >= 0:
+            return SCORE_SUBSTRING - min(position, 30)
+
+        return _fuzzy_score(term, entry.name_key)
+
+    def usage_boost(self, key: str, now: Optional[float] = None) -> float:
+        usage = self._usage.get(key)
+        if not usage:
+            return 0.0
+        now = time.time() if now is None else now
+        age = max(0.0, now - usage.get("last", 0))
+        decay = 0.5 ** (age / USAGE_HALF_LIFE)
+        return min(MAX_USAGE_BOOST, 10 * math.log2(1 + usage.get("count", 0)) * (0.5 + decay))
+
+    def search(self, query: str) -> List:
+        """Apps matching `query`, best first; an empty query lists all apps alphabetically."""
+        terms = tokenize(query)
+        if not terms:
+            return [self._entries[i].app for i in self._alphabetical]
+
+        candidates = None
+        for term in terms:
+            found = self._term_candidates(term)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                break
+        if len(candidates) < FUZZY_MIN_RESULTS:
+            candidates |= self._fuzzy_candidates(terms)
+
+        now = time.time()
+        ranked = []
+        for i in candidates:
+            entry = self._entries[i]
+            total = 0
+            for term in terms:
+                score = self._score_term(term, i)
+                if not score:
+                    break
+                total += score
+            else:
+                total += self.usage_boost(entry.usage_key, now)
+                ranked.append((-total, entry.name_key, i))
+
+        ranked.sort()
+        return [self._entries[i].app for _, _, i in ranked]
+
+    # ------------------------------------------------------------------
+    # Usage statistics
+    # ------------------------------------------------------------------
+
+    def _load_usage(self):
+        if not self.usage_path:
+            return
+        try:
+            with open(self.usage_path, "r") as f:
+                usage = json.load(f)
+            if isinstance(usage, dict):
+                self._usage = usage
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._usage = {}
+
+    def record_launch(self, app):
+        """Count a launch of `app` towards its ranking and persist the statistics."""
+        key = app_usage_key(app)
+        if not key:
+            return
+        usage = self._usage.setdefault(key, {"count": 0, "last": 0})
+        usage["count"] += 1
+        usage["last"] = time.time()
+        if not self.usage_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.usage_path), exist_ok=True)
+            tmp_path = f"{self.usage_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._usage, f)
+            os.replace(tmp_path, self.usage_path)
+        except OSError as e:
+            print(f"Failed to save app usage: {e}")
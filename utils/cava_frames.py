@@ -0,0 +1,76 @@
+"""
+Decoding of cava's raw FIFO output.
+
+cava writes one frame of `bars` unsigned integers per tick. FrameReader
+drains whatever is buffered in the FIFO into a preallocated bytearray,
+keeps only the newest complete frame and exposes it as a float32 NumPy
+array that is updated in place, so reading a frame allocates nothing.
+"""
+
+import os
+
+import numpy as np
+
+# Frames read per syscall while draining; all but the newest are dropped
+READ_BATCH_FRAMES = 8
+
+
+class FrameReader:
+    """Reads a non-blocking cava FIFO, keeping only the latest frame."""
+
+    def __init__(self, fd: int, bars: int, bit_depth: int = 16):
+        dtype = np.dtype(np.uint16 if bit_depth == 16 else np.uint8)
+        self.fd = fd
+        self.bars = bars
+        self.frame_size = bars * dtype.itemsize
+
+        self._buffer = bytearray(self.frame_size * READ_BATCH_FRAMES)
+        self._view = memoryview(self._buffer)
+        # Bytes of an incomplete frame kept at the start of the buffer
+        self._pending = 0
+        self._latest = bytearray(self.frame_size)
+        self._raw = np.frombuffer(self._latest, dtype=dtype)
+        self._scale = np.float32(1.0 / np.iinfo(dtype).max)
+
+        # Normalized to 0..1; overwritten by every drain() that finds a frame
+        self.frame = np.zeros(bars, dtype=np.float32)
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    def drain(self) -> bool:
+        """
+        Read everything currently buffered in the FIFO.
+
+        Returns True when at least one complete frame arrived. OSErrors other
+        than EAGAIN propagate to the caller.
+        """
+        received = 0
+        while True:
+            try:
+                length = os.readv(self.fd, [self._view[self._pending :]])
+            except BlockingIOError:
+                break
+            if length == 0:
+                break
+            total = self._pending + length
+            complete = total // self.frame_size
+            if complete:
+                end = complete * self.frame_size
+                self._latest[:] = self._view[end - self.frame_size : end]
+                remainder = total - end
+                if remainder:
+                    self._buffer[:remainder] = self._view[end:total]
+                self._pending = remainder
+                received += complete
+            else:
+                self._pending = total
+            if total < len(self._buffer):
+                # Short read: the FIFO is empty
+                break
+
+        if not received:
+            return False
+        self.frames_read += received
+        self.frames_dropped += received - 1
+        np.multiply(self._raw, self._scale, out=self.frame)
+        return True
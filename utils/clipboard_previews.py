@@ -0,0 +1,138 @@
+"""
+Scaled previews of image clipboard entries.
+
+Decoding goes through `cliphist decode` on a small fixed pool of worker
+threads. Scaled pixbufs are kept in an LRU bounded by their pixel bytes,
+and written as PNG to a disk cache keyed by cliphist id, so a preview is
+decoded from the full image once, ever. cliphist ids are never reused,
+which keeps the key valid; files of ids no longer in the history are
+removed by prune().
+"""
+
+import os
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from gi.repository import GdkPixbuf, GLib
+
+PREVIEW_SIZE = 72
+# Pixel bytes of scaled previews kept in memory (a 72x72 RGBA preview is ~20 KiB)
+MEMORY_BUDGET = 8 * 1024 * 1024
+DECODE_WORKERS = 2
+
+
+def _pixbuf_bytes(pixbuf: GdkPixbuf.Pixbuf) -> int:
+    return pixbuf.get_rowstride() * pixbuf.get_height()
+
+
+class ClipboardPreviewCache:
+    """Preview pixbufs by cliphist id; request() calls back on the main loop."""
+
+    def __init__(self, cache_dir: str, size: int = PREVIEW_SIZE, max_bytes: int = MEMORY_BUDGET):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[str, GdkPixbuf.Pixbuf]" = OrderedDict()
+        self._bytes = 0
+        self._callbacks: Dict[str, List[Callable]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="clip-preview")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, item_id: str) -> Optional[GdkPixbuf.Pixbuf]:
+        pixbuf = self._lru.get(item_id)
+        if pixbuf is not None:
+            self._lru.move_to_end(item_id)
+        return pixbuf
+
+    def request(self, item_id: str, callback: Callable[[GdkPixbuf.Pixbuf], None]):
+        """Load a preview that get() did not have; callback runs once it is ready."""
+        self._callbacks.setdefault(item_id, []).append(callback)
+        if item_id not in self._futures:
+            self._futures[item_id] = self._executor.submit(self._load, item_id)
+
+    def cancel(self):
+        """Drop pending requests; decodes already running still fill the cache."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._callbacks.clear()
+
+    def forget(self, item_id: str):
+        pixbuf = self._lru.pop(item_id, None)
+        if pixbuf is not None:
+            self._bytes -= _pixbuf_bytes(pixbuf)
+        self._executor.submit(self._remove_file, item_id)
+
+    def prune(self, live_ids: Iterable[str]):
+        """Remove disk previews of entries that left the history, in the background."""
+        live = {f"{item_id}.png" for item_id in live_ids}
+        for item_id in [i for i in self._lru if f"{i}.png" not in live]:
+            self._bytes -= _pixbuf_bytes(self._lru.pop(item_id))
+        self._executor.submit(self._prune_files, live)
+
+    def _path(self, item_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{item_id}.png")
+
+    def _load(self, item_id: str):
+        """Runs on a worker thread."""
+        pixbuf = None
+        path = self._path(item_id)
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+        except GLib.Error:
+            pass
+        if pixbuf is None:
+            try:
+                result = subprocess.run(["cliphist", "decode", item_id], capture_output=True, check=True)
+                loader = GdkPixbuf.PixbufLoader()
+                loader.write(result.stdout)
+                loader.close()
+                pixbuf = self._scale(loader.get_pixbuf())
+                pixbuf.savev(path, "png", [], [])
+            except (subprocess.CalledProcessError, GLib.Error, OSError) as e:
+                print(f"Error loading image preview: {e}")
+        GLib.idle_add(self._deliver, item_id, pixbuf)
+
+    def _scale(self, pixbuf: GdkPixbuf.Pixbuf) -> GdkPixbuf.Pixbuf:
+        width, height = pixbuf.get_width(), pixbuf.get_height()
+        if width > height:
+            new_width, new_height = self.size, max(1, int(height * (self.size / width)))
+        else:
+            new_width, new_height = max(1, int(width * (self.size / height))), self.size
+        return pixbuf.scale_simple(new_width, new_height, GdkPixbuf.InterpType.BILINEAR)
+
+    def _deliver(self, item_id: str, pixbuf: Optional[GdkPixbuf.Pixbuf]):
+        self._futures.pop(item_id, None)
+        callbacks = self._callbacks.pop(item_id, [])
+        if pixbuf is None:
+            return False
+        if item_id not in self._lru:
+            self._lru[item_id] = pixbuf
+            self._bytes += _pixbuf_bytes(pixbuf)
+            while self._bytes > self.max_bytes and len(self._lru) > 1:
+                _, evicted = self._lru.popitem(last=False)
+                self._bytes -= _pixbuf_bytes(evicted)
+        for callback in callbacks:
+            callback(pixbuf)
+        return False
+
+    def _remove_file(self, item_id: str):
+        try:
+            os.remove(self._path(item_id))
+        except OSError:
+            pass
+
+    def _prune_files(self, live_names: set):
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name not in live_names:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+        except OSError:
+            pass
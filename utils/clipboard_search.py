@@ -0,0 +1,153 @@
+"""
+Full-text index of clipboard text entries.
+
+`cliphist list` only shows the first line of an entry, cut short. This
+index stores the full decoded text of every text entry in an SQLite FTS5
+table with the trigram tokenizer, so any substring of three or more
+characters is found wherever it sits in a clip. The rowid is the cliphist
+id; sync() decodes only ids the table does not have yet and drops ids
+that left the history.
+
+Everything runs on one worker thread that owns the connection. Results of
+search() come back to the main loop in chunks, and a newer search makes
+older ones stop at their next chunk.
+"""
+
+import os
+import sqlite3
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from gi.repository import GLib
+
+# Shortest query FTS5's trigram tokenizer can match
+MIN_QUERY_LENGTH = 3
+# Longer clips are indexed up to this many characters
+MAX_INDEXED_CHARS = 64 * 1024
+RESULT_CHUNK = 200
+# Snippets cost far more than ids; only the first matches get one
+SNIPPET_ROWS = 100
+# Rows inserted per transaction while indexing
+INSERT_BATCH = 50
+SNIPPET_TOKENS = 12
+
+# Snippet delimiters, replaced after escaping the text for Pango
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+
+def highlight_markup(text: str, start: str = _MARK_START, end: str = _MARK_END) -> str:
+    """Pango markup of `text`, with the delimited matches in bold."""
+    escaped = GLib.markup_escape_text(text)
+    return escaped.replace(start, "<b>").replace(end, "</b>")
+
+
+class ClipboardSearchIndex:
+    """FTS5 trigram index over clipboard text, keyed by cliphist id."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db = None
+        self._generation = 0
+        # Text ids still to decode and index; only touched on the worker
+        self._pending: List[int] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip-search")
+        self._executor.submit(self._open)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS clips USING fts5(body, tokenize='trigram')")
+        self._db.commit()
+
+    def sync(self, text_ids: Sequence[int]):
+        """Index new text entries and drop removed ones, in the background."""
+        self._executor.submit(self._sync, list(text_ids))
+
+    def _sync(self, text_ids: List[int]):
+        live = set(text_ids)
+        known = {row[0] for row in self._db.execute("SELECT rowid FROM clips")}
+        gone = known - live
+        if gone:
+            self._db.executemany("DELETE FROM clips WHERE rowid = ?", [(i,) for i in gone])
+            self._db.commit()
+
+        # Newest first, so recent clips become searchable first
+        schedule = not self._pending
+        self._pending = [i for i in text_ids if i not in known]
+        if schedule and self._pending:
+            self._executor.submit(self._index_batch)
+
+    def _index_batch(self):
+        """Index a few clips, then requeue, so searches run in between."""
+        batch, self._pending = self._pending[:INSERT_BATCH], self._pending[INSERT_BATCH:]
+        rows = []
+        for item_id in batch:
+            text = self._decode(item_id)
+            # Binary or undecodable clips get an empty body, which matches
+            # nothing but keeps sync() from decoding them again
+            rows.append((item_id, text if text is not None else ""))
+        self._db.executemany("INSERT OR REPLACE INTO clips(rowid, body) VALUES (?, ?)", rows)
+        self._db.commit()
+        if self._pending:
+            self._executor.submit(self._index_batch)
+
+    @staticmethod
+    def _decode(item_id: int):
+        try:
+            result = subprocess.run(["cliphist", "decode", str(item_id)], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        if b"\0" in result.stdout[:1024]:
+            return None  # Binary content that slipped past the preview check
+        return result.stdout[: MAX_INDEXED_CHARS * 4].decode("utf-8", errors="replace")[:MAX_INDEXED_CHARS]
+
+    def search(self, query: str, on_results: Callable[[Dict[int, str], bool], None]):
+        """
+        Find clips containing `query`.
+
+        on_results(snippets, done) runs on the main loop once per chunk, with
+        the matching ids mapped to a Pango markup snippet (None past the first
+        SNIPPET_ROWS matches), newest first, and with done=True last.
+        """
+        self._generation += 1
+        self._executor.submit(self._search, query, self._generation, on_results)
+
+    def cancel(self):
+        """Stop delivering results of the current search."""
+        self._generation += 1
+
+    def _search(self, query: str, generation: int, on_results):
+        if generation != self._generation:
+            return
+        phrase = '"{}"'.format(query.replace('"', '""'))
+        with_snippets = self._db.execute(
+            "SELECT rowid, snippet(clips, 0, ?, ?, '…', ?) FROM clips WHERE clips MATCH ? "
+            "ORDER BY rowid DESC LIMIT ?",
+            (_MARK_START, _MARK_END, SNIPPET_TOKENS, phrase, SNIPPET_ROWS),
+        ).fetchall()
+        snippets = {item_id: highlight_markup(" ".join(snippet.split())) for item_id, snippet in with_snippets}
+        done = len(with_snippets) < SNIPPET_ROWS
+        GLib.idle_add(self._deliver, generation, on_results, snippets, done)
+        if done:
+            return
+
+        cursor = self._db.execute(
+            "SELECT rowid FROM clips WHERE clips MATCH ? ORDER BY rowid DESC LIMIT -1 OFFSET ?",
+            (phrase, SNIPPET_ROWS),
+        )
+        while True:
+            rows = cursor.fetchmany(RESULT_CHUNK)
+            if generation != self._generation:
+                return
+            done = len(rows) < RESULT_CHUNK
+            GLib.idle_add(self._deliver, generation, on_results, {row[0]: None for row in rows}, done)
+            if done:
+                return
+
+    def _deliver(self, generation: int, on_results, snippets: Dict[int, Optional[str]], done: bool):
+        if generation == self._generation:
+            on_results(snippets, done)
+        return False
@@ -0,0 +1,246 @@
+"""
+GPU utilisation sources for MetricsProvider.
+
+Each backend detects its devices without blocking the main loop and reports
+the latest utilisation per device:
+
+  - SysfsGpuBackend reads `gpu_busy_percent` under /sys/class/drm (amdgpu
+    and any other driver exposing it), re-reading the open file in place.
+  - NvidiaSmiBackend keeps one `nvidia-smi -lms` child streaming CSV lines
+    while GPU metrics are subscribed.
+
+Detected devices are cached so widgets can be built at startup from the
+previous run's results while detection runs in the background.
+"""
+
+import glob
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from utils.proc_readers import ProcFile
+
+# How often the streaming nvidia-smi child reports utilisation
+NVIDIA_QUERY_INTERVAL_MS = 2000
+
+
+class SysfsGpuBackend:
+    """GPUs whose DRM driver exposes gpu_busy_percent."""
+
+    id = "sysfs"
+
+    def __init__(self):
+        self._files: Dict[str, ProcFile] = {}
+
+    def detect(self, callback: Callable[[List[dict]], None]):
+        devices = []
+        for path in sorted(glob.glob("/sys/class/drm/card[0-9]*/device/gpu_busy_percent")):
+            device_dir = os.path.dirname(path)
+            card = path.split("/")[4]
+            devices.append({"backend": self.id, "key": path, "name": self._device_name(device_dir, card)})
+        callback(devices)
+
+    @staticmethod
+    def _device_name(device_dir: str, card: str) -> str:
+        try:
+            with open(f"{device_dir}/product_name") as f:
+                name = f.read().strip()
+            if name:
+                return name
+        except OSError:
+            pass
+        try:
+            with open(f"{device_dir}/uevent") as f:
+                for line in f:
+                    if line.startswith("DRIVER="):
+                        return f"{line[7:].strip()} ({card})"
+        except OSError:
+            pass
+        return card
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def read(self, key: str) -> Optional[float]:
+        try:
+            file = self._files.get(key)
+            if file is None:
+                file = self._files[key] = ProcFile(key, size=16)
+            length = file.read()
+            return float(file.buffer[:length])
+        except (OSError, ValueError):
+            return None
+
+
+class NvidiaSmiBackend:
+    """NVIDIA GPUs, fed by a long-lived streaming nvidia-smi child."""
+
+    id = "nvidia"
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+        self._process: Optional[Gio.Subprocess] = None
+        self._cancellable: Optional[Gio.Cancellable] = None
+
+    def detect(self, callback: Callable[[List[dict]], None]):
+        if GLib.find_program_in_path("nvidia-smi") is None:
+            callback([])
+            return
+        try:
+            process = Gio.Subprocess.new(
+                ["nvidia-smi", "--query-gpu=index,name", "--format=csv,noheader"],
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            logger.warning(f"[GPU] Could not run nvidia-smi: {e.message}")
+            callback([])
+            return
+
+        def on_finished(process, result):
+            devices = []
+            try:
+                _, stdout, _ = process.communicate_utf8_finish(result)
+                for line in (stdout or "").splitlines():
+                    index, _, name = line.partition(",")
+                    if index.strip().isdigit():
+                        devices.append({"backend": self.id, "key": index.strip(), "name": name.strip()})
+            except GLib.Error as e:
+                logger.warning(f"[GPU] nvidia-smi detection failed: {e.message}")
+            callback(devices)
+
+        process.communicate_utf8_async(None, None, on_finished)
+
+    def start(self):
+        if self._process is not None:
+            return
+        try:
+            self._process = Gio.Subprocess.new(
+                [
+                    "nvidia-smi",
+                    "--query-gpu=index,utilization.gpu",
+                    "--format=csv,noheader,nounits",
+                    f"--loop-ms={NVIDIA_QUERY_INTERVAL_MS}",
+                ],
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            logger.warning(f"[GPU] Could not start nvidia-smi: {e.message}")
+            return
+        self._cancellable = Gio.Cancellable()
+        stream = Gio.DataInputStream.new(self._process.get_stdout_pipe())
+        stream.read_line_async(GLib.PRIORITY_LOW, self._cancellable, self._on_line, None)
+
+    def _on_line(self, stream, result, _):
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+        except GLib.Error:
+            # Cancelled by stop(), or the pipe broke
+            return
+        if line is None:
+            logger.warning("[GPU] nvidia-smi exited; NVIDIA utilisation unavailable until restarted")
+            self._process = None
+            self._values.clear()
+            return
+        index, _, value = line.partition(",")
+        try:
+            self._values[index.strip()] = float(value)
+        except ValueError:
+            pass
+        stream.read_line_async(GLib.PRIORITY_LOW, self._cancellable, self._on_line, None)
+
+    def stop(self):
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+            self._cancellable = None
+        if self._process is not None:
+            self._process.force_exit()
+            self._process = None
+        self._values.clear()
+
+    def read(self, key: str) -> Optional[float]:
+        return self._values.get(key)
+
+
+class GpuTelemetry:
+    """Merges GPU backends into one ordered device list with cached detection."""
+
+    def __init__(self, cache_path: Optional[str] = None, on_devices_changed: Optional[Callable[[], None]] = None):
+        self.cache_path = cache_path
+        self.on_devices_changed = on_devices_changed
+        self.backends = {backend.id: backend for backend in (SysfsGpuBackend(), NvidiaSmiBackend())}
+        self.devices: List[dict] = self._load_cache()
+        self._active = False
+        # Detection never runs during construction
+        GLib.idle_add(self.detect)
+
+    def _load_cache(self) -> List[dict]:
+        if not self.cache_path:
+            return []
+        try:
+            with open(self.cache_path, "r") as f:
+                devices = json.load(f)
+            return [d for d in devices if d.get("backend") in self.backends]
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError, TypeError):
+            return []
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.devices, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"[GPU] Failed to save detection cache: {e}")
+
+    def detect(self):
+        for backend in self.backends.values():
+            backend.detect(lambda found, backend_id=backend.id: self._on_detected(backend_id, found))
+        return False
+
+    def _on_detected(self, backend_id: str, found: List[dict]):
+        order = list(self.backends)
+        devices = [d for d in self.devices if d["backend"] != backend_id] + found
+        devices.sort(key=lambda d: order.index(d["backend"]))
+        if devices == self.devices:
+            return
+        logger.info(f"[GPU] Detected devices: {[d['name'] for d in devices]}")
+        self.devices = devices
+        self._save_cache()
+        if self._active:
+            self._start_backends()
+        if self.on_devices_changed:
+            self.on_devices_changed()
+
+    def _start_backends(self):
+        in_use = {d["backend"] for d in self.devices}
+        for backend_id, backend in self.backends.items():
+            if backend_id in in_use:
+                backend.start()
+            else:
+                backend.stop()
+
+    def start(self):
+        """Begin producing values; called while GPU metrics are subscribed."""
+        self._active = True
+        self._start_backends()
+
+    def stop(self):
+        self._active = False
+        for backend in self.backends.values():
+            backend.stop()
+
+    def sample(self) -> List[float]:
+        """Latest utilisation per device, in device order; 0 when unknown."""
+        return [
+            self.backends[d["backend"]].read(d["key"]) or 0.0
+            for d in self.devices
+        ]
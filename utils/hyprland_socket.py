@@ -0,0 +1,350 @@
+"""
+Native access to the Hyprland IPC sockets.
+
+Provides socket path resolution, a non-blocking socket2 event reader
+integrated with the GLib main loop, and a command client that batches
+requests, so no `socat`/`hyprctl` processes or reader threads are needed.
+"""
+
+import json
+import os
+import socket
+from typing import Callable, Dict, List, Optional
+
+from gi.repository import GLib
+from loguru import logger
+
+EVENT_SOCKET = ".socket2.sock"
+COMMAND_SOCKET = ".socket.sock"
+
+READ_CHUNK_SIZE = 65536
+RECONNECT_MIN_DELAY_MS = 250
+RECONNECT_MAX_DELAY_MS = 10000
+
+
+def get_hyprland_socket_path(socket_name: str = EVENT_SOCKET) -> Optional[str]:
+    """
+    Resolve the path of a Hyprland socket for the running instance.
+
+    Hyprland >= 0.40 places its sockets in $XDG_RUNTIME_DIR/hypr/<signature>,
+    older releases used /tmp/hypr/<signature>.
+
+    Returns:
+        The socket path, or None when no Hyprland instance signature is set.
+    """
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    path = os.path.join(runtime_dir, "hypr", signature, socket_name)
+    if os.path.exists(path):
+        return path
+
+    legacy_path = os.path.join("/tmp/hypr", signature, socket_name)
+    if os.path.exists(legacy_path):
+        return legacy_path
+    return path
+
+
+EventHandler = Callable[[str], None]
+
+
+class HyprlandEventReader:
+    """
+    Non-blocking reader for the Hyprland socket2 event stream.
+
+    Incoming data is drained in one go whenever the socket becomes readable,
+    split into complete `EVENT>>DATA` lines and dispatched through a lookup
+    table keyed by event name. Handlers receive the raw data string. The
+    reader reconnects with exponential backoff when the socket goes away.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self._socket_path = socket_path
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._sock: Optional[socket.socket] = None
+        self._watch_id: Optional[int] = None
+        self._reconnect_id: Optional[int] = None
+        self._reconnect_delay = RECONNECT_MIN_DELAY_MS
+        self._buffer = bytearray()
+        self._running = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self, event_name: str, handler: EventHandler):
+        """Register a handler for an event name (e.g. 'focusedmon')."""
+        self._handlers.setdefault(event_name, []).append(handler)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._open()
+
+    def stop(self):
+        self._running = False
+        if self._reconnect_id is not None:
+            GLib.source_remove(self._reconnect_id)
+            self._reconnect_id = None
+        self._close()
+
+    def _open(self) -> bool:
+        path = self._socket_path or get_hyprland_socket_path(EVENT_SOCKET)
+        if path is None:
+            logger.warning("[HyprlandEventReader] HYPRLAND_INSTANCE_SIGNATURE is not set")
+            return False
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError as e:
+            sock.close()
+            logger.warning(f"[HyprlandEventReader] Could not connect to {path}: {e}")
+            self._schedule_reconnect()
+            return False
+
+        sock.setblocking(False)
+        self._sock = sock
+        self._buffer.clear()
+        self._reconnect_delay = RECONNECT_MIN_DELAY_MS
+        self._watch_id = GLib.io_add_watch(
+            sock.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self._on_socket_ready,
+        )
+        return True
+
+    def _close(self):
+        if self._watch_id is not None:
+            GLib.source_remove(self._watch_id)
+            self._watch_id = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._buffer.clear()
+
+    def _schedule_reconnect(self):
+        if not self._running or self._reconnect_id is not None:
+            return
+        delay = self._reconnect_delay
+        self._reconnect_delay = min(delay * 2, RECONNECT_MAX_DELAY_MS)
+        self._reconnect_id = GLib.timeout_add(delay, self._on_reconnect)
+
+    def _on_reconnect(self):
+        self._reconnect_id = None
+        if self._running:
+            self._open()
+        return False
+
+    def _on_socket_ready(self, fd, condition):
+        closed = bool(condition & (GLib.IO_HUP | GLib.IO_ERR))
+
+        while self._sock is not None:
+            try:
+                chunk = self._sock.recv(READ_CHUNK_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                logger.warning(f"[HyprlandEventReader] Read error: {e}")
+                closed = True
+                break
+            if not chunk:
+                closed = True
+                break
+            self._buffer += chunk
+
+        self._dispatch_buffer()
+
+        if closed:
+            # Returning False drops the watch, so forget its id before closing
+            self._watch_id = None
+            self._close()
+            self._schedule_reconnect()
+            return False
+        return True
+
+    def _dispatch_buffer(self):
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return
+        lines = bytes(self._buffer[:end]).split(b"\n")
+        del self._buffer[: end + 1]
+
+        for line in lines:
+            name, sep, data = line.partition(b">>")
+            if not sep:
+                continue
+            handlers = self._handlers.get(name.decode("utf-8", "replace"))
+            if not handlers:
+                continue
+            data_str = data.decode("utf-8", "replace")
+            for handler in handlers:
+                try:
+                    handler(data_str)
+                except Exception as e:
+                    logger.error(f"[HyprlandEventReader] Handler for {name!r} failed: {e}")
+
+
+CommandCallback = Callable[[Optional[bytes]], None]
+
+BATCH_PREFIX = "[[BATCH]]"
+BATCH_DELIMITER = b"\n\n\n"
+COMMAND_TIMEOUT = 2.0
+
+
+class HyprctlClient:
+    """
+    Client for the Hyprland command socket (.socket.sock).
+
+    Requests made during the same main-loop iteration are queued and sent as
+    a single `[[BATCH]]` write on the next idle, with the combined reply split
+    back to each caller's callback. Identical commands in one batch share a
+    single reply. `query()` is available for callers that need an answer
+    synchronously; it flushes anything already queued in the same round trip.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self._socket_path = socket_path
+        self._pending: List[tuple] = []
+        self._flush_id: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Asynchronous API
+    # ------------------------------------------------------------------
+
+    def request(self, command: str, callback: Optional[CommandCallback] = None):
+        """Queue a command; `callback` receives the raw reply (or None on failure)."""
+        self._pending.append((command, callback))
+        if self._flush_id is None:
+            self._flush_id = GLib.idle_add(self._flush, priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def request_json(self, command: str, callback: Callable[[object], None]):
+        """Queue a JSON command (e.g. 'j/clients'); `callback` receives the parsed reply."""
+        self.request(command, lambda reply: callback(self._decode_json(command, reply)))
+
+    def dispatch(self, args: str, callback: Optional[CommandCallback] = None):
+        """Queue a `dispatch` command, e.g. dispatch('focuswindow address:0x...')."""
+        self.request(f"dispatch {args}", callback)
+
+    def _flush(self):
+        self._flush_id = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return False
+
+        replies = self.query_batch([command for command, _ in pending])
+        for (_, callback), reply in zip(pending, replies):
+            if callback is None:
+                continue
+            try:
+                callback(reply)
+            except Exception as e:
+                logger.error(f"[HyprctlClient] Callback failed: {e}")
+        return False
+
+    # ------------------------------------------------------------------
+    # Synchronous API
+    # ------------------------------------------------------------------
+
+    def query(self, command: str) -> Optional[bytes]:
+        """Send a command now and return its reply, flushing queued requests with it."""
+        if self._pending:
+            if self._flush_id is not None:
+                GLib.source_remove(self._flush_id)
+            reply_box: List[Optional[bytes]] = []
+            self._pending.append((command, reply_box.append))
+            self._flush()
+            return reply_box[0] if reply_box else None
+        return self.query_batch([command])[0]
+
+    def query_json(self, command: str):
+        return self._decode_json(command, self.query(command))
+
+    def query_batch_json(self, commands: List[str]) -> list:
+        """Like query_batch(), with every reply parsed as JSON."""
+        return [
+            self._decode_json(command, reply)
+            for command, reply in zip(commands, self.query_batch(commands))
+        ]
+
+    def query_batch(self, commands: List[str]) -> List[Optional[bytes]]:
+        """Send several commands in one round trip and return their replies in order."""
+        unique = list(dict.fromkeys(commands))
+        # ';' separates batch items, so such commands have to travel alone
+        batchable = [c for c in unique if ";" not in c]
+        replies: Dict[str, Optional[bytes]] = {
+            c: self._send(c) for c in unique if ";" in c
+        }
+
+        if len(batchable) == 1:
+            replies[batchable[0]] = self._send(batchable[0])
+        elif batchable:
+            reply = self._send(BATCH_PREFIX + ";".join(batchable))
+            parts = reply.split(BATCH_DELIMITER) if reply is not None else []
+            # Hyprland ends every item with the delimiter, including the last one
+            if len(parts) == len(batchable) + 1 and not parts[-1].strip():
+                parts.pop()
+            if len(parts) == len(batchable):
+                replies.update(zip(batchable, parts))
+            else:
+                # A reply containing the delimiter makes the split ambiguous
+                logger.warning(
+                    f"[HyprctlClient] Batch reply has {len(parts)} parts for "
+                    f"{len(batchable)} commands, sending them one by one"
+                )
+                for command in batchable:
+                    replies[command] = self._send(command)
+
+        return [replies.get(command) for command in commands]
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def _send(self, payload: str) -> Optional[bytes]:
+        path = self._socket_path or get_hyprland_socket_path(COMMAND_SOCKET)
+        if path is None:
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(COMMAND_TIMEOUT)
+        try:
+            sock.connect(path)
+            sock.sendall(payload.encode())
+            chunks = []
+            while True:
+                chunk = sock.recv(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b"".join(chunks)
+        except OSError as e:
+            logger.warning(f"[HyprctlClient] Request {payload[:64]!r} failed: {e}")
+            return None
+        finally:
+            sock.close()
+
+    @staticmethod
+    def _decode_json(command: str, reply: Optional[bytes]):
+        if reply is None:
+            return None
+        try:
+            return json.loads(reply)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"[HyprctlClient] Invalid JSON reply for {command}: {e}")
+            return None
+
+
+# Singleton accessor
+_hyprctl_client_instance = None
+
+def get_hyprctl_client() -> HyprctlClient:
+    """Get the global HyprctlClient instance."""
+    global _hyprctl_client_instance
+    if _hyprctl_client_instance is None:
+        _hyprctl_client_instance = HyprctlClient()
+    return _hyprctl_client_instance
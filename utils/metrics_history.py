@@ -0,0 +1,191 @@
+"""
+Fixed-size history of sampled metrics.
+
+Every series keeps two float32 rings: a short, full-resolution one for
+sparklines and a long, downsampled one (per-bucket averages). Slots that
+were not sampled, e.g. while every metrics widget was hidden, hold NaN.
+Recording a sample writes into preallocated arrays; only the long rings are
+persisted, as raw floats in a small binary file.
+"""
+
+import math
+import os
+import struct
+from array import array
+from typing import Dict, Optional
+
+# Short history: 10 minutes at 2 s resolution
+HISTORY_RESOLUTION = 2
+HISTORY_LENGTH = 300
+# Long history: 24 hours at 1 minute resolution
+LONG_RESOLUTION = 60
+LONG_LENGTH = 1440
+
+NAN = float("nan")
+
+_MAGIC = b"AXMH"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+_SERIES_HEADER = struct.Struct("<HqI")
+
+
+class RingBuffer:
+    """A fixed-capacity ring of floats backed by a single array('f')."""
+
+    __slots__ = ("capacity", "_data", "_head", "_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array("f", [NAN]) * capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def fill(self, value: float, count: int):
+        for _ in range(min(count, self.capacity)):
+            self.append(value)
+
+    def set_last(self, value: float):
+        if self._count:
+            self._data[self._head - 1] = value
+
+    def last(self) -> float:
+        return self._data[self._head - 1] if self._count else NAN
+
+    def values(self) -> array:
+        """The stored values, oldest first."""
+        if self._count < self.capacity:
+            return self._data[: self._count]
+        return self._data[self._head :] + self._data[: self._head]
+
+
+class MetricSeries:
+    """History of one metric, bucketed by wall-clock time."""
+
+    __slots__ = ("recent", "long", "_slot", "_long_slot", "_long_last", "_long_sum", "_long_count")
+
+    def __init__(self):
+        self.recent = RingBuffer(HISTORY_LENGTH)
+        self.long = RingBuffer(LONG_LENGTH)
+        self._slot: Optional[int] = None
+        self._long_slot: Optional[int] = None
+        # Long slot of the newest value in `long`
+        self._long_last: Optional[int] = None
+        self._long_sum = 0.0
+        self._long_count = 0
+
+    def record(self, value: float, timestamp: float) -> bool:
+        """Store a sample; returns True when it closed a long bucket."""
+        slot = int(timestamp // HISTORY_RESOLUTION)
+        if slot == self._slot:
+            self.recent.set_last(value)
+        else:
+            if self._slot is not None and slot > self._slot:
+                self.recent.fill(NAN, slot - self._slot - 1)
+            self.recent.append(value)
+            self._slot = slot
+
+        closed = False
+        long_slot = int(timestamp // LONG_RESOLUTION)
+        if long_slot != self._long_slot:
+            if self._long_count:
+                self._close_bucket()
+                closed = True
+            self._long_slot = long_slot
+            self._long_sum = 0.0
+            self._long_count = 0
+        self._long_sum += value
+        self._long_count += 1
+        return closed
+
+    def _close_bucket(self):
+        if self._long_last is not None and self._long_slot > self._long_last:
+            self.long.fill(NAN, self._long_slot - self._long_last - 1)
+        self.long.append(self._long_sum / self._long_count)
+        self._long_last = self._long_slot
+
+
+class MetricsHistory:
+    """Named metric series, with the long history optionally kept on disk."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.series: Dict[str, MetricSeries] = {}
+        # Minutes whose buckets were closed since the last save
+        self.unsaved_buckets = 0
+        self._closed_slot: Optional[int] = None
+        self.load()
+
+    def get(self, name: str) -> MetricSeries:
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = MetricSeries()
+        return series
+
+    def record(self, name: str, value: float, timestamp: float):
+        if value is None or math.isnan(value):
+            return
+        if self.get(name).record(float(value), timestamp):
+            # Every series closes its bucket on the same minute boundary
+            long_slot = int(timestamp // LONG_RESOLUTION)
+            if long_slot != self._closed_slot:
+                self._closed_slot = long_slot
+                self.unsaved_buckets += 1
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            magic, version, count, capacity = _HEADER.unpack_from(raw, 0)
+            if magic != _MAGIC or version != _VERSION or capacity != LONG_LENGTH:
+                return
+            offset = _HEADER.size
+            for _ in range(count):
+                name_length, last_slot, length = _SERIES_HEADER.unpack_from(raw, offset)
+                offset += _SERIES_HEADER.size
+                name = raw[offset : offset + name_length].decode()
+                offset += name_length
+                values = array("f")
+                values.frombytes(raw[offset : offset + 4 * length])
+                offset += 4 * length
+                series = self.get(name)
+                for value in values:
+                    series.long.append(value)
+                series._long_last = last_slot
+        except FileNotFoundError:
+            pass
+        except (OSError, struct.error, UnicodeDecodeError) as e:
+            print(f"Failed to load metrics history: {e}")
+
+    def save(self):
+        """Write the long history atomically; the open buckets are not included."""
+        if not self.path:
+            return
+        chunks = []
+        stored = [(name, s) for name, s in self.series.items() if s._long_last is not None]
+        chunks.append(_HEADER.pack(_MAGIC, _VERSION, len(stored), LONG_LENGTH))
+        for name, series in stored:
+            encoded = name.encode()
+            values = series.long.values()
+            chunks.append(_SERIES_HEADER.pack(len(encoded), series._long_last, len(values)))
+            chunks.append(encoded)
+            chunks.append(values.tobytes())
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(chunks))
+            os.replace(tmp_path, self.path)
+            self.unsaved_buckets = 0
+        except OSError as e:
+            print(f"Failed to save metrics history: {e}")
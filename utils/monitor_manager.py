@@ -1,5 +1,3 @@
-import json
-import subprocess
 from typing import Dict, List, Optional, Tuple
 
 import gi
@@ -7,6 +5,8 @@ import gi
 gi.require_version("Gdk", "3.0")
 from gi.repository import Gdk
 
+from utils.hyprland_socket import get_hyprctl_client
+
 
 class Signal:
     """Simple signal implementation for monitor manager."""
@@ -102,16 +102,10 @@ class MonitorManager:
         """
         self._monitors = []
         
-        try:
-            # Try Hyprland first for primary info (more accurate)
-            result = subprocess.run(
-                ["hyprctl", "monitors", "-j"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            hypr_monitors = json.loads(result.stdout)
-            
+        # Try Hyprland first for primary info (more accurate)
+        hypr_monitors = get_hyprctl_client().query_json("j/monitors")
+        
+        if isinstance(hypr_monitors, list):
             for i, monitor in enumerate(hypr_monitors):
                 monitor_name = monitor.get('name', f'monitor-{i}')
                 
@@ -133,8 +127,7 @@ class MonitorManager:
                 if i not in self._notch_states:
                     self._notch_states[i] = False
                     self._current_notch_module[i] = None
-                    
-        except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError):
+        else:
             # Fallback to GTK only if Hyprland fails
             self._fallback_to_gtk()
         
@@ -0,0 +1,167 @@
+"""
+Notification history on disk.
+
+Every history entry is one row of an SQLite table in WAL mode, so adding
+or deleting a notification writes that row only instead of rewriting the
+whole history. Rows are indexed by time and by (app, time), which keeps
+the newest page, per-app deletes and retention cheap at any history size.
+Timestamps are the local ISO strings the history has always used; they
+sort in time order, and their first ten characters are the day.
+
+Retention keeps at most `max_count` rows and drops rows older than
+`max_age_days`. Methods that remove rows return them, so callers can
+delete the cached images of entries that were never shown.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+PAGE_SIZE = 50
+FIELDS = ("id", "app_icon", "summary", "body", "app_name", "timestamp", "cached_image_path")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    app_icon TEXT,
+    summary TEXT,
+    body TEXT,
+    app_name TEXT,
+    timestamp TEXT NOT NULL,
+    cached_image_path TEXT
+);
+CREATE INDEX IF NOT EXISTS notifications_time ON notifications(timestamp, seq);
+CREATE INDEX IF NOT EXISTS notifications_app_time ON notifications(app_name, timestamp);
+"""
+_COLUMNS = ", ".join(FIELDS)
+_NEWEST_FIRST = "ORDER BY timestamp DESC, seq DESC"
+
+
+class NotificationStore:
+    """Notification history rows as dicts with the keys in FIELDS."""
+
+    def __init__(self, db_path: str, max_count: int = 1000, max_age_days: Optional[int] = 30):
+        self.db_path = db_path
+        self.max_count = max_count
+        self.max_age_days = max_age_days
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without an fsync per commit
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def migrate_json(self, path: str) -> int:
+        """Import the old JSON history file, newest first, then remove it."""
+        try:
+            with open(path, "r") as f:
+                notes = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading old notification history {path}: {e}")
+            return 0
+        rows = [self._row(note) for note in reversed(notes) if note.get("id")]
+        with self._db:
+            self._db.executemany(
+                f"INSERT OR IGNORE INTO notifications({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Error removing old notification history {path}: {e}")
+        logger.info(f"Imported {len(rows)} notifications from {path}")
+        return len(rows)
+
+    @staticmethod
+    def _row(note: Dict) -> tuple:
+        return tuple(note.get(field) for field in FIELDS)
+
+    def add(self, note: Dict) -> List[Dict]:
+        """Store a notification; returns the rows retention removed to make room."""
+        with self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO notifications({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(note),
+            )
+        return self.apply_retention()
+
+    def apply_retention(self) -> List[Dict]:
+        expired = {}
+        if self.max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            for row in self._select("WHERE timestamp < ?", (cutoff,)):
+                expired[row["id"]] = row
+        if self.max_count is not None:
+            for row in self._select(f"{_NEWEST_FIRST} LIMIT -1 OFFSET ?", (self.max_count,)):
+                expired[row["id"]] = row
+        return self._delete_rows(list(expired.values()))
+
+    def delete(self, note_id: str) -> Optional[Dict]:
+        removed = self._delete_rows(self._select("WHERE id = ?", (str(note_id),)))
+        return removed[0] if removed else None
+
+    def delete_app(self, app_name: str) -> List[Dict]:
+        return self._delete_rows(self._select("WHERE app_name = ?", (app_name,)))
+
+    def clear(self) -> List[Dict]:
+        return self._delete_rows(self._select(""))
+
+    def _delete_rows(self, rows: List[Dict]) -> List[Dict]:
+        if rows:
+            with self._db:
+                self._db.executemany("DELETE FROM notifications WHERE id = ?", [(row["id"],) for row in rows])
+        return rows
+
+    def _select(self, clause: str, params: Iterable = ()) -> List[Dict]:
+        cursor = self._db.execute(f"SELECT {_COLUMNS} FROM notifications {clause}", tuple(params))
+        return [dict(row) for row in cursor]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = PAGE_SIZE,
+        app_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """Up to `limit` rows newest first, optionally for one app and time range."""
+        conditions, params = [], []
+        if app_name is not None:
+            conditions.append("app_name = ?")
+            params.append(app_name)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(until.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._select(f"{where} {_NEWEST_FIRST} LIMIT ? OFFSET ?", (*params, limit, offset))
+
+    def day_counts(self) -> List[Tuple[str, int]]:
+        """(YYYY-MM-DD, number of rows) for every day in the history, newest first."""
+        cursor = self._db.execute(
+            "SELECT substr(timestamp, 1, 10) AS day, COUNT(*) FROM notifications GROUP BY day ORDER BY day DESC"
+        )
+        return [tuple(row) for row in cursor]
+
+    def count(self, app_name: Optional[str] = None) -> int:
+        if app_name is None:
+            return self._db.execute("SELECT COUNT(*) FROM notifications").fetchone()[0]
+        return self._db.execute("SELECT COUNT(*) FROM notifications WHERE app_name = ?", (app_name,)).fetchone()[0]
+
+    def image_ids(self) -> Set[str]:
+        """Ids of notifications that have a cached image."""
+        cursor = self._db.execute("SELECT id FROM notifications WHERE cached_image_path IS NOT NULL")
+        return {row[0] for row in cursor}
@@ -0,0 +1,170 @@
+"""
+Lightweight readers for the metrics sampled by MetricsProvider.
+
+Each reader keeps its /proc file open and re-reads it from offset 0 with
+os.preadv into a preallocated buffer, then parses only the lines and
+fields it needs. This avoids the open/read/close and full-table parsing
+that psutil performs on every call.
+"""
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ProcFile:
+    """A /proc file held open and re-read in place."""
+
+    def __init__(self, path: str, size: int = 4096):
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self.buffer = bytearray(size)
+
+    def read(self) -> int:
+        """Refresh `buffer` with the current contents; returns the number of valid bytes."""
+        while True:
+            length = os.preadv(self._fd, [self.buffer], 0)
+            if length < len(self.buffer):
+                return length
+            # Only grows when the file outgrows the buffer, e.g. after hotplug
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _lines(buffer: bytearray, length: int, start: int = 0):
+    """Yield (start, end) offsets of each line in buffer[start:length]."""
+    while start < length:
+        end = buffer.find(b"\n", start, length)
+        if end < 0:
+            end = length
+        yield start, end
+        start = end + 1
+
+
+class CpuReader:
+    """Total and per-core CPU utilisation from /proc/stat, as psutil.cpu_percent computes it."""
+
+    def __init__(self):
+        self._file = ProcFile("/proc/stat")
+        self._previous: Optional[List[Tuple[int, int]]] = None
+        self.per_core: List[float] = []
+
+    def _read_times(self) -> List[Tuple[int, int]]:
+        length = self._file.read()
+        buffer = self._file.buffer
+        times = []
+        for start, end in _lines(buffer, length):
+            if not buffer.startswith(b"cpu", start, end):
+                # The cpu lines come first; nothing after them is needed
+                break
+            # user nice system idle iowait irq softirq steal; guest time is
+            # already included in user and nice
+            values = [int(v) for v in buffer[start:end].split()[1:9]]
+            times.append((sum(values), values[3] + values[4]))
+        return times
+
+    def sample(self) -> float:
+        """Busy percentage across all cores since the previous call."""
+        times = self._read_times()
+        previous, self._previous = self._previous, times
+        if previous is None or len(previous) != len(times):
+            self.per_core = [0.0] * (len(times) - 1)
+            return 0.0
+
+        percents = []
+        for (total, idle), (previous_total, previous_idle) in zip(times, previous):
+            elapsed = total - previous_total
+            busy = elapsed - (idle - previous_idle)
+            percents.append(min(100.0, max(0.0, 100.0 * busy / elapsed)) if elapsed > 0 else 0.0)
+        self.per_core = percents[1:]
+        return percents[0]
+
+
+class MemoryReader:
+    """Used memory percentage from /proc/meminfo, matching psutil.virtual_memory().percent."""
+
+    def __init__(self):
+        self._file = ProcFile("/proc/meminfo")
+
+    def _field(self, key: bytes, length: int) -> int:
+        buffer = self._file.buffer
+        start = buffer.find(key, 0, length)
+        if start < 0:
+            return 0
+        end = buffer.find(b"\n", start, length)
+        return int(buffer[start + len(key) : end if end >= 0 else length].split()[0]) * 1024
+
+    def sample(self) -> float:
+        length = self._file.read()
+        total = self._field(b"MemTotal:", length)
+        available = self._field(b"MemAvailable:", length)
+        return 100.0 * (total - available) / total if total else 0.0
+
+
+def is_virtual_interface(name: str) -> bool:
+    """Loopback, bridges, veth pairs, tunnels and the like live under /sys/devices/virtual."""
+    return "/devices/virtual/" in os.path.realpath(f"/sys/class/net/{name}")
+
+
+class NetReader:
+    """
+    Cumulative received/sent bytes from /proc/net/dev.
+
+    Virtual interfaces are skipped unless `include_virtual` is set; their
+    traffic is either local or already counted on a physical interface.
+    """
+
+    def __init__(self, include_virtual: bool = False, interfaces: Optional[Set[str]] = None):
+        self._file = ProcFile("/proc/net/dev")
+        self.include_virtual = include_virtual
+        self.interfaces = interfaces
+        self._included: Dict[bytes, bool] = {}
+        self.per_interface: Dict[str, Tuple[int, int]] = {}
+
+    def _is_included(self, name: bytes) -> bool:
+        included = self._included.get(name)
+        if included is None:
+            decoded = name.decode()
+            if self.interfaces is not None:
+                included = decoded in self.interfaces
+            else:
+                included = self.include_virtual or not is_virtual_interface(decoded)
+            self._included[name] = included
+        return included
+
+    def sample(self) -> Tuple[int, int]:
+        """Total (received, sent) bytes over the included interfaces."""
+        length = self._file.read()
+        buffer = self._file.buffer
+        received = sent = 0
+        per_interface = {}
+        # The first two lines are column headers
+        lines = _lines(buffer, length)
+        next(lines, None)
+        next(lines, None)
+        for start, end in lines:
+            colon = buffer.find(b":", start, end)
+            if colon < 0:
+                continue
+            name = bytes(buffer[start:colon].strip())
+            if not self._is_included(name):
+                continue
+            fields = buffer[colon + 1 : end].split()
+            rx, tx = int(fields[0]), int(fields[8])
+            per_interface[name.decode()] = (rx, tx)
+            received += rx
+            sent += tx
+        self.per_interface = per_interface
+        return received, sent
+
+
+def disk_usage_percent(path: str) -> float:
+    """Used space percentage of the filesystem at `path`, as psutil.disk_usage computes it."""
+    stat = os.statvfs(path)
+    used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+    available = stat.f_bavail * stat.f_frsize
+    total_user = used + available
+    return 100.0 * used / total_user if total_user else 0.0
@@ -0,0 +1,130 @@
+"""
+Prioritized thumbnail rendering on a process or thread pool.
+
+PIL holds the GIL for much of its decode and resample work, so rendering
+in threads competes with the GTK main loop. ThumbnailRenderQueue can run
+render_thumbnail in worker processes instead; only the encoded PNG and
+its metadata come back to the shell. The worker pool lives for one
+selector session, from the first render until cancel().
+
+Jobs wait in the queue rather than in the pool, which only ever holds one
+job per worker, so the queue can still reorder them: whatever is visible
+right now goes first, the rest follow in view order.
+"""
+
+import heapq
+import os
+from concurrent.futures import BrokenExecutor, Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gi.repository import GLib
+
+from utils.wallpaper_thumbnails import THUMBNAIL_SIZE, ThumbnailWorkerPool, render_thumbnail
+
+# Worker count of the thread backend
+THREAD_WORKERS = 4
+
+
+class ThumbnailRenderQueue:
+    """
+    Renders thumbnails for keys submitted from the main loop.
+
+    on_rendered(key, result) runs on a pool thread with render_thumbnail's
+    (png, metadata), or None if rendering failed. visible_keys() is asked on the main loop for the
+    keys currently on screen whenever a worker becomes free.
+    """
+
+    def __init__(
+        self,
+        on_rendered: Callable[[str, Optional[Tuple[bytes, dict]]], None],
+        visible_keys: Callable[[], List[str]],
+        use_processes: bool = True,
+        size: int = THUMBNAIL_SIZE,
+    ):
+        self.on_rendered = on_rendered
+        self.visible_keys = visible_keys
+        self.use_processes = use_processes
+        self.size = size
+        self.workers = (os.cpu_count() or THREAD_WORKERS) if use_processes else THREAD_WORKERS
+
+        self._pool = None
+        # key -> (order, path); _heap holds (order, key) and may contain stale keys
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._running: Dict[str, Future] = {}
+
+    def __len__(self):
+        return len(self._pending) + len(self._running)
+
+    def __contains__(self, key: str):
+        return key in self._pending or key in self._running
+
+    def submit(self, key: str, path: str, order: int):
+        """
+        Queue a render; `order` ranks it among the jobs that are not visible.
+
+        A key that is already rendering is rendered again once it finishes,
+        since its file may have changed.
+        """
+        self._pending[key] = (order, path)
+        heapq.heappush(self._heap, (order, key))
+        self._dispatch()
+
+    def cancel(self):
+        """End the session: drop all queued jobs and release the pool; running renders still report."""
+        self._pending.clear()
+        self._heap.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _next_key(self) -> Optional[str]:
+        for key in self.visible_keys():
+            if key in self._pending and key not in self._running:
+                return key
+        while self._heap:
+            order, key = heapq.heappop(self._heap)
+            pending = self._pending.get(key)
+            # Keys still rendering are pushed back by _on_finished
+            if pending is not None and pending[0] == order and key not in self._running:
+                return key
+        return None
+
+    def _dispatch(self):
+        while len(self._running) < self.workers:
+            key = self._next_key()
+            if key is None:
+                break
+            _, path = self._pending.pop(key)
+            if self.use_processes:
+                future = self._get_pool().submit(path, self.size)
+            else:
+                future = self._get_pool().submit(render_thumbnail, path, self.size)
+            self._running[key] = future
+            future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.use_processes:
+                self._pool = ThumbnailWorkerPool(self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _on_done(self, key: str, future: Future):
+        """Runs on a pool thread."""
+        # Cancelled or lost with a dead worker: not a bad image, so not reported
+        if not future.cancelled() and not isinstance(future.exception(), BrokenExecutor):
+            error = future.exception()
+            if error is not None:
+                print(f"Error rendering thumbnail for {key}: {error}")
+            self.on_rendered(key, None if error is not None else future.result())
+        GLib.idle_add(self._on_finished, key, future)
+
+    def _on_finished(self, key: str, future: Future):
+        if self._running.get(key) is future:
+            del self._running[key]
+            if key in self._pending:
+                heapq.heappush(self._heap, (self._pending[key][0], key))
+        self._dispatch()
+        return False
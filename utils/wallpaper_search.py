@@ -0,0 +1,158 @@
+"""
+Search over wallpaper file names and thumbnail metadata.
+
+Every query word must match. A word matches a wallpaper when it is part of
+its file name, or when it names a property derived from the metadata the
+thumbnail cache recorded:
+
+  - brightness:  dark, light (bright)
+  - orientation: portrait, landscape, square, ultrawide
+  - resolution:  4k, 1440p, 1080p (at least that size)
+  - color:       red, orange, yellow, green, cyan, blue, purple, pink,
+                 gray (grey), black, white, or hue:<degrees>
+
+Tags are derived once per wallpaper, so a query only does set lookups and
+substring tests on precomputed names. When a word that is not a tag matches
+no file name as a substring, file names containing its letters in order are
+used instead.
+"""
+
+import colorsys
+import re
+from typing import Dict, Optional, Set
+
+DARK_LUMINANCE = 0.35
+LIGHT_LUMINANCE = 0.65
+# Dominant colors below this HLS saturation count as gray
+GRAY_SATURATION = 0.18
+# hue:<degrees> accepts dominant hues within this many degrees
+HUE_TOLERANCE = 20
+
+# Upper hue bound (exclusive) of each color name; red also wraps past 345
+HUE_NAMES = [
+    (15, "red"),
+    (45, "orange"),
+    (70, "yellow"),
+    (165, "green"),
+    (195, "cyan"),
+    (255, "blue"),
+    (290, "purple"),
+    (345, "pink"),
+    (361, "red"),
+]
+RESOLUTIONS = [("4k", 3840, 2160), ("1440p", 2560, 1440), ("1080p", 1920, 1080)]
+ALIASES = {"bright": "light", "grey": "gray", "violet": "purple", "magenta": "pink"}
+TAGS = frozenset(
+    ["dark", "light", "portrait", "landscape", "square", "ultrawide", "gray", "black", "white"]
+    + [name for _, name in HUE_NAMES]
+    + [name for name, _, _ in RESOLUTIONS]
+)
+
+_HUE_QUERY_RE = re.compile(r"hue:(\d{1,3})")
+
+
+def _is_subsequence(term: str, text: str) -> bool:
+    pos = 0
+    for ch in term:
+        pos = text.find(ch, pos) + 1
+        if not pos:
+            return False
+    return True
+
+
+def metadata_tags(metadata: Optional[dict]) -> Set[str]:
+    """Search tags of one wallpaper; empty until it has been thumbnailed."""
+    if not metadata:
+        return set()
+    tags = set()
+    width, height = metadata["width"], metadata["height"]
+    if width > height * 1.05:
+        tags.add("landscape")
+        if width >= height * 2:
+            tags.add("ultrawide")
+    elif height > width * 1.05:
+        tags.add("portrait")
+    else:
+        tags.add("square")
+    long_side, short_side = max(width, height), min(width, height)
+    for name, min_long, min_short in RESOLUTIONS:
+        if long_side >= min_long and short_side >= min_short:
+            tags.add(name)
+
+    luminance = metadata["luminance"]
+    if luminance < DARK_LUMINANCE:
+        tags.add("dark")
+    elif luminance > LIGHT_LUMINANCE:
+        tags.add("light")
+
+    hue, lightness, saturation = _hls(metadata["color"])
+    if lightness < 0.12:
+        tags.add("black")
+    elif lightness > 0.9:
+        tags.add("white")
+    elif saturation < GRAY_SATURATION:
+        tags.add("gray")
+    else:
+        tags.add(next(name for bound, name in HUE_NAMES if hue < bound))
+    return tags
+
+
+def _hls(color):
+    r, g, b = (c / 255 for c in color)
+    hue, lightness, saturation = colorsys.rgb_to_hls(r, g, b)
+    return hue * 360, lightness, saturation
+
+
+class WallpaperSearchIndex:
+    """File names, tags and dominant hues of the wallpapers being shown."""
+
+    def __init__(self):
+        self._names: Dict[str, str] = {}
+        self._hues: Dict[str, float] = {}
+        self._tagged: Dict[str, Set[str]] = {}
+
+    def add(self, file_name: str, metadata: Optional[dict] = None):
+        self.remove(file_name)
+        self._names[file_name] = file_name.casefold()
+        for tag in metadata_tags(metadata):
+            self._tagged.setdefault(tag, set()).add(file_name)
+        if metadata:
+            hue, lightness, saturation = _hls(metadata["color"])
+            if saturation >= GRAY_SATURATION and 0.12 <= lightness <= 0.9:
+                self._hues[file_name] = hue
+
+    def remove(self, file_name: str):
+        if self._names.pop(file_name, None) is None:
+            return
+        self._hues.pop(file_name, None)
+        for names in self._tagged.values():
+            names.discard(file_name)
+
+    def search(self, query: str) -> Optional[Set[str]]:
+        """Names matching every word of `query`, or None when it has no words."""
+        words = query.casefold().split()
+        if not words:
+            return None
+        result = None
+        for word in words:
+            matches = self._match_word(ALIASES.get(word, word))
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
+
+    def _match_word(self, word: str) -> Set[str]:
+        hue_query = _HUE_QUERY_RE.fullmatch(word)
+        if hue_query:
+            target = int(hue_query.group(1)) % 360
+            return {
+                name for name, hue in self._hues.items()
+                if min(abs(hue - target), 360 - abs(hue - target)) <= HUE_TOLERANCE
+            }
+
+        matches = {name for name, text in self._names.items() if word in text}
+        if word in TAGS:
+            return matches | self._tagged.get(word, set())
+        if not matches:
+            matches = {name for name, text in self._names.items() if _is_subsequence(word, text)}
+        return matches
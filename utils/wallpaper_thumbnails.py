@@ -0,0 +1,264 @@
+"""
+Wallpaper thumbnail cache.
+
+Thumbnails are stored under a hash of (path, size, mtime), so replacing a
+wallpaper with another image of the same name produces a new thumbnail
+instead of showing the stale one. index.json maps every wallpaper path to
+its current thumbnail and to metadata taken while rendering it (source
+resolution, dominant color, mean luminance), which search filters on
+without decoding anything. Startup decides what is cached from the
+wallpaper's own stat alone, without checking the cache directory file by
+file. Thumbnails no longer referenced by the index are removed by prune().
+
+Running this module (`python -m utils.wallpaper_thumbnails`) starts a
+render worker for ThumbnailWorkerPool.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import BrokenExecutor, Future
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageStat
+
+THUMBNAIL_SIZE = 96
+INDEX_VERSION = 2
+
+# Directory the worker module is importable from
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def render_thumbnail(path: str, size: int = THUMBNAIL_SIZE) -> Tuple[bytes, dict]:
+    """Center-cropped square thumbnail of an image as PNG, and its metadata."""
+    with Image.open(path) as img:
+        source_width, source_height = img.size
+        # Lets JPEG decode at 1/2, 1/4 or 1/8 scale, never below `size`
+        img.draft("RGB", (size, size))
+        width, height = img.size
+        side = min(width, height)
+        left = (width - side) // 2
+        top = (height - side) // 2
+        cropped = img.crop((left, top, left + side, top + side))
+        cropped.thumbnail((size, size), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        cropped.save(out, "PNG")
+
+        rgb = cropped.convert("RGB")
+        palette = rgb.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+        _, index = max(palette.getcolors())
+        dominant = palette.getpalette()[index * 3 : index * 3 + 3]
+        metadata = {
+            "width": source_width,
+            "height": source_height,
+            "color": dominant,
+            "luminance": round(ImageStat.Stat(rgb.convert("L")).mean[0] / 255, 3),
+        }
+        return out.getvalue(), metadata
+
+
+def serve(requests: BinaryIO, replies: BinaryIO):
+    """Worker loop: answer pickled (path, size) requests until `requests` closes."""
+    while True:
+        try:
+            path, size = pickle.load(requests)
+        except EOFError:
+            return
+        try:
+            reply = (render_thumbnail(path, size), None)
+        except Exception as e:
+            reply = (None, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, replies)
+        replies.flush()
+
+
+class ThumbnailWorkerPool:
+    """
+    Renders thumbnails in worker processes started as
+    `python -m utils.wallpaper_thumbnails`.
+
+    Every worker is a fresh interpreter that only imports this module, so
+    the threaded GTK shell is never forked and main.py is never imported
+    again. One thread per worker hands it a request over a pipe and waits
+    for the reply. Workers start with their first job and stay until
+    shutdown(); one that dies fails its job with BrokenExecutor and is
+    replaced by the next job.
+    """
+
+    def __init__(self, workers: int):
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path: str, size: int = THUMBNAIL_SIZE) -> Future:
+        """Future of render_thumbnail(path, size)."""
+        future = Future()
+        self._jobs.put((future, path, size))
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        if cancel_futures:
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job[0].cancel()
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _run(self):
+        process = None
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                future, path, size = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if process is None:
+                        process = subprocess.Popen(
+                            [sys.executable, "-m", "utils.wallpaper_thumbnails"],
+                            stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE,
+                            cwd=_ROOT_DIR,
+                        )
+                    pickle.dump((path, size), process.stdin)
+                    process.stdin.flush()
+                    result, error = pickle.load(process.stdout)
+                except (OSError, EOFError, pickle.UnpicklingError) as e:
+                    if process is not None:
+                        process.kill()
+                        process.wait()
+                        process = None
+                    future.set_exception(BrokenExecutor(f"Thumbnail worker failed: {e}"))
+                    continue
+                if error is not None:
+                    future.set_exception(RuntimeError(error))
+                else:
+                    future.set_result(result)
+        finally:
+            if process is not None:
+                # Closing its input ends the worker's loop
+                process.stdin.close()
+                process.wait()
+
+
+class ThumbnailCache:
+    """Index of generated thumbnails, safe to use from worker threads."""
+
+    def __init__(self, cache_dir: str, size: int = THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.index_path = os.path.join(cache_dir, "index.json")
+        # path -> [file size, mtime in ns, thumbnail file name, metadata]
+        self._entries: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index.get("size") == self.size:
+                self._entries = index["entries"]
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError, KeyError, TypeError):
+            self._entries = {}
+
+    def save_index(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            index = {"version": INDEX_VERSION, "size": self.size, "entries": dict(self._entries)}
+            self.dirty = False
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error saving thumbnail index: {e}")
+
+    def lookup(self, path: str, stat: os.stat_result) -> Optional[str]:
+        """Path of the thumbnail for this version of the file, if one exists."""
+        entry = self._entries.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return os.path.join(self.cache_dir, entry[2])
+        return None
+
+    def metadata(self, path: str) -> Optional[dict]:
+        entry = self._entries.get(path)
+        return entry[3] if entry else None
+
+    def store(self, path: str, stat: os.stat_result, png: bytes, metadata: Optional[dict] = None) -> str:
+        """Write a rendered thumbnail and make it the current one for `path`."""
+        key = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{self.size}"
+        name = f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png"
+        thumb_path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{thumb_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        with self._lock:
+            os.replace(tmp_path, thumb_path)
+            previous = self._entries.get(path)
+            self._entries[path] = [stat.st_size, stat.st_mtime_ns, name, metadata]
+            self.dirty = True
+        if previous and previous[2] != name:
+            self._remove(previous[2])
+        return thumb_path
+
+    def forget(self, path: str):
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry:
+                self.dirty = True
+        if entry:
+            self._remove(entry[2])
+
+    def prune(self, live_paths: Iterable[str]) -> int:
+        """Drop index entries for missing wallpapers and delete unreferenced thumbnails."""
+        live = set(live_paths)
+        removed = 0
+        with self._lock:
+            for path in [p for p in self._entries if p not in live]:
+                del self._entries[path]
+                self.dirty = True
+            referenced = {entry[2] for entry in self._entries.values()}
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".png") and entry.name not in referenced:
+                        try:
+                            os.remove(entry.path)
+                            removed += 1
+                        except OSError:
+                            pass
+        return removed
+
+    def _remove(self, name: str):
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    # Replies own the real stdout; anything else printed goes to stderr
+    replies = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    serve(sys.stdin.buffer, replies)
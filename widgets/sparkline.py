@@ -0,0 +1,104 @@
+import math
+from typing import Literal
+
+import cairo
+import gi
+from fabric.widgets.widget import Widget
+
+from utils.metrics_history import RingBuffer
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk  # noqa: E402
+
+
+class Sparkline(Gtk.DrawingArea, Widget):
+    """
+    A small line chart of a RingBuffer, drawn with cairo.
+
+    The buffer's capacity spans the full width, so a partly filled history
+    grows in from the right. Unsampled (NaN) slots break the line. The line
+    uses the CSS `color` of the widget; `maximum=None` scales to the peak.
+    """
+
+    def __init__(
+        self,
+        buffer: RingBuffer | None = None,
+        maximum: float | None = 100.0,
+        line_width: float = 1.5,
+        name: str | None = None,
+        h_align: Literal["fill", "start", "end", "center", "baseline"] | Gtk.Align | None = None,
+        v_align: Literal["fill", "start", "end", "center", "baseline"] | Gtk.Align | None = None,
+        h_expand: bool = False,
+        v_expand: bool = False,
+        size: int | tuple[int, int] | None = None,
+        **kwargs,
+    ):
+        Gtk.DrawingArea.__init__(self)
+        Widget.__init__(
+            self,
+            name=name,
+            h_align=h_align,
+            v_align=v_align,
+            h_expand=h_expand,
+            v_expand=v_expand,
+            size=size,
+            **kwargs,
+        )
+        self.buffer = buffer
+        self.maximum = maximum
+        self.line_width = line_width
+        self.connect("draw", self.on_draw)
+
+    def set_buffer(self, buffer: RingBuffer | None):
+        self.buffer = buffer
+        self.queue_draw()
+
+    def on_draw(self, widget, ctx):
+        if self.buffer is None or not len(self.buffer):
+            return
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+        values = self.buffer.values()
+        maximum = self.maximum
+        if maximum is None:
+            maximum = max((v for v in values if not math.isnan(v)), default=0.0)
+        if maximum <= 0:
+            maximum = 1.0
+
+        inset = self.line_width / 2
+        usable = height - self.line_width
+        step = width / max(self.buffer.capacity - 1, 1)
+        x0 = width - step * (len(values) - 1)
+
+        color = self.get_style_context().get_color(self.get_state_flags())
+        ctx.set_line_width(self.line_width)
+        ctx.set_line_join(cairo.LINE_JOIN_ROUND)
+
+        # Each run of sampled values is stroked and filled on its own
+        runs = []
+        run = []
+        for i, value in enumerate(values):
+            if math.isnan(value):
+                if run:
+                    runs.append(run)
+                    run = []
+                continue
+            ratio = min(max(value / maximum, 0.0), 1.0)
+            run.append((x0 + i * step, inset + usable * (1 - ratio)))
+        if run:
+            runs.append(run)
+
+        for run in runs:
+            ctx.move_to(*run[0])
+            for point in run[1:]:
+                ctx.line_to(*point)
+            if len(run) == 1:
+                ctx.line_to(run[0][0] + 0.5, run[0][1])
+            ctx.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+            ctx.stroke_preserve()
+            ctx.line_to(run[-1][0], height)
+            ctx.line_to(run[0][0], height)
+            ctx.close_path()
+            ctx.set_source_rgba(color.red, color.green, color.blue, color.alpha * 0.2)
+            ctx.fill()
+        return False
@@ -0,0 +1,260 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Hashable, Sequence
+
+import gi
+from fabric.widgets.widget import Widget
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk  # noqa: E402
+
+
+class VirtualList(Gtk.Layout, Widget):
+    """
+    A scrollable list that only materializes the rows in view.
+
+    Rows come from a small pool: `create_row(kind)` builds a row widget once
+    and `bind_row(row, item, index)` fills it with data. Only the rows that
+    intersect the visible area, plus `overscan` rows on either side, are bound;
+    scrolling or replacing the items rebinds pooled rows instead of creating
+    new widgets, so the widget count stays constant however long the list is.
+
+    Rows of the same `row_kind(item)` must share one height, which is measured
+    from the first row of that kind. Add the list directly to a ScrolledWindow.
+    """
+
+    def __init__(
+        self,
+        create_row: Callable[[Hashable], Gtk.Widget],
+        bind_row: Callable[[Gtk.Widget, object, int], None],
+        row_kind: Callable[[object], Hashable] | None = None,
+        spacing: int = 0,
+        overscan: int = 3,
+        placeholder: Gtk.Widget | None = None,
+        name: str | None = None,
+        **kwargs,
+    ):
+        Gtk.Layout.__init__(self)
+        Widget.__init__(self, name=name, **kwargs)
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._row_kind = row_kind or (lambda item: None)
+        self.spacing = spacing
+        self.overscan = overscan
+
+        self._items: list = []
+        self._kinds: list = []
+        self._offsets: list[int] = [0]
+        self._heights: dict[Hashable, int] = {}
+        self._bound: dict[int, Gtk.Widget] = {}
+        self._free: dict[Hashable, list[Gtk.Widget]] = {}
+        self._width = 0
+        self._height = 0
+        self.selected_index = -1
+
+        self._placeholder = placeholder
+        if placeholder is not None:
+            self.put(placeholder, 0, 0)
+            placeholder.set_no_show_all(True)
+
+        self._vadjustment = None
+        self._vadjustment_handler = 0
+        self.connect("notify::vadjustment", lambda *_: self._track_vadjustment())
+        self.connect("size-allocate", self._on_size_allocate)
+        self._track_vadjustment()
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+
+    @property
+    def items(self) -> list:
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_item(self, index: int):
+        return self._items[index] if 0 <= index < len(self._items) else None
+
+    def get_row(self, index: int) -> Gtk.Widget | None:
+        """The row currently bound to `index`, if it is materialized."""
+        return self._bound.get(index)
+
+    def bound_rows(self) -> list[Gtk.Widget]:
+        """The rows currently materialized, in no particular order."""
+        return list(self._bound.values())
+
+    def set_items(self, items: Sequence, selected_index: int = -1, keep_scroll: bool = False):
+        """Replace the list contents, rebinding the pooled rows in view."""
+        self._items = list(items)
+        self._kinds = [self._row_kind(item) for item in self._items]
+        self.selected_index = selected_index if 0 <= selected_index < len(self._items) else -1
+        self._release_all()
+        self._layout_items()
+        adjustment = self.get_vadjustment()
+        if adjustment is not None and not keep_scroll:
+            adjustment.set_value(0)
+        self._refresh()
+
+    def clear(self):
+        self.set_items([])
+
+    def refresh_item(self, index: int):
+        """Rebind the row showing `index` after its item changed in place."""
+        row = self._bound.get(index)
+        if row is not None:
+            self._bind(row, index)
+
+    # ------------------------------------------------------------------
+    # Selection and scrolling
+    # ------------------------------------------------------------------
+
+    def select(self, index: int):
+        """Highlight the row at `index` (-1 clears) and scroll it into view."""
+        if not 0 <= index < len(self._items):
+            index = -1
+        previous = self._bound.get(self.selected_index)
+        if previous is not None:
+            previous.get_style_context().remove_class("selected")
+        self.selected_index = index
+        if index == -1:
+            return
+        self.scroll_to_index(index)
+        row = self._bound.get(index)
+        if row is not None:
+            row.get_style_context().add_class("selected")
+
+    def scroll_to_index(self, index: int):
+        adjustment = self.get_vadjustment()
+        if adjustment is None or not 0 <= index < len(self._items):
+            return
+        top = self._offsets[index]
+        bottom = top + self._heights.get(self._kinds[index], 0)
+        page_size = adjustment.get_page_size()
+        value = adjustment.get_value()
+        if top < value:
+            adjustment.set_value(top)
+        elif bottom > value + page_size:
+            adjustment.set_value(bottom - page_size)
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def _track_vadjustment(self):
+        adjustment = self.get_vadjustment()
+        if adjustment is self._vadjustment:
+            return
+        if self._vadjustment is not None and self._vadjustment_handler:
+            self._vadjustment.disconnect(self._vadjustment_handler)
+        self._vadjustment = adjustment
+        self._vadjustment_handler = (
+            adjustment.connect("value-changed", lambda *_: self._refresh())
+            if adjustment is not None
+            else 0
+        )
+
+    def _on_size_allocate(self, widget, allocation):
+        if allocation.width == self._width and allocation.height == self._height:
+            return
+        width_changed = allocation.width != self._width
+        self._width, self._height = allocation.width, allocation.height
+        if self._placeholder is not None:
+            self._placeholder.set_size_request(self._width, self._height)
+        if width_changed:
+            # Heights may depend on the width (wrapping, ellipsizing)
+            self._heights.clear()
+            self._layout_items()
+            for row in self._bound.values():
+                row.set_size_request(self._width, self._heights.get(row.kind, -1))
+        self._refresh()
+
+    def _measure(self, kind: Hashable, index: int) -> int:
+        row = self._acquire(kind)
+        self._bind_row(row, self._items[index], index)
+        row.set_size_request(self._width, -1)
+        _, natural = row.get_preferred_height_for_width(max(self._width, 1))
+        self._free[kind].append(row)
+        return max(natural, 1)
+
+    def _layout_items(self):
+        if self._width <= 0:
+            return
+        offsets = [0]
+        y = 0
+        for index, kind in enumerate(self._kinds):
+            height = self._heights.get(kind)
+            if height is None:
+                height = self._heights[kind] = self._measure(kind, index)
+            y += height + self.spacing
+            offsets.append(y)
+        self._offsets = offsets
+        total = max(0, y - self.spacing)
+        self.set_size(self._width, total)
+        # Rows already in view may sit at stale positions
+        for index, row in self._bound.items():
+            self.move(row, 0, offsets[index])
+
+    def _acquire(self, kind: Hashable) -> Gtk.Widget:
+        free = self._free.setdefault(kind, [])
+        if free:
+            return free.pop()
+        row = self._create_row(kind)
+        row.kind = kind
+        # Pooled rows stay hidden until bound, even when a parent calls show_all()
+        row.set_no_show_all(True)
+        row.hide()
+        self.put(row, 0, 0)
+        return row
+
+    def _release(self, index: int):
+        row = self._bound.pop(index)
+        row.get_style_context().remove_class("selected")
+        row.hide()
+        self._free[row.kind].append(row)
+
+    def _release_all(self):
+        for index in list(self._bound):
+            self._release(index)
+
+    def _bind(self, row: Gtk.Widget, index: int):
+        row.index = index
+        row.item = self._items[index]
+        self._bind_row(row, row.item, index)
+        context = row.get_style_context()
+        if index == self.selected_index:
+            context.add_class("selected")
+        else:
+            context.remove_class("selected")
+
+    def _visible_range(self) -> range:
+        adjustment = self.get_vadjustment()
+        top = adjustment.get_value() if adjustment is not None else 0
+        page = adjustment.get_page_size() if adjustment is not None else 0
+        page = page or self._height
+        count = len(self._items)
+        first = max(0, bisect_right(self._offsets, top) - 1 - self.overscan)
+        last = min(count, bisect_left(self._offsets, top + page) + self.overscan)
+        return range(first, last)
+
+    def _refresh(self):
+        if self._placeholder is not None:
+            self._placeholder.set_visible(not self._items)
+        if not self._items or self._width <= 0 or len(self._offsets) != len(self._items) + 1:
+            self._release_all()
+            return
+
+        wanted = self._visible_range()
+        for index in [i for i in self._bound if i not in wanted]:
+            self._release(index)
+
+        for index in wanted:
+            if index in self._bound:
+                continue
+            kind = self._kinds[index]
+            row = self._acquire(kind)
+            self._bind(row, index)
+            row.set_size_request(self._width, self._heights.get(kind, -1))
+            self.move(row, 0, self._offsets[index])
+            row.show()
+            self._bound[index] = row